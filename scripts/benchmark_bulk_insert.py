@@ -0,0 +1,101 @@
+"""Compare INSERT merges and COPY for bulk item loads of the sqlalchemy backend.
+
+Loads synthetic items into a throwaway collection with `bulk_item_insert` and with
+`bulk_item_copy`, and reports items per second.  Connection settings are read from
+the usual POSTGRES_* environment variables.
+
+    python scripts/benchmark_bulk_insert.py --items 100000
+"""
+import argparse
+import copy
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator
+
+from stac_fastapi.sqlalchemy.config import SqlalchemySettings
+from stac_fastapi.sqlalchemy.models import database
+from stac_fastapi.sqlalchemy.session import Session
+from stac_fastapi.sqlalchemy.transactions import (
+    BulkTransactionsClient,
+    TransactionsClient,
+)
+from stac_fastapi.types.config import Settings
+
+workingdir = Path(__file__).parent.absolute()
+testdata = workingdir.parent / "stac_fastapi" / "sqlalchemy" / "tests" / "data"
+
+COLLECTION_ID = "benchmark-bulk-insert"
+
+
+class BenchmarkRequest:
+    """Minimal stand-in for a starlette request."""
+
+    base_url = "http://benchmark-server/"
+    headers: Dict[str, str] = {}
+
+
+def synthetic_items(count: int) -> Iterator[Dict]:
+    """Yield `count` copies of the test item with unique ids and datetimes."""
+    with open(testdata / "test_item.json") as f:
+        template = json.load(f)
+    template["collection"] = COLLECTION_ID
+
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        item = copy.deepcopy(template)
+        item["id"] = f"benchmark-item-{i}"
+        item["properties"]["datetime"] = (start + timedelta(seconds=i)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        yield item
+
+
+def run(count: int, chunk_size: int):
+    """Load data with both paths and print a timing table."""
+    settings = SqlalchemySettings()
+    Settings.set(settings)
+    session = Session.create_from_settings(settings)
+
+    with open(testdata / "test_collection.json") as f:
+        collection = json.load(f)
+    collection["id"] = COLLECTION_ID
+
+    transactions = TransactionsClient(session=session)
+    transactions.create_collection(collection, request=BenchmarkRequest)
+    bulk = BulkTransactionsClient(session=session)
+    items = database.Item.__table__
+
+    def clear():
+        session.writer.cached_engine.execute(
+            items.delete().where(items.c.collection_id == COLLECTION_ID)
+        )
+
+    loads = {
+        "insert": lambda: bulk.bulk_item_insert(
+            list(synthetic_items(count)), chunk_size=chunk_size
+        ),
+        "copy": lambda: bulk.bulk_item_copy(
+            synthetic_items(count), chunk_size=chunk_size
+        ),
+    }
+    try:
+        print(f"{'path':<8}{'items':>10}{'total s':>10}{'items/s':>12}")
+        for name, load in loads.items():
+            clear()
+            start = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}")
+    finally:
+        clear()
+        transactions.delete_collection(COLLECTION_ID, request=BenchmarkRequest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.items, args.chunk_size)
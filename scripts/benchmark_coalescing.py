@@ -0,0 +1,135 @@
+"""Time bursts of identical concurrent searches, with and without coalescing.
+
+A burst of `--requests` identical POST /search requests, like those of clients
+loading the same dashboard, is sent at once straight to a `StacApi` application
+whose client holds one of `--pool` connections for `--query-ms` per search, with
+the `coalesce_searches` setting off and on.
+
+    python scripts/benchmark_coalescing.py --requests 50 --pool 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Tuple
+
+from starlette.types import ASGIApp
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.extensions.core import TokenPaginationExtension
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.core import AsyncBaseCoreClient
+
+BODY = json.dumps(
+    {"collections": ["collection"], "bbox": [0, 0, 10, 10], "limit": 100}
+).encode()
+
+
+class SlowClient(AsyncBaseCoreClient):
+    """Client whose searches hold a pooled connection for a while."""
+
+    def __init__(self, pool: int, query_seconds: float, **kwargs):
+        """Create the connection pool."""
+        super().__init__(**kwargs)
+        self.pool = asyncio.Semaphore(pool)
+        self.query_seconds = query_seconds
+        self.queries = 0
+
+    async def post_search(self, search_request, **kwargs):
+        """Hold a connection for the duration of a query."""
+        async with self.pool:
+            self.queries += 1
+            await asyncio.sleep(self.query_seconds)
+        base_url = str(kwargs["request"].base_url)
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "id": f"item-{i}", "properties": {}}
+                for i in range(search_request.limit)
+            ],
+            "links": [{"rel": "self", "href": f"{base_url}search"}],
+        }
+
+    async def all_collections(self, **kwargs):
+        """Unused."""
+
+    async def get_search(self, **kwargs):
+        """Unused."""
+
+    async def get_item(self, **kwargs):
+        """Unused."""
+
+    async def get_collection(self, **kwargs):
+        """Unused."""
+
+    async def item_collection(self, **kwargs):
+        """Unused."""
+
+
+async def call(app: ASGIApp):
+    """Send a POST /search request to the application."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": "/search",
+        "raw_path": b"/search",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"benchmark-server"),
+            (b"content-type", b"application/json"),
+        ],
+    }
+    received = False
+    status = None
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": BODY, "more_body": False}
+        # Like a server, wait for the client to disconnect once the body is read
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, status
+
+
+def timed(coalesce: bool, requests: int, pool: int, query_ms: float) -> Tuple:
+    """Wall clock time of a burst of requests, and the queries it made."""
+    loop = asyncio.get_event_loop()
+    client = SlowClient(pool, query_ms / 1e3)
+    api = StacApi(
+        settings=ApiSettings(coalesce_searches=coalesce),
+        client=client,
+        extensions=[TokenPaginationExtension()],
+        middlewares=[],
+    )
+    start = time.perf_counter()
+    loop.run_until_complete(asyncio.gather(*(call(api.app) for _ in range(requests))))
+    return time.perf_counter() - start, client.queries
+
+
+def run(requests: int, pool: int, query_ms: float):
+    """Print a timing table."""
+    print(f"{'coalesce':<10}{'requests':>10}{'queries':>10}{'burst ms':>10}")
+    for coalesce in (False, True):
+        elapsed, queries = timed(coalesce, requests, pool, query_ms)
+        print(f"{str(coalesce):<10}{requests:>10}{queries:>10}{elapsed * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--pool", type=int, default=10)
+    parser.add_argument("--query-ms", type=float, default=20)
+    args = parser.parse_args()
+    run(args.requests, args.pool, args.query_ms)
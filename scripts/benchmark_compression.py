@@ -0,0 +1,138 @@
+"""Time response compression for item, page and large page responses.
+
+Compares `CompressionMiddleware` with `brotli_asgi.BrotliMiddleware` at its default
+settings (the previous `StacApi` default, timed only if `brotli_asgi` is installed)
+and no compression, for JSON responses of an item and of item pages of
+`--features` and ten times as many features, sent straight to the ASGI
+application by a client accepting `gzip, br`.
+
+    python scripts/benchmark_compression.py --features 1000
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import time
+from typing import Dict
+
+from fastapi import FastAPI
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from stac_fastapi.api.compression import CompressionMiddleware
+
+
+def make_item(i: int) -> Dict:
+    """A STAC item, like those of the test data."""
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": f"item-{i}",
+        "collection": "collection",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[i, 0], [i + 1, 0], [i + 1, 1], [i, 1], [i, 0]]],
+        },
+        "bbox": [i, 0, i + 1, 1],
+        "properties": {"datetime": "2020-01-01T00:00:00Z", "eo:cloud_cover": i % 100},
+        "assets": {
+            "B1": {"href": f"https://example.com/item-{i}/B1.tif", "roles": ["data"]}
+        },
+        "links": [
+            {"rel": "self", "href": f"https://example.com/items/item-{i}"},
+            {"rel": "collection", "href": "https://example.com/collections/c"},
+        ],
+    }
+
+
+def make_app(middleware: str, bodies: Dict[str, bytes]) -> ASGIApp:
+    """Build an application serving pre-encoded bodies, with a compression middleware."""
+    app = FastAPI()
+    for name, body in bodies.items():
+        app.add_api_route(
+            f"/{name}",
+            lambda body=body: Response(body, media_type="application/geo+json"),
+        )
+    if middleware == "BrotliMiddleware":
+        from brotli_asgi import BrotliMiddleware
+
+        app.add_middleware(BrotliMiddleware)
+    elif middleware == "CompressionMiddleware":
+        # Pin the load, so timings do not depend on the benchmark's own CPU use
+        app.add_middleware(CompressionMiddleware, cpu_load=lambda: 0.0)
+    return app
+
+
+async def call(app: ASGIApp, path: str) -> int:
+    """Send a GET request to the application, returning the size of the body."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark-server"), (b"accept-encoding", b"gzip, br")],
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+def timed(app: ASGIApp, path: str, rounds: int) -> float:
+    """Best wall clock time of `rounds` requests."""
+    loop = asyncio.get_event_loop()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        loop.run_until_complete(call(app, path))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(features: int, rounds: int):
+    """Print a timing table."""
+    loop = asyncio.get_event_loop()
+    bodies = {
+        "item": json.dumps(make_item(0)).encode(),
+        "page": json.dumps(
+            {"features": [make_item(i) for i in range(features)]}
+        ).encode(),
+        "large": json.dumps(
+            {"features": [make_item(i) for i in range(features * 10)]}
+        ).encode(),
+    }
+    middlewares = ["none", "CompressionMiddleware"]
+    if importlib.util.find_spec("brotli_asgi") is not None:
+        middlewares.insert(1, "BrotliMiddleware")
+
+    print(f"{'middleware':<24}{'response':<10}{'kB':>10}{'sent kB':>10}{'ms':>10}")
+    for middleware in middlewares:
+        app = make_app(middleware, bodies)
+        for name, body in bodies.items():
+            sent = loop.run_until_complete(call(app, f"/{name}"))
+            elapsed = timed(app, f"/{name}", rounds)
+            print(
+                f"{middleware:<24}{name:<10}{len(body) / 1e3:>10.1f}"
+                f"{sent / 1e3:>10.1f}{elapsed * 1e3:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    run(args.features, args.rounds)
@@ -0,0 +1,154 @@
+"""Time the responses of the OpenAPI schema and conformance classes.
+
+Compares serializing the documents on every request, as before they were cached,
+with the encoded documents of `stac_fastapi.api.documents`, for plain and brotli
+accepting requests and for revalidations with If-None-Match.  Requests are sent
+straight to the ASGI application, without middleware.
+
+    python scripts/benchmark_documents.py --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI
+from stac_pydantic.api import ConformanceClasses
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp
+
+from stac_fastapi.api.documents import DocumentCache, create_document_endpoint
+from stac_fastapi.api.openapi import VndOaiResponse, update_openapi
+from stac_fastapi.extensions.core import (
+    ContextExtension,
+    FieldsExtension,
+    FilterExtension,
+    QueryExtension,
+    SortExtension,
+    TokenPaginationExtension,
+)
+from stac_fastapi.types.conformance import BASE_CONFORMANCE_CLASSES
+from stac_fastapi.types.stac import Conformance
+
+EXTENSIONS = [
+    ContextExtension(),
+    FieldsExtension(),
+    FilterExtension(),
+    QueryExtension(),
+    SortExtension(),
+    TokenPaginationExtension(),
+]
+
+
+def conformance(**kwargs) -> Conformance:
+    """Conformance classes, computed like `BaseCoreClient.conformance`."""
+    conformance_classes = BASE_CONFORMANCE_CLASSES.copy()
+    for extension in EXTENSIONS:
+        conformance_classes.extend(getattr(extension, "conformance_classes", []))
+    return Conformance(conformsTo=list(set(conformance_classes)))
+
+
+def make_app(cached: bool) -> FastAPI:
+    """Build an application serving both documents."""
+    app = FastAPI(openapi_url="/api")
+    for extension in EXTENSIONS:
+        extension.register(app)
+    if cached:
+        update_openapi(app)
+        endpoint = create_document_endpoint(
+            conformance,
+            JSONResponse,
+            ConformanceClasses,
+            cache=DocumentCache(),
+            exclude_unset=True,
+            exclude_none=True,
+        )
+        app.add_api_route("/conformance", endpoint)
+        return app
+
+    async def openapi(req: Request) -> JSONResponse:
+        return VndOaiResponse(app.openapi())
+
+    app.router.routes = [r for r in app.router.routes if r.path != app.openapi_url]
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+    app.add_api_route(
+        "/conformance",
+        conformance,
+        response_model=ConformanceClasses,
+        response_model_exclude_unset=True,
+        response_model_exclude_none=True,
+    )
+    return app
+
+
+async def call(app: ASGIApp, path: str, headers: List[Tuple[bytes, bytes]]) -> Dict:
+    """Send a GET request to the application, returning its response start."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark-server"), *headers],
+    }
+    start = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+
+    await app(scope, receive, send)
+    return start
+
+
+def timed(app: ASGIApp, path: str, headers: list, count: int, rounds: int) -> float:
+    """Best wall clock time of `rounds` batches of `count` requests."""
+    loop = asyncio.get_event_loop()
+
+    async def batch():
+        for _ in range(count):
+            await call(app, path, headers)
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        loop.run_until_complete(batch())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(count: int, rounds: int):
+    """Print a timing table."""
+    loop = asyncio.get_event_loop()
+    print(f"{'document':<14}{'request':<16}{'serialized us':>15}{'cached us':>11}")
+    for path in ("/api", "/conformance"):
+        serialized, cached = make_app(cached=False), make_app(cached=True)
+        start = loop.run_until_complete(call(cached, path, []))
+        etag = dict(start["headers"])[b"etag"]
+        requests = {
+            "plain": [],
+            "brotli": [(b"accept-encoding", b"br")],
+            "if-none-match": [(b"if-none-match", etag)],
+        }
+        for name, headers in requests.items():
+            results = [
+                timed(app, path, headers, count, rounds) * 1e6 / count
+                for app in (serialized, cached)
+            ]
+            print(f"{path:<14}{name:<16}{results[0]:>15.1f}{results[1]:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    run(args.requests, args.rounds)
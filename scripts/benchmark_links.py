@@ -0,0 +1,113 @@
+"""Time the creation of inferred item links for large pages.
+
+Compares rendering links from the pre-rendered templates of a base url with joining
+every href against the base url, and reports the per-item cost of the link classes
+used by the sqlalchemy and pgstac backends.
+
+    python scripts/benchmark_links.py --items 10000
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict, List
+from urllib.parse import urljoin
+
+from starlette.requests import Request
+
+from stac_fastapi.pgstac.models import links as pgstac_links
+from stac_fastapi.types.links import ItemLinks, link_templates
+
+BASE_URL = "http://benchmark-server/"
+
+
+def make_request() -> Request:
+    """Build a POST /search request, as seen by the endpoint."""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": "/search",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark-server")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    return Request(scope, receive)
+
+
+def urljoin_links(collection_id: str, item_id: str) -> List[Dict]:
+    """Join every href against the base url."""
+    return [
+        {
+            "rel": "self",
+            "type": "application/geo+json",
+            "href": urljoin(BASE_URL, f"collections/{collection_id}/items/{item_id}"),
+        },
+        {
+            "rel": "parent",
+            "type": "application/json",
+            "href": urljoin(BASE_URL, f"collections/{collection_id}"),
+        },
+        {
+            "rel": "collection",
+            "type": "application/json",
+            "href": urljoin(BASE_URL, f"collections/{collection_id}"),
+        },
+        {"rel": "root", "type": "application/json", "href": BASE_URL},
+    ]
+
+
+def timed(func: Callable, rounds: int) -> float:
+    """Best wall clock time of `rounds` calls."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(count: int, rounds: int):
+    """Print a timing table."""
+    item_ids = [f"item-{i}" for i in range(count)]
+    request = make_request()
+    loop = asyncio.get_event_loop()
+
+    async def pgstac_page():
+        for item_id in item_ids:
+            await pgstac_links.ItemLinks(
+                collection_id="collection", item_id=item_id, request=request
+            ).get_links()
+
+    cases = {
+        "urljoin": lambda: [urljoin_links("collection", i) for i in item_ids],
+        "templates": lambda: [
+            link_templates(BASE_URL).item_links("collection", i) for i in item_ids
+        ],
+        "types.ItemLinks": lambda: [
+            ItemLinks(
+                collection_id="collection", item_id=i, base_url=BASE_URL
+            ).create_links()
+            for i in item_ids
+        ],
+        "pgstac.ItemLinks": lambda: loop.run_until_complete(pgstac_page()),
+    }
+
+    print(f"{'case':<20}{'items':>8}{'total ms':>12}{'us/item':>10}")
+    for name, func in cases.items():
+        elapsed = timed(func, rounds)
+        print(
+            f"{name:<20}{count:>8}{elapsed * 1e3:>12.1f}{elapsed * 1e6 / count:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    run(args.items, args.rounds)
@@ -0,0 +1,132 @@
+"""Time the parsing and validation of large POST /search bodies.
+
+Compares FastAPI's default route, decoding bodies with `json`, with `ORJSONRoute`,
+with and without the validation of `intersects` coordinates, for searches
+intersecting a polygon of `--vertices` vertices.
+
+    python scripts/benchmark_request_bodies.py --vertices 10000
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Type
+
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp
+
+from stac_fastapi.api.routes import ORJSONRoute, create_async_endpoint
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.search import BaseSearchPostRequest
+
+
+async def search(search_request: BaseSearchPostRequest, **kwargs):
+    """Endpoint returning nothing."""
+    return {}
+
+
+def make_app(route_class: Type[APIRoute], validate_geometries: bool) -> FastAPI:
+    """Build an application with a POST /search route."""
+    app = FastAPI()
+    app.state.settings = ApiSettings(validate_search_geometries=validate_geometries)
+    router = APIRouter(route_class=route_class)
+    router.add_api_route(
+        "/search",
+        create_async_endpoint(search, BaseSearchPostRequest),
+        methods=["POST"],
+    )
+    app.include_router(router)
+    return app
+
+
+def make_body(vertices: int) -> bytes:
+    """Search body intersecting a circle."""
+    ring = [
+        [
+            round(math.cos(2 * math.pi * i / vertices), 7),
+            round(math.sin(2 * math.pi * i / vertices), 7),
+        ]
+        for i in range(vertices)
+    ]
+    ring.append(ring[0])
+    return json.dumps(
+        {
+            "collections": ["collection"],
+            "intersects": {"type": "Polygon", "coordinates": [ring]},
+            "limit": 10,
+        }
+    ).encode()
+
+
+async def call(app: ASGIApp, body: bytes):
+    """Send a POST /search request to the application."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": "/search",
+        "raw_path": b"/search",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"benchmark-server"),
+            (b"content-type", b"application/json"),
+        ],
+        "app": app,
+    }
+    received = False
+    status = None
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a server, wait for the client to disconnect once the body is read
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, status
+
+
+def timed(app: ASGIApp, body: bytes, rounds: int) -> float:
+    """Best wall clock time of `rounds` requests."""
+    loop = asyncio.get_event_loop()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        loop.run_until_complete(call(app, body))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(vertices: int, rounds: int):
+    """Print a timing table."""
+    body = make_body(vertices)
+    cases = {
+        "APIRoute": make_app(APIRoute, True),
+        "ORJSONRoute": make_app(ORJSONRoute, True),
+        "ORJSONRoute fast": make_app(ORJSONRoute, False),
+    }
+
+    print(f"{'route':<20}{'vertices':>10}{'body kB':>10}{'ms/request':>12}")
+    for name, app in cases.items():
+        elapsed = timed(app, body, rounds)
+        print(f"{name:<20}{vertices:>10}{len(body) / 1e3:>10.0f}{elapsed * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vertices", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    run(args.vertices, args.rounds)
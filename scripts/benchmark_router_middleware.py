@@ -0,0 +1,163 @@
+"""Time the per-request overhead of router scoped middleware.
+
+Compares an application without middleware with the same application and a router
+scoped middleware added through the previous `router_middleware` implementation (a
+`BaseHTTPMiddleware` matching every route of the router on every request), the
+current `router_middleware` decorator and a pure ASGI middleware in
+`RouterMiddleware`.  Requests are sent straight to the ASGI application, both for a
+route of the router and for one outside of it.
+
+    python scripts/benchmark_router_middleware.py --requests 5000
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict
+
+from fastapi import APIRouter, FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.routing import Match
+from starlette.types import ASGIApp
+
+from stac_fastapi.api.middleware import RouterMiddleware, router_middleware
+
+# Paths of the routes in the scoped router, like those of the transaction extension
+ROUTER_PATHS = [
+    "/collections",
+    "/collections/{collection_id}",
+    "/collections/{collection_id}/items",
+    "/collections/{collection_id}/items/{item_id}",
+    "/collections/{collection_id}/bulk_items",
+]
+
+
+async def passthrough(request: Request, call_next):
+    """Function middleware doing nothing."""
+    return await call_next(request)
+
+
+def passthrough_asgi(app: ASGIApp) -> ASGIApp:
+    """ASGI middleware doing nothing."""
+
+    async def middleware(scope, receive, send):
+        await app(scope, receive, send)
+
+    return middleware
+
+
+def legacy_router_middleware(app: FastAPI, router: APIRouter):
+    """`router_middleware` before `RouterMiddleware`."""
+
+    def deco(func: Callable) -> Callable:
+        async def _middleware(request: Request, call_next):
+            matches = any(
+                [
+                    route.matches(request.scope)[0] == Match.FULL
+                    for route in router.routes
+                ]
+            )
+            if matches:
+                return await func(request, call_next)
+            else:
+                return await call_next(request)
+
+        app.add_middleware(BaseHTTPMiddleware, dispatch=_middleware)
+        return func
+
+    return deco
+
+
+def make_app(middleware: str) -> FastAPI:
+    """Build an application with a scoped router and a route outside of it."""
+    app = FastAPI()
+    router = APIRouter()
+    for path in ROUTER_PATHS:
+        for method in ("POST", "PUT", "DELETE"):
+            router.add_api_route(path, lambda: "ok", methods=[method])
+    app.include_router(router)
+    app.add_api_route("/search", lambda: "ok", methods=["GET"])
+
+    if middleware == "legacy":
+        legacy_router_middleware(app, router)(passthrough)
+    elif middleware == "router_middleware":
+        router_middleware(app, router)(passthrough)
+    elif middleware == "RouterMiddleware":
+        app.add_middleware(RouterMiddleware, router=router, middleware=passthrough_asgi)
+    return app
+
+
+async def call(app: ASGIApp, method: str, path: str):
+    """Send a request without a body to the application."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "server": ("benchmark-server", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark-server")],
+    }
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a server, wait for the client to disconnect once the body is read
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def timed(app: ASGIApp, method: str, path: str, count: int, rounds: int) -> float:
+    """Best wall clock time of `rounds` batches of `count` requests."""
+    loop = asyncio.get_event_loop()
+
+    async def batch():
+        for _ in range(count):
+            await call(app, method, path)
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        loop.run_until_complete(batch())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(count: int, rounds: int):
+    """Print a timing table."""
+    requests: Dict[str, tuple] = {
+        "outside router": ("GET", "/search"),
+        "router route": ("PUT", "/collections/c/items"),
+    }
+    baseline: Dict[str, float] = {}
+
+    print(f"{'middleware':<20}{'request':<16}{'us/request':>12}{'overhead us':>13}")
+    for middleware in ("none", "legacy", "router_middleware", "RouterMiddleware"):
+        app = make_app(middleware)
+        for name, (method, path) in requests.items():
+            elapsed = timed(app, method, path, count, rounds)
+            baseline.setdefault(name, elapsed)
+            overhead = (elapsed - baseline[name]) * 1e6 / count
+            print(
+                f"{middleware:<20}{name:<16}{elapsed * 1e6 / count:>12.1f}"
+                f"{overhead:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    run(args.requests, args.rounds)
@@ -0,0 +1,129 @@
+"""Compare the ORM and SQLAlchemy core read paths of the sqlalchemy backend.
+
+Loads synthetic items into a throwaway collection, then times `item_collection` and
+`post_search` with both read paths and reports the per-item overhead.  Connection
+settings are read from the usual POSTGRES_* environment variables.
+
+    python scripts/benchmark_sqlalchemy_reads.py --limits 1000 10000
+"""
+import argparse
+import copy
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from stac_fastapi.api.models import GeoJSONResponse
+from stac_fastapi.extensions.core import ContextExtension, FieldsExtension
+from stac_fastapi.sqlalchemy.config import SqlalchemySettings
+from stac_fastapi.sqlalchemy.core import CoreCrudClient
+from stac_fastapi.sqlalchemy.models import database
+from stac_fastapi.sqlalchemy.session import Session
+from stac_fastapi.sqlalchemy.transactions import (
+    BulkTransactionsClient,
+    TransactionsClient,
+)
+from stac_fastapi.types.config import Settings
+from stac_fastapi.types.search import BaseSearchPostRequest
+
+workingdir = Path(__file__).parent.absolute()
+testdata = workingdir.parent / "stac_fastapi" / "sqlalchemy" / "tests" / "data"
+
+COLLECTION_ID = "benchmark-reads"
+
+
+class BenchmarkRequest:
+    """Minimal stand-in for a starlette request."""
+
+    base_url = "http://benchmark-server/"
+    headers: Dict[str, str] = {}
+
+
+def synthetic_items(count: int) -> List[Dict]:
+    """Build `count` copies of the test item with unique ids and datetimes."""
+    with open(testdata / "test_item.json") as f:
+        template = json.load(f)
+    template["collection"] = COLLECTION_ID
+
+    start = datetime(2020, 1, 1)
+    items = []
+    for i in range(count):
+        item = copy.deepcopy(template)
+        item["id"] = f"benchmark-item-{i}"
+        item["properties"]["datetime"] = (start + timedelta(seconds=i)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        items.append(item)
+    return items
+
+
+def timed(func: Callable, rounds: int) -> float:
+    """Best wall clock time of `rounds` calls."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(limits: List[int], rounds: int):
+    """Load data and print a timing table."""
+    settings = SqlalchemySettings()
+    Settings.set(settings)
+    session = Session.create_from_settings(settings)
+    extensions = [ContextExtension(), FieldsExtension()]
+
+    with open(testdata / "test_collection.json") as f:
+        collection = json.load(f)
+    collection["id"] = COLLECTION_ID
+
+    transactions = TransactionsClient(session=session)
+    transactions.create_collection(collection, request=BenchmarkRequest)
+    BulkTransactionsClient(session=session).bulk_item_insert(
+        synthetic_items(max(limits)), chunk_size=1000
+    )
+
+    clients = {
+        "orm": CoreCrudClient(session=session, extensions=extensions),
+        "core": CoreCrudClient(
+            session=session, extensions=extensions, core_read_path=True
+        ),
+    }
+
+    try:
+        print(f"{'endpoint':<16}{'limit':>8}{'path':>6}{'total ms':>12}{'us/item':>10}")
+        for limit in limits:
+            search = BaseSearchPostRequest(collections=[COLLECTION_ID], limit=limit)
+            for name, client in clients.items():
+                endpoints = {
+                    "item_collection": lambda: GeoJSONResponse(
+                        client.item_collection(
+                            COLLECTION_ID, limit=limit, request=BenchmarkRequest
+                        )
+                    ),
+                    "post_search": lambda: GeoJSONResponse(
+                        client.post_search(search, request=BenchmarkRequest)
+                    ),
+                }
+                for endpoint, func in endpoints.items():
+                    elapsed = timed(func, rounds)
+                    print(
+                        f"{endpoint:<16}{limit:>8}{name:>6}"
+                        f"{elapsed * 1e3:>12.1f}{elapsed * 1e6 / limit:>10.1f}"
+                    )
+    finally:
+        items = database.Item.__table__
+        session.writer.cached_engine.execute(
+            items.delete().where(items.c.collection_id == COLLECTION_ID)
+        )
+        transactions.delete_collection(COLLECTION_ID, request=BenchmarkRequest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    run(args.limits, args.rounds)
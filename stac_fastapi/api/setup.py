@@ -7,9 +7,9 @@ with open("README.md") as f:
 
 install_requires = [
     "attrs",
-    "pydantic[dotenv]",
+    "pydantic[dotenv]>=1.9,<2",
     "stac_pydantic==2.0.*",
-    "brotli_asgi",
+    "brotli",
     "stac-fastapi.types",
 ]
 
@@ -23,6 +23,8 @@ extra_reqs = {
         "pystac[validation]==1.*",
     ],
     "docs": ["mkdocs", "mkdocs-material", "pdocs"],
+    "ingest": ["httpx"],
+    "zstd": ["zstandard"],
 }
 
 
@@ -49,4 +51,7 @@ setup(
     install_requires=install_requires,
     tests_require=extra_reqs["dev"],
     extras_require=extra_reqs,
+    entry_points={
+        "console_scripts": ["stac-fastapi-ingest=stac_fastapi.api.ingest:run [ingest]"]
+    },
 )
@@ -2,7 +2,6 @@
 from typing import Any, Callable, Dict, List, Optional, Type, Union
 
 import attr
-from brotli_asgi import BrotliMiddleware
 from fastapi import APIRouter, FastAPI
 from fastapi.openapi.utils import get_openapi
 from pydantic import BaseModel
@@ -12,6 +11,9 @@ from stac_pydantic.api.collections import Collections
 from stac_pydantic.version import STAC_VERSION
 from starlette.responses import JSONResponse, Response
 
+from stac_fastapi.api.coalesce import RequestCoalescer
+from stac_fastapi.api.compression import CompressionMiddleware
+from stac_fastapi.api.documents import DocumentCache, create_document_endpoint
 from stac_fastapi.api.errors import DEFAULT_STATUS_CODES, add_exception_handlers
 from stac_fastapi.api.middleware import MiddlewareConfig, append_runtime_middlewares
 from stac_fastapi.api.models import (
@@ -24,7 +26,11 @@ from stac_fastapi.api.models import (
     create_request_model,
 )
 from stac_fastapi.api.openapi import update_openapi
-from stac_fastapi.api.routes import create_async_endpoint, create_sync_endpoint
+from stac_fastapi.api.routes import (
+    ORJSONRoute,
+    create_async_endpoint,
+    create_sync_endpoint,
+)
 
 # TODO: make this module not depend on `stac_fastapi.extensions`
 from stac_fastapi.extensions.core import FieldsExtension, TokenPaginationExtension
@@ -56,6 +62,11 @@ class StacApi:
             certain exceptions (https://fastapi.tiangolo.com/tutorial/handling-errors/#install-custom-exception-handlers).
         app:
             The FastAPI application, defaults to a fresh application.
+        coalescer:
+            Shares client calls between concurrent identical search requests, if the `coalesce_searches` setting is
+            on.
+        documents:
+            Encoded responses of the documents which only change with the base url, like the conformance classes.
     """
 
     settings: ApiSettings = attr.ib()
@@ -75,7 +86,9 @@ class StacApi:
         ),
         converter=update_openapi,
     )
-    router: APIRouter = attr.ib(default=attr.Factory(APIRouter))
+    router: APIRouter = attr.ib(
+        default=attr.Factory(lambda: APIRouter(route_class=ORJSONRoute))
+    )
     title: str = attr.ib(default="stac-fastapi")
     api_version: str = attr.ib(default="0.1")
     stac_version: str = attr.ib(default=STAC_VERSION)
@@ -89,8 +102,10 @@ class StacApi:
     pagination_extension = attr.ib(default=TokenPaginationExtension)
     response_class: Type[Response] = attr.ib(default=JSONResponse)
     middlewares: List[MiddlewareConfig] = attr.ib(
-        default=attr.Factory(lambda: [MiddlewareConfig(BrotliMiddleware)])
+        default=attr.Factory(lambda: [MiddlewareConfig(CompressionMiddleware)])
     )
+    coalescer: RequestCoalescer = attr.ib(factory=RequestCoalescer)
+    documents: DocumentCache = attr.ib(init=False, factory=DocumentCache)
 
     def get_extension(self, extension: Type[ApiExtension]) -> Optional[ApiExtension]:
         """Get an extension.
@@ -111,8 +126,19 @@ class StacApi:
         func: Callable,
         request_type: Union[Type[APIRequest], Type[BaseModel]],
         resp_class: Type[Response],
+        coalesce: bool = False,
     ) -> Callable:
-        """Create a FastAPI endpoint."""
+        """Create a FastAPI endpoint.
+
+        With `coalesce`, and the `coalesce_searches` setting on, concurrent identical
+        requests share one call of `func` (see `RequestCoalescer`).
+        """
+        if coalesce and self.settings.coalesce_searches:
+            return create_async_endpoint(
+                self.coalescer.wrap(func, resp_class),
+                request_type,
+                response_class=resp_class,
+            )
         if isinstance(self.client, AsyncBaseCoreClient):
             return create_async_endpoint(func, request_type, response_class=resp_class)
         elif isinstance(self.client, BaseCoreClient):
@@ -135,8 +161,12 @@ class StacApi:
             response_model_exclude_unset=False,
             response_model_exclude_none=True,
             methods=["GET"],
-            endpoint=self._create_endpoint(
-                self.client.landing_page, EmptyRequest, self.response_class
+            endpoint=create_document_endpoint(
+                self.client.landing_page,
+                self.response_class,
+                LandingPage if self.settings.enable_response_models else None,
+                exclude_unset=False,
+                exclude_none=True,
             ),
         )
 
@@ -156,8 +186,13 @@ class StacApi:
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
             methods=["GET"],
-            endpoint=self._create_endpoint(
-                self.client.conformance, EmptyRequest, self.response_class
+            endpoint=create_document_endpoint(
+                self.client.conformance,
+                self.response_class,
+                ConformanceClasses if self.settings.enable_response_models else None,
+                cache=self.documents,
+                exclude_unset=True,
+                exclude_none=True,
             ),
         )
 
@@ -198,7 +233,10 @@ class StacApi:
             response_model_exclude_none=True,
             methods=["POST"],
             endpoint=self._create_endpoint(
-                self.client.post_search, self.search_post_request_model, GeoJSONResponse
+                self.client.post_search,
+                self.search_post_request_model,
+                GeoJSONResponse,
+                coalesce=True,
             ),
         )
 
@@ -220,7 +258,10 @@ class StacApi:
             response_model_exclude_none=True,
             methods=["GET"],
             endpoint=self._create_endpoint(
-                self.client.get_search, self.search_get_request_model, GeoJSONResponse
+                self.client.get_search,
+                self.search_get_request_model,
+                GeoJSONResponse,
+                coalesce=True,
             ),
         )
 
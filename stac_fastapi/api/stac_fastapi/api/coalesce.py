@@ -0,0 +1,132 @@
+"""Coalescing of identical concurrent requests."""
+import asyncio
+import importlib.util
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence, Type
+
+import attr
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+# Request headers changing the response to identical requests: the base url of links
+# (see the backends' `get_base_url_from_request`), the media type and the caller
+DEFAULT_VARY_HEADERS = (
+    "forwarded",
+    "x-forwarded-proto",
+    "x-forwarded-port",
+    "x-forwarded-host",
+    "accept",
+    "authorization",
+    "cookie",
+)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_none=True)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def canonical_json(value: Any) -> bytes:
+        """Serialize a request with sorted keys, so equal requests are equal bytes."""
+        return orjson.dumps(
+            value,
+            default=_default,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+
+else:
+
+    def canonical_json(value: Any) -> bytes:
+        """Serialize a request with sorted keys, so equal requests are equal bytes."""
+        return json.dumps(
+            value, default=_default, sort_keys=True, separators=(",", ":")
+        ).encode()
+
+
+@attr.s
+class RequestCoalescer:
+    """Share one in-flight client call between concurrent identical requests.
+
+    Requests are identical when they are for the same client method and base url,
+    have the same `vary_headers`, and their request models serialize to the same
+    canonical JSON: validated, with defaults filled in and keys sorted.  The first
+    request runs the call in a task of its own, so that its cancellation does not
+    fail the others, and every request waiting on it gets a copy of the encoded
+    response.  Streaming responses cannot be shared, so the waiting requests then
+    make calls of their own.  Errors are raised to every request.
+
+    Attributes:
+        vary_headers: request headers which are part of the identity of a request.
+        calls: client calls made.
+        shared: requests answered with the response of another request's call.
+    """
+
+    vary_headers: Sequence[str] = attr.ib(default=DEFAULT_VARY_HEADERS)
+    calls: int = attr.ib(default=0)
+    shared: int = attr.ib(default=0)
+    _inflight: Dict[Hashable, "asyncio.Future[Response]"] = attr.ib(
+        init=False, factory=dict
+    )
+
+    def key(self, func: Callable, request: Request, args: Any, kwargs: Any) -> Hashable:
+        """Identity of a call of `func` for a request."""
+        return (
+            func,
+            str(request.base_url),
+            tuple(request.headers.get(header) for header in self.vary_headers),
+            canonical_json([args, kwargs]),
+        )
+
+    def wrap(
+        self, func: Callable, response_class: Type[Response] = JSONResponse
+    ) -> Callable[..., Awaitable[Response]]:
+        """Coalesce the calls of a client method, sync or async.
+
+        The wrapped method returns the response, encoded with `response_class` if the
+        client method does not return a response itself.
+        """
+
+        async def call(*args: Any, request: Request, **kwargs: Any) -> Response:
+            if asyncio.iscoroutinefunction(func):
+                resp = await func(*args, request=request, **kwargs)
+            else:
+                resp = await run_in_threadpool(func, *args, request=request, **kwargs)
+            return resp if isinstance(resp, Response) else response_class(resp)
+
+        async def coalesced(*args: Any, request: Request, **kwargs: Any) -> Response:
+            key = self.key(func, request, args, kwargs)
+            task = self._inflight.get(key)
+            if task is None:
+                self.calls += 1
+                task = asyncio.ensure_future(call(*args, request=request, **kwargs))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+                return await asyncio.shield(task)
+
+            resp = await asyncio.shield(task)
+            if not hasattr(resp, "body"):
+                self.calls += 1
+                return await call(*args, request=request, **kwargs)
+            self.shared += 1
+            logger.debug("shared the response of %s with an identical request", func)
+            return copy_response(resp)
+
+        return coalesced
+
+
+def copy_response(resp: Response) -> Response:
+    """Response with the status, headers and encoded body of another."""
+    copy = Response(resp.body, status_code=resp.status_code)
+    copy.raw_headers = list(resp.raw_headers)
+    return copy
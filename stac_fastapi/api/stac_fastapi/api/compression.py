@@ -0,0 +1,386 @@
+"""Response compression adapting to the response size and the CPU load."""
+import importlib.util
+import logging
+import time
+import zlib
+from functools import partial
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import attr
+import brotli
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Functions compressing chunks of a response, flushing the output of the chunks so
+# far, and finishing the stream
+Compressor = Tuple[Callable[[bytes], bytes], Callable[[], bytes], Callable[[], bytes]]
+
+
+def gzip_compressor(level: int) -> Compressor:
+    """Gzip compressor."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (
+        compressor.compress,
+        partial(compressor.flush, zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def brotli_compressor(level: int) -> Compressor:
+    """Brotli compressor."""
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+COMPRESSORS: Dict[str, Callable[[int], Compressor]] = {
+    "br": brotli_compressor,
+    "gzip": gzip_compressor,
+}
+
+if importlib.util.find_spec("zstandard") is not None:
+    import zstandard
+
+    def zstd_compressor(level: int) -> Compressor:
+        """Zstandard compressor."""
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        return (
+            compressor.compress,
+            partial(compressor.flush, zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+    COMPRESSORS["zstd"] = zstd_compressor
+
+# Compression levels of each encoding, for small responses and for large responses
+# or a busy process
+DEFAULT_LEVELS: Dict[str, Tuple[int, int]] = {
+    "br": (4, 1),
+    "gzip": (6, 1),
+    "zstd": (3, 1),
+}
+
+# Encodings by preference, when the client accepts several equally.  At their fast
+# levels, brotli compresses STAC JSON faster and smaller than gzip.
+PREFERRED_ENCODINGS = ("br", "zstd", "gzip")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Quality value of each content coding listed in an Accept-Encoding header."""
+    codings: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(
+    accepted: Dict[str, float], encodings: Sequence[str]
+) -> Optional[str]:
+    """Encoding the client prefers, in the order of `encodings` on ties."""
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether a media type is text, worth compressing."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith(
+        ("json", "json-seq", "xml", "javascript")
+    )
+
+
+@attr.s
+class CpuLoad:
+    """CPU time used by the process per second of wall time.
+
+    Sampled at most every `interval` seconds; 1.0 is one core fully busy.
+    """
+
+    interval: float = attr.ib(default=1.0)
+    _wall: float = attr.ib(init=False, factory=time.monotonic)
+    _cpu: float = attr.ib(init=False, factory=time.process_time)
+    _load: float = attr.ib(init=False, default=0.0)
+
+    def __call__(self) -> float:
+        """Load over the last sampling interval."""
+        now = time.monotonic()
+        if now - self._wall >= self.interval:
+            cpu = time.process_time()
+            self._load = (cpu - self._cpu) / (now - self._wall)
+            self._wall, self._cpu = now, cpu
+        return self._load
+
+
+@attr.s
+class EncodingStats:
+    """Bytes compressed with an encoding, and the time spent on it."""
+
+    responses: int = attr.ib(default=0)
+    bytes_in: int = attr.ib(default=0)
+    bytes_out: int = attr.ib(default=0)
+    seconds: float = attr.ib(default=0.0)
+
+    @property
+    def ratio(self) -> float:
+        """Compression ratio, uncompressed over compressed size."""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+
+@attr.s
+class CompressionStats:
+    """Compression ratio and time per encoding, summed over responses.
+
+    Attributes:
+        encodings: stats of each encoding used.
+        small: compressible responses sent as is for being under `minimum_size`.
+        overloaded: compressible responses sent as is because of the CPU load.
+    """
+
+    encodings: Dict[str, EncodingStats] = attr.ib(factory=dict)
+    small: int = attr.ib(default=0)
+    overloaded: int = attr.ib(default=0)
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, seconds: float):
+        """Add a compressed response."""
+        stats = self.encodings.setdefault(encoding, EncodingStats())
+        stats.responses += 1
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        stats.seconds += seconds
+
+    def report(self) -> str:
+        """Summary of ratios and times per encoding."""
+        lines = [
+            f"{encoding}: {stats.responses} responses, ratio {stats.ratio:.1f}, "
+            f"{stats.seconds * 1e3:.1f} ms, "
+            f"{stats.bytes_in / stats.seconds / 1e6 if stats.seconds else 0:.0f} MB/s"
+            for encoding, stats in self.encodings.items()
+        ]
+        lines.append(f"uncompressed: {self.small} small, {self.overloaded} overloaded")
+        return "\n".join(lines)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing text responses with br, gzip or zstd.
+
+    The encoding is negotiated from the request's Accept-Encoding, in the order of
+    `PREFERRED_ENCODINGS` on ties.  Responses under `minimum_size` bytes are sent as
+    is, and so is every response while the process CPU load is `max_load` or more.
+    Responses of `large_size` bytes or more, streaming responses and any response
+    while the load is `busy_load` or more are compressed at the fast level instead.
+    `levels` maps each encoding offered to its level and fast level, and defaults
+    to `DEFAULT_LEVELS` for the encodings installed (zstd needs `zstandard`).
+    Streaming responses are compressed chunk by chunk, and each chunk is flushed so
+    clients can decode it as soon as it arrives.  Chunks of `threadpool_size` bytes
+    or more are compressed in the threadpool, so the event loop keeps serving
+    requests.
+
+    Responses which already have a Content-Encoding, or whose media type is not
+    text, are passed through.  Ratios and times are added to `stats`, and buffered
+    responses report their compression time in a Server-Timing header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        large_size: int = 1024 * 1024,
+        busy_load: float = 0.5,
+        max_load: float = 0.9,
+        levels: Optional[Dict[str, Tuple[int, int]]] = None,
+        threadpool_size: int = 256 * 1024,
+        stats: Optional[CompressionStats] = None,
+        cpu_load: Optional[Callable[[], float]] = None,
+    ):
+        """Configure the compression policy."""
+        self.app = app
+        self.minimum_size = minimum_size
+        self.large_size = large_size
+        self.busy_load = busy_load
+        self.max_load = max_load
+        self.levels = DEFAULT_LEVELS if levels is None else levels
+        self.compressors = {
+            encoding: compressor
+            for encoding, compressor in COMPRESSORS.items()
+            if encoding in self.levels
+        }
+        self.threadpool_size = threadpool_size
+        self.stats = CompressionStats() if stats is None else stats
+        self.cpu_load = CpuLoad() if cpu_load is None else cpu_load
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response if the client accepts an encoding."""
+        if scope["type"] == "http":
+            accepted = parse_accept_encoding(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+            if choose_encoding(accepted, list(self.compressors)) is not None:
+                responder = CompressionResponder(self, accepted, send)
+                await self.app(scope, receive, responder.send)
+                return
+        await self.app(scope, receive, send)
+
+    async def compress(self, func: Callable[[bytes], bytes], data: bytes) -> bytes:
+        """Compress a chunk, in the threadpool if it is large."""
+        if len(data) >= self.threadpool_size:
+            return await run_in_threadpool(func, data)
+        return func(data)
+
+    def choose(
+        self, accepted: Dict[str, float], size: Optional[int]
+    ) -> Tuple[Optional[str], int]:
+        """Encoding and level of a response of `size` bytes (None if streaming)."""
+        load = self.cpu_load()
+        if load >= self.max_load:
+            return None, 0
+        fast = size is None or size >= self.large_size or load >= self.busy_load
+        encoding = choose_encoding(
+            accepted, [e for e in PREFERRED_ENCODINGS if e in self.compressors]
+        )
+        if encoding is None:
+            return None, 0
+        return encoding, self.levels[encoding][1 if fast else 0]
+
+
+class CompressionResponder:
+    """Compress the response to a request, as its messages are sent."""
+
+    def __init__(
+        self, middleware: CompressionMiddleware, accepted: Dict[str, float], send: Send
+    ):
+        """Wrap the `send` of a request."""
+        self.middleware = middleware
+        self.accepted = accepted
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.encoding: Optional[str] = None
+        self.compressor: Optional[Compressor] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    async def send(self, message: Message) -> None:
+        """Hold the response start until the first body chunk decides the encoding."""
+        if message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+        elif self.compressor is None:
+            await self.send_first(message)
+        else:
+            await self.send_chunk(message)
+
+    async def send_first(self, message: Message) -> None:
+        """Choose the encoding, and send the response start and first chunk."""
+        assert self.start is not None
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.passthrough = True
+        if "content-encoding" in headers or not is_compressible(
+            headers.get("content-type", "")
+        ):
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        stats = self.middleware.stats
+        if not more_body and len(body) < self.middleware.minimum_size:
+            stats.small += 1
+            encoding, level = None, 0
+        else:
+            size = None if more_body else len(body)
+            encoding, level = self.middleware.choose(self.accepted, size)
+            if encoding is None:
+                stats.overloaded += 1
+        if encoding is None:
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        self.passthrough = False
+        self.encoding = encoding
+        self.compressor = self.middleware.compressors[encoding](level)
+        compressed = await self.compress(body, more_body)
+        headers["Content-Encoding"] = encoding
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(compressed))
+            timing = (
+                f'compress;dur={self.seconds * 1e3:.2f};desc="{encoding} {level}, '
+                f'ratio {len(body) / max(len(compressed), 1):.1f}"'
+            )
+            existing = headers.get("server-timing")
+            headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        await self._send(self.start)
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+        if not more_body:
+            self.finish()
+
+    async def send_chunk(self, message: Message) -> None:
+        """Compress and send the next chunk of a streaming response."""
+        more_body = message.get("more_body", False)
+        compressed = await self.compress(message.get("body", b""), more_body)
+        if compressed or not more_body:
+            await self._send(
+                {
+                    "type": "http.response.body",
+                    "body": compressed,
+                    "more_body": more_body,
+                }
+            )
+        if not more_body:
+            self.finish()
+
+    async def compress(self, body: bytes, more_body: bool) -> bytes:
+        """Compress a chunk, and flush it so it can be decoded before the next one."""
+        assert self.compressor is not None
+        compress, flush, finish = self.compressor
+        started = time.perf_counter()
+        compressed = await self.middleware.compress(compress, body)
+        if not more_body:
+            compressed += finish()
+        elif body:
+            compressed += flush()
+        self.seconds += time.perf_counter() - started
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def finish(self):
+        """Record the compression of the whole response."""
+        assert self.encoding is not None
+        self.middleware.stats.record(
+            self.encoding, self.bytes_in, self.bytes_out, self.seconds
+        )
+        logger.debug(
+            "compressed %s bytes to %s with %s in %.2f ms",
+            self.bytes_in,
+            self.bytes_out,
+            self.encoding,
+            self.seconds * 1e3,
+        )
@@ -0,0 +1,152 @@
+"""Encoded documents answered with strong ETags."""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple, Type
+
+import attr
+import brotli
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from stac_fastapi.api.compression import choose_encoding, parse_accept_encoding
+from stac_fastapi.api.models import _dumps
+
+
+def etag_matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """Whether an If-None-Match header matches any of `etags` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in candidates}
+    return not candidates.isdisjoint(etags)
+
+
+@attr.s(frozen=True)
+class EncodedDocument:
+    """A JSON document encoded once, with its strong ETag.
+
+    Attributes:
+        body: the encoded document.
+        media_type: content type of the document.
+        etag: strong entity tag of `body`.
+        brotli: `body` compressed with brotli, sent to clients accepting `br`.
+    """
+
+    body: bytes = attr.ib()
+    media_type: str = attr.ib()
+    etag: str = attr.ib()
+    brotli: Optional[bytes] = attr.ib(default=None)
+
+    @classmethod
+    def encode(
+        cls, content: Any, media_type: str, compress: bool = False
+    ) -> "EncodedDocument":
+        """Encode a document, and compress it too if `compress` is set."""
+        body = _dumps(content)
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return cls(
+            body=body,
+            media_type=media_type,
+            etag=etag,
+            brotli=brotli.compress(body) if compress else None,
+        )
+
+    @property
+    def brotli_etag(self) -> str:
+        """Entity tag of the brotli compressed document."""
+        return self.etag[:-1] + '-br"'
+
+    def response(self, request: Request) -> Response:
+        """Answer a request with the document, or `304 Not Modified`."""
+        etag, body = self.etag, self.body
+        etags = [self.etag]
+        if self.brotli is not None:
+            etags.append(self.brotli_etag)
+            accepted = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+            if choose_encoding(accepted, ["br"]):
+                etag, body = self.brotli_etag, self.brotli
+        headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+        if etag_matches(request.headers.get("if-none-match"), etags):
+            return Response(status_code=304, headers=headers)
+        if body is self.brotli:
+            headers["Content-Encoding"] = "br"
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+@attr.s
+class DocumentCache:
+    """Encoded documents by name, base url and root path.
+
+    Base urls come from request headers, so only the `max_entries` most recently
+    used documents are kept.
+    """
+
+    max_entries: int = attr.ib(default=64)
+    _documents: "OrderedDict[Tuple[str, str, str], EncodedDocument]" = attr.ib(
+        init=False, factory=OrderedDict
+    )
+
+    async def get(
+        self,
+        name: str,
+        request: Request,
+        render: Callable[[Request], Awaitable[EncodedDocument]],
+    ) -> EncodedDocument:
+        """Get a document, rendering it for the request if it is not cached yet."""
+        key = (name, str(request.base_url), request.scope.get("root_path", ""))
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            return document
+
+        document = await render(request)
+        self._documents[key] = document
+        if len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+        return document
+
+
+def create_document_endpoint(
+    func: Callable,
+    response_class: Type[Response],
+    response_model: Optional[Type[BaseModel]] = None,
+    cache: Optional[DocumentCache] = None,
+    **encoder_kwargs: Any,
+) -> Callable[[Request], Awaitable[Response]]:
+    """Create an endpoint answering with the document returned by a client method.
+
+    The document is validated against `response_model`, if any, and encoded with
+    `response_class`'s media type.  With a `cache` it is rendered once per base url
+    and root path, and compressed, otherwise on every request.  Either way a request
+    whose If-None-Match has the document's ETag is answered with `304 Not Modified`.
+    """
+
+    async def render(request: Request) -> EncodedDocument:
+        if asyncio.iscoroutinefunction(func):
+            content = await func(request=request)
+        else:
+            content = await run_in_threadpool(func, request=request)
+        if response_model is not None:
+            content = jsonable_encoder(
+                response_model.parse_obj(content), **encoder_kwargs
+            )
+        return EncodedDocument.encode(
+            content, response_class.media_type, compress=cache is not None
+        )
+
+    async def _endpoint(request: Request) -> Response:
+        """Endpoint."""
+        if cache is None:
+            document = await render(request)
+        else:
+            document = await cache.get(func.__name__, request, render)
+        return document.response(request)
+
+    return _endpoint
@@ -13,6 +13,7 @@ from stac_fastapi.types.errors import (
     ConflictError,
     DatabaseError,
     ForeignKeyError,
+    InvalidPatchError,
     InvalidQueryParameter,
     NotFoundError,
 )
@@ -27,6 +28,7 @@ DEFAULT_STATUS_CODES = {
     DatabaseError: status.HTTP_424_FAILED_DEPENDENCY,
     Exception: status.HTTP_500_INTERNAL_SERVER_ERROR,
     InvalidQueryParameter: status.HTTP_400_BAD_REQUEST,
+    InvalidPatchError: status.HTTP_400_BAD_REQUEST,
 }
 
 
@@ -0,0 +1,332 @@
+"""Load STAC collections and items into a running stac-fastapi application.
+
+    stac-fastapi-ingest http://localhost:8080 items/ --collection collection.json
+
+Items are read from NDJSON files, FeatureCollections, single Features, or
+directories of them, and sent with bounded concurrency, either one at a time to
+`POST /collections/{collection_id}/items` or in NDJSON batches to the bulk
+transactions extension's `bulk_items` endpoint.  Batches accepted by background
+ingest jobs are followed until the job finishes.  Every item loaded is appended
+to the checkpoint file, so an interrupted ingest resumes where it stopped.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import attr
+import httpx
+
+from stac_fastapi.api.models import NDJSON_MEDIA_TYPE
+
+# Suffixes of the files read from directories
+ITEM_FILE_SUFFIXES = (".json", ".geojson", ".ndjson", ".jsonl")
+
+
+def iter_items(path: Path) -> Iterator[Dict[str, Any]]:
+    """Read STAC items from a file or, recursively, a directory of files."""
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file() and child.suffix in ITEM_FILE_SUFFIXES:
+                yield from iter_items(child)
+        return
+
+    if path.suffix in (".ndjson", ".jsonl"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("type") == "FeatureCollection":
+        yield from data["features"]
+    elif data.get("type") == "Feature":
+        yield data
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Key of an item in the checkpoint file."""
+    return f"{item.get('collection')}/{item['id']}"
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+@attr.s
+class IngestStats:
+    """Counts and request latencies of an ingest."""
+
+    loaded: int = attr.ib(default=0)
+    failed: int = attr.ib(default=0)
+    skipped: int = attr.ib(default=0)
+    resumed: int = attr.ib(default=0)
+    latencies: List[float] = attr.ib(factory=list)
+    started: float = attr.ib(factory=time.perf_counter)
+
+    def report(self) -> str:
+        """Summary of throughput and latencies."""
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        rate = self.loaded / elapsed if elapsed else 0.0
+        lines = [
+            f"loaded {self.loaded} items in {elapsed:.1f}s ({rate:.1f} items/s)",
+            f"failed {self.failed}, skipped {self.skipped}, "
+            f"already loaded {self.resumed}",
+        ]
+        if latencies:
+            lines.append(
+                f"{len(latencies)} requests, latency ms "
+                + " ".join(
+                    f"p{q}={percentile(latencies, q) * 1e3:.1f}" for q in (50, 95, 99)
+                )
+                + f" max={latencies[-1] * 1e3:.1f}"
+            )
+        return "\n".join(lines)
+
+
+@attr.s
+class Ingester:
+    """Send items to a stac-fastapi application.
+
+    Attributes:
+        client: http client whose base url is the application's root.
+        concurrency: most requests in flight at once.
+        bulk: send items in NDJSON batches of `batch_size` to the bulk items
+            endpoint, retrying the items of failed batches one at a time.
+        job_poll_interval: seconds between polls of the ingest job loading a batch,
+            when the bulk items endpoint answers `202 Accepted`.
+        on_conflict: `update` items which already exist, `skip` them or `fail`.
+            The bulk items endpoint always updates them, so only `update` can be
+            used with `bulk`.
+        checkpoint: file listing the items already loaded.
+        drop_fields: top level item fields removed before sending.
+    """
+
+    client: httpx.AsyncClient = attr.ib()
+    concurrency: int = attr.ib(default=8)
+    bulk: bool = attr.ib(default=False)
+    batch_size: int = attr.ib(default=500)
+    job_poll_interval: float = attr.ib(default=1.0)
+    on_conflict: str = attr.ib(default="update")
+    checkpoint: Optional[Path] = attr.ib(default=None)
+    drop_fields: Sequence[str] = attr.ib(default=())
+    stats: IngestStats = attr.ib(factory=IngestStats)
+    _done: Set[str] = attr.ib(init=False, factory=set)
+
+    def __attrs_post_init__(self):
+        """Read the items loaded by previous runs."""
+        if self.bulk and self.on_conflict != "update":
+            raise ValueError("bulk ingests always update existing items")
+        if self.checkpoint is not None and self.checkpoint.exists():
+            with open(self.checkpoint) as f:
+                self._done = {line.rstrip("\n") for line in f if line.strip()}
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        resp = await self.client.request(method, url, **kwargs)
+        self.stats.latencies.append(time.perf_counter() - start)
+        return resp
+
+    def _checkpoint(self, items: List[Dict[str, Any]]):
+        if self.checkpoint is not None:
+            with open(self.checkpoint, "a") as f:
+                f.writelines(item_key(item) + "\n" for item in items)
+
+    def _loaded(self, items: List[Dict[str, Any]]):
+        self.stats.loaded += len(items)
+        self._checkpoint(items)
+
+    async def load_collection(self, collection: Dict[str, Any]):
+        """Create a collection, updating it if it already exists."""
+        resp = await self._request("POST", "collections", json=collection)
+        if resp.status_code == 409:
+            resp = await self._request("PUT", "collections", json=collection)
+        resp.raise_for_status()
+
+    async def load_items(self, items: Iterable[Dict[str, Any]]):
+        """Send items which are not in the checkpoint yet."""
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Future] = set()
+        errors: List[BaseException] = []
+
+        def done(task: asyncio.Future):
+            slots.release()
+            tasks.discard(task)
+            # Finished tasks are dropped, keep their errors for the end of the ingest
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+
+        async def start(coro):
+            await slots.acquire()
+            task = asyncio.ensure_future(coro)
+            tasks.add(task)
+            task.add_done_callback(done)
+
+        batches: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            if item_key(item) in self._done:
+                self.stats.resumed += 1
+                continue
+            for field in self.drop_fields:
+                item.pop(field, None)
+            if not self.bulk:
+                await start(self._send_item(item))
+                continue
+            batch = batches.setdefault(item["collection"], [])
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await start(self._send_batch(batches.pop(item["collection"])))
+        for batch in batches.values():
+            await start(self._send_batch(batch))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if errors:
+            raise errors[0]
+
+    async def _send_item(self, item: Dict[str, Any]):
+        url = f"collections/{item['collection']}/items"
+        try:
+            resp = await self._request("POST", url, json=item)
+            if resp.status_code == 409 and self.on_conflict == "skip":
+                self.stats.skipped += 1
+                self._checkpoint([item])
+                return
+            if resp.status_code == 409 and self.on_conflict == "update":
+                resp = await self._request("PUT", url, json=item)
+            resp.raise_for_status()
+        except Exception as e:
+            self.stats.failed += 1
+            print(f"failed to load item {item_key(item)}: {e}", file=sys.stderr)
+            return
+        self._loaded([item])
+
+    async def _send_batch(self, items: List[Dict[str, Any]]):
+        body = b"".join(json.dumps(item).encode() + b"\n" for item in items)
+        try:
+            resp = await self._request(
+                "POST",
+                f"collections/{items[0]['collection']}/bulk_items",
+                content=gzip.compress(body),
+                headers={
+                    "content-type": NDJSON_MEDIA_TYPE,
+                    "content-encoding": "gzip",
+                },
+            )
+            resp.raise_for_status()
+            failed = []
+            if resp.status_code == 202:
+                failed = await self._wait_for_job(resp.headers["location"], items)
+        except Exception:
+            # Unexpected responses, such as an invalid job, also fail the batch
+            failed = items
+        # Items are only checkpointed once they are known to be loaded
+        failed_keys = {item_key(item) for item in failed}
+        self._loaded([item for item in items if item_key(item) not in failed_keys])
+        for item in failed:
+            await self._send_item(item)
+
+    async def _wait_for_job(
+        self, url: str, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Poll an ingest job until it finishes, returning the items it failed.
+
+        Every item is reported failed if the job failed, or if it failed more items
+        than it lists.
+        """
+        while True:
+            resp = await self.client.get(url)
+            resp.raise_for_status()
+            job = resp.json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            await asyncio.sleep(self.job_poll_interval)
+        if job["status"] == "failed" or job["items_failed"] > len(job["failures"]):
+            return items
+        failed_ids = {failure["id"] for failure in job["failures"]}
+        return [item for item in items if item["id"] in failed_ids]
+
+
+async def ingest(args: argparse.Namespace) -> IngestStats:
+    """Run an ingest described by command line arguments."""
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url.rstrip("/") + "/", timeout=args.timeout, limits=limits
+    ) as client:
+        ingester = Ingester(
+            client=client,
+            concurrency=args.concurrency,
+            bulk=args.bulk,
+            batch_size=args.batch_size,
+            on_conflict=args.on_conflict,
+            checkpoint=args.checkpoint,
+            drop_fields=args.drop_field,
+        )
+        for path in args.collection:
+            with open(path) as f:
+                await ingester.load_collection(json.load(f))
+        await ingester.load_items(
+            item for source in args.sources for item in iter_items(source)
+        )
+    return ingester.stats
+
+
+def run(argv: Optional[Sequence[str]] = None):
+    """Run an ingest from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="stac-fastapi-ingest", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("url", help="root url of the stac-fastapi application")
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        help="NDJSON, FeatureCollection or Feature files, or directories of them",
+    )
+    parser.add_argument(
+        "--collection",
+        action="append",
+        type=Path,
+        default=[],
+        help="collection file, created or updated before the items",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--bulk", action="store_true", help="use the bulk items endpoint"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--on-conflict", choices=("update", "skip", "fail"), default="update"
+    )
+    parser.add_argument(
+        "--checkpoint", type=Path, help="file recording loaded items, for resuming"
+    )
+    parser.add_argument(
+        "--drop-field",
+        action="append",
+        default=[],
+        help="top level item field to remove before sending",
+    )
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args(argv)
+    if args.bulk and args.on_conflict != "update":
+        parser.error("--bulk always updates existing items, use --on-conflict update")
+
+    stats = asyncio.run(ingest(args))
+    print(stats.report())
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
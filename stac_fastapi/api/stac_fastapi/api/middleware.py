@@ -1,37 +1,114 @@
 """api middleware."""
 
+import re
+from functools import partial
 from json import loads
 from logging import getLogger
 from os import environ, path
-from typing import Any, Callable, Dict, Final, List, Optional
+from typing import Any, Callable, Dict, Final, List, Optional, Pattern, Sequence
 
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.routing import Match
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger: Final = getLogger(__file__)
 
+# Key of the dispatch table entry for routes which accept any method
+ANY_METHOD: Final = "*"
+
+
+def compile_dispatch_table(routes: Sequence[BaseRoute]) -> Dict[str, Pattern]:
+    """Combine the path regexes of routes into one regex per http method.
+
+    Named groups are made anonymous, as a regex may only use each name once, so the
+    table tells whether a path matches a route without extracting its parameters.
+    Routes without methods (mounts) are listed under `ANY_METHOD`.
+    """
+    patterns: Dict[str, List[str]] = {}
+    for route in routes:
+        path_regex = getattr(route, "path_regex", None)
+        if path_regex is None:
+            continue
+        pattern = re.sub(r"\(\?P<\w+>", "(?:", path_regex.pattern)
+        for method in getattr(route, "methods", None) or [ANY_METHOD]:
+            patterns.setdefault(method, []).append(pattern)
+    return {
+        method: re.compile("|".join(f"(?:{p})" for p in method_patterns))
+        for method, method_patterns in patterns.items()
+    }
+
+
+class RouterMiddleware:
+    """Pure ASGI middleware applying another middleware to the routes of a router.
+
+    `middleware` is called with the wrapped application, like the classes given to
+    `app.add_middleware`, and only handles http requests whose method and path match
+    one of the router's routes; all other requests go straight to the application.
+    Routes are matched against a dispatch table compiled on the first request, with
+    a single regex match per request.  Routes added to the router after the middleware
+    (starlette 0.14 builds the middleware stack in `add_middleware`) are included, but
+    not those added once requests are served.  Assumes no router prefix.
+
+        app.add_middleware(
+            RouterMiddleware,
+            router=router,
+            middleware=partial(GZipMiddleware, minimum_size=1000),
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        router: APIRouter,
+        middleware: Callable[[ASGIApp], ASGIApp],
+    ):
+        """Wrap the application in the middleware."""
+        self.app = app
+        self.router = router
+        self.router_app = middleware(app)
+        self._dispatch_table: Optional[Dict[str, Pattern]] = None
+
+    @property
+    def dispatch_table(self) -> Dict[str, Pattern]:
+        """Dispatch table of the router's routes, compiled on first use."""
+        if self._dispatch_table is None:
+            self._dispatch_table = compile_dispatch_table(self.router.routes)
+        return self._dispatch_table
+
+    def matches(self, scope: Scope) -> bool:
+        """Whether a request is for one of the router's routes."""
+        path = scope["path"]
+        dispatch_table = self.dispatch_table
+        pattern = dispatch_table.get(scope["method"])
+        if pattern is not None and pattern.match(path):
+            return True
+        any_method = dispatch_table.get(ANY_METHOD)
+        return any_method is not None and bool(any_method.match(path))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send requests for the router's routes through the middleware."""
+        if scope["type"] == "http" and self.matches(scope):
+            await self.router_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
 
 def router_middleware(app: FastAPI, router: APIRouter):
-    """Add middleware to a specific router, assumes no router prefix."""
+    """Add middleware to a specific router, assumes no router prefix.
 
-    def deco(func: Callable) -> Callable:
-        async def _middleware(request: Request, call_next):
-            # Check if scopes match
-            matches = any(
-                [
-                    route.matches(request.scope)[0] == Match.FULL
-                    for route in router.routes
-                ]
-            )
-            if matches:  # Run the middleware if they do
-                return await func(request, call_next)
-            else:  # Otherwise skip the middleware
-                return await call_next(request)
+    The decorated `func(request, call_next)` runs in a `BaseHTTPMiddleware`, which
+    only requests for the router's routes go through (see `RouterMiddleware`).
+    Middlewares written as ASGI applications should use `RouterMiddleware` directly.
+    """
 
-        app.add_middleware(BaseHTTPMiddleware, dispatch=_middleware)
+    def deco(func: Callable) -> Callable:
+        app.add_middleware(
+            RouterMiddleware,
+            router=router,
+            middleware=partial(BaseHTTPMiddleware, dispatch=func),
+        )
         return func
 
     return deco
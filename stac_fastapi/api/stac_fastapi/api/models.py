@@ -1,12 +1,15 @@
 """api request/response models."""
 
 import importlib.util
-from typing import Optional, Type, Union
+import json
+from typing import Any, AsyncIterable, Dict, Iterable, Optional, Type, Union
 
 import attr
 from fastapi import Body, Path
 from pydantic import BaseModel, create_model
 from pydantic.fields import UndefinedType
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
 from stac_fastapi.types.extension import ApiExtension
 from stac_fastapi.types.search import (
@@ -111,6 +114,18 @@ class ItemUri(CollectionUri):
     item_id: str = attr.ib(default=Path(..., description="Item ID"))
 
 
+MERGE_PATCH_MEDIA_TYPE = "application/merge-patch+json"
+
+
+@attr.s
+class ItemPatch(ItemUri):
+    """Patch item."""
+
+    patch: Dict[str, Any] = attr.ib(
+        default=Body(..., media_type=MERGE_PATCH_MEDIA_TYPE, description="Merge patch")
+    )
+
+
 @attr.s
 class EmptyRequest(APIRequest):
     """Empty request."""
@@ -160,7 +175,6 @@ if importlib.util.find_spec("orjson") is not None:
 
         media_type = "application/geo+json"
 
-
 else:
     from starlette.responses import JSONResponse
 
@@ -168,3 +182,86 @@ else:
         """JSON with custom, vendor content-type."""
 
         media_type = "application/geo+json"
+
+
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def _dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+
+else:
+
+    def _dumps(content: Any) -> bytes:
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+GEOJSON_SEQ_MEDIA_TYPE = "application/geo+json-seq"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAMING_MEDIA_TYPES = (GEOJSON_SEQ_MEDIA_TYPE, NDJSON_MEDIA_TYPE)
+
+
+def streaming_media_type(request: Request) -> Optional[str]:
+    """Return the streaming media type preferred by the `Accept` header, if any.
+
+    Only the most preferred media type is considered, so clients asking for
+    `application/geo+json` (or `*/*`) first keep receiving an ItemCollection.
+    """
+    if not isinstance(request, Request):
+        return None
+    accept = request.headers.get("accept")
+    if not accept:
+        return None
+
+    ranges = []
+    for position, value in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in value.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        ranges.append((-quality, position, media_type.lower()))
+
+    _, _, preferred = min(ranges)
+    return preferred if preferred in STREAMING_MEDIA_TYPES else None
+
+
+class GeoJSONSeqResponse(StreamingResponse):
+    """Stream features one at a time.
+
+    Features are written as GeoJSON text sequences (RFC 8142) or, when requested
+    with `application/x-ndjson`, as newline delimited JSON.  Accepts both sync and
+    async iterables of features.
+    """
+
+    media_type = GEOJSON_SEQ_MEDIA_TYPE
+
+    def __init__(
+        self,
+        features: Union[Iterable[Any], AsyncIterable[Any]],
+        media_type: Optional[str] = None,
+        **kwargs,
+    ):
+        """Encode features lazily as they are produced."""
+        media_type = media_type or self.media_type
+        prefix = b"\x1e" if media_type == GEOJSON_SEQ_MEDIA_TYPE else b""
+        if hasattr(features, "__aiter__"):
+            content = self._encode_async(features, prefix)
+        else:
+            content = self._encode(features, prefix)
+        super().__init__(content=content, media_type=media_type, **kwargs)
+
+    @staticmethod
+    def _encode(features: Iterable[Any], prefix: bytes) -> Iterable[bytes]:
+        for feature in features:
+            yield prefix + _dumps(feature) + b"\n"
+
+    @staticmethod
+    async def _encode_async(
+        features: AsyncIterable[Any], prefix: bytes
+    ) -> AsyncIterable[bytes]:
+        async for feature in features:
+            yield prefix + _dumps(feature) + b"\n"
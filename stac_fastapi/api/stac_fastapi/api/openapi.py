@@ -2,9 +2,10 @@
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from stac_fastapi.api.config import ApiExtensions
+from stac_fastapi.api.documents import DocumentCache, EncodedDocument
 from stac_fastapi.types.config import ApiSettings
 
 
@@ -18,18 +19,26 @@ def update_openapi(app: FastAPI) -> FastAPI:
     """Update OpenAPI response content-type.
 
     This function modifies the openapi route to comply with the STAC API spec's
-    required content-type response header
+    required content-type response header.  The schema is encoded once per base url
+    and root path, and answered with an ETag.
     """
     urls = (server_data.get("url") for server_data in app.servers)
     server_urls = {url for url in urls if url}
+    documents = DocumentCache()
 
-    async def openapi(req: Request) -> JSONResponse:
+    async def render(req: Request) -> EncodedDocument:
+        return EncodedDocument.encode(
+            app.openapi(), VndOaiResponse.media_type, compress=True
+        )
+
+    async def openapi(req: Request) -> Response:
         root_path = req.scope.get("root_path", "").rstrip("/")
         if root_path not in server_urls:
             if root_path and app.root_path_in_servers:
                 app.servers.insert(0, {"url": root_path})
                 server_urls.add(root_path)
-        return VndOaiResponse(app.openapi())
+        document = await documents.get("openapi", req, render)
+        return document.response(req)
 
     # Remove the default openapi route
     app.router.routes = list(
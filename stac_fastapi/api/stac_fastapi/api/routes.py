@@ -1,13 +1,115 @@
 """route factories."""
+import importlib.util
+import json
 from typing import Any, Callable, Dict, Type, Union
 
 from fastapi import Depends
-from pydantic import BaseModel
+from fastapi.routing import APIRoute
+from geojson_pydantic.geometries import (
+    LineString,
+    MultiLineString,
+    MultiPoint,
+    MultiPolygon,
+    Point,
+    Polygon,
+)
+from pydantic import BaseModel, ValidationError
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
 from stac_fastapi.api.models import APIRequest
 
+# Test for ORJSON and use it rather than stdlib JSON where supported
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    _loads = orjson.loads
+else:
+    _loads = json.loads
+
+# Geometry models of search `intersects`, by GeoJSON type
+INTERSECTS_GEOMETRIES = {
+    geometry.__name__: geometry
+    for geometry in (
+        Point,
+        MultiPoint,
+        LineString,
+        MultiLineString,
+        Polygon,
+        MultiPolygon,
+    )
+}
+
+
+def _is_json(content_type: str) -> bool:
+    """Whether FastAPI reads a body of this content type as JSON."""
+    if not content_type:
+        return True
+    media_type = content_type.split(";")[0].strip()
+    return media_type == "application/json" or (
+        media_type.startswith("application/") and media_type.endswith("+json")
+    )
+
+
+def _build_intersects(body: Any, validate: bool) -> Any:
+    """Build the `intersects` geometry of a search body with the model of its type.
+
+    Validating against that model alone avoids pydantic trying the other geometry
+    models of the request model's union first.  Without `validate` only the type is
+    checked, and that the coordinates are a list.  Geometries failing either are left
+    to the request model, which reports their errors.
+    """
+    if not isinstance(body, dict) or not isinstance(body.get("intersects"), dict):
+        return body
+    intersects = body["intersects"]
+    geometry = INTERSECTS_GEOMETRIES.get(intersects.get("type"))
+    if geometry is None:
+        return body
+    if validate:
+        try:
+            body["intersects"] = geometry.parse_obj(intersects)
+        except ValidationError:
+            pass
+    elif isinstance(intersects.get("coordinates"), list):
+        body["intersects"] = geometry.construct(**intersects)
+    return body
+
+
+class ORJSONRoute(APIRoute):
+    """Route decoding JSON request bodies with orjson, when it is installed.
+
+    The decoded body is cached on the request, where FastAPI reads it from rather
+    than decoding the body again with `json`.  Bodies orjson rejects are left to
+    FastAPI.  The `intersects` geometry of bodies validated by a search request model
+    is built from the decoded body with the model of its type, without validating
+    its coordinates when the `validate_search_geometries` setting is off.
+    """
+
+    def get_route_handler(self) -> Callable:
+        """Decode JSON bodies before the FastAPI handler."""
+        route_handler = super().get_route_handler()
+        if self.body_field is None:
+            return route_handler
+        searches = "intersects" in getattr(self.body_field.type_, "__fields__", {})
+
+        async def handler(request: Request) -> Response:
+            if _is_json(request.headers.get("content-type", "")):
+                body = await request.body()
+                if body:
+                    try:
+                        data = _loads(body)
+                    except ValueError:
+                        return await route_handler(request)
+                    if searches:
+                        settings = getattr(request.app.state, "settings", None)
+                        data = _build_intersects(
+                            data, getattr(settings, "validate_search_geometries", True)
+                        )
+                    request._json = data
+            return await route_handler(request)
+
+        return handler
+
 
 def _wrap_response(resp: Any, response_class: Type[Response]) -> Response:
     if isinstance(resp, Response):
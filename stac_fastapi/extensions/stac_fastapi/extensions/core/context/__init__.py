@@ -0,0 +1,6 @@
+"""Context extension module."""
+
+from .context import ContextExtension
+from .request import ContextMode
+
+__all__ = ["ContextExtension", "ContextMode"]
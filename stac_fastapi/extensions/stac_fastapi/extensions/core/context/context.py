@@ -6,6 +6,12 @@ from fastapi import FastAPI
 
 from stac_fastapi.types.extension import ApiExtension
 
+from .request import (
+    ContextExtensionGetRequest,
+    ContextExtensionPostRequest,
+    ContextMode,
+)
+
 
 @attr.s
 class ContextExtension(ApiExtension):
@@ -15,8 +21,20 @@ class ContextExtension(ApiExtension):
     which includes the number of items matched, returned, and the limit requested.
 
     https://github.com/radiantearth/stac-api-spec/blob/master/item-search/README.md#context
+
+    How `matched` is computed can be chosen per request with the `context` parameter
+    of `/search` (see `ContextMode`), the mode used is returned as `matched_mode`.
+
+    Attributes:
+        mode: default context mode, `None` leaves it to the backend.
+        exact_threshold:
+            largest estimated `matched` which is counted exactly in `exact-if-cheap`
+            mode.
     """
 
+    GET = ContextExtensionGetRequest
+    POST = ContextExtensionPostRequest
+
     conformance_classes: List[str] = attr.ib(
         factory=lambda: ["https://api.stacspec.org/v1.0.0-beta.4/item-search/#context"]
     )
@@ -24,6 +42,11 @@ class ContextExtension(ApiExtension):
         default="https://raw.githubusercontent.com/radiantearth/stac-api-spec/v1.0.0-beta.4/fragments/context/json-schema/schema.json"
     )
 
+    mode: Optional[ContextMode] = attr.ib(
+        default=None, converter=attr.converters.optional(ContextMode)
+    )
+    exact_threshold: int = attr.ib(default=10000)
+
     def register(self, app: FastAPI) -> None:
         """Register the extension with a FastAPI application.
 
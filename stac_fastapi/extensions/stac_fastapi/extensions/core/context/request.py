@@ -0,0 +1,38 @@
+"""Request models for the context extension."""
+
+from enum import Enum
+from typing import Optional
+
+import attr
+from pydantic import BaseModel
+
+from stac_fastapi.types.search import APIRequest
+
+
+class ContextMode(str, Enum):
+    """How the `matched` count of the context extension is computed.
+
+    Attributes:
+        off: `matched` is not computed.
+        estimated: `matched` is the query planner's row estimate.
+        exact_if_cheap: exact when the estimate is below a threshold, else estimated.
+        exact: `matched` is counted exactly.
+    """
+
+    off = "off"
+    estimated = "estimated"
+    exact_if_cheap = "exact-if-cheap"
+    exact = "exact"
+
+
+@attr.s
+class ContextExtensionGetRequest(APIRequest):
+    """Context mode parameter for GET requests."""
+
+    context: Optional[str] = attr.ib(default=None)
+
+
+class ContextExtensionPostRequest(BaseModel):
+    """Context mode parameter for POST requests."""
+
+    context: Optional[ContextMode] = None
@@ -2,5 +2,6 @@
 
 
 from .fields import FieldsExtension
+from .projector import FieldsProjector
 
-__all__ = ["FieldsExtension"]
+__all__ = ["FieldsExtension", "FieldsProjector"]
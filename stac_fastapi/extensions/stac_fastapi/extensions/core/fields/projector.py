@@ -0,0 +1,107 @@
+"""Projection of items onto fields extension includes/excludes."""
+
+from functools import lru_cache
+from typing import AbstractSet, Any, Dict, FrozenSet, Optional, Union
+
+import attr
+
+# Dotted field paths split into a tree, `True` marks a path selected as a whole
+FieldTree = Dict[str, Union[bool, "FieldTree"]]
+
+# Number of compiled projectors to keep around, one per unique fields spec
+PROJECTOR_CACHE_SIZE = 256
+
+
+def _build_tree(fields: AbstractSet[str]) -> Optional[FieldTree]:
+    """Split dotted field paths into a tree, a path wins over any of its children."""
+    if not fields:
+        return None
+
+    tree: FieldTree = {}
+    for field in fields:
+        *parents, leaf = field.split(".")
+        node = tree
+        for key in parents:
+            child = node.setdefault(key, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[leaf] = True
+    return tree
+
+
+def _project(
+    obj: Dict[str, Any], include: Optional[FieldTree], exclude: Optional[FieldTree]
+) -> Dict[str, Any]:
+    """Project a dictionary onto include/exclude trees.
+
+    Values which are selected as a whole are shared with `obj` rather than copied.
+    Paths below values which are not dictionaries (e.g. lists) select the value as a
+    whole.
+    """
+    if include is None and not exclude:
+        return obj
+
+    result = {}
+    for key, value in obj.items():
+        include_rule = True if include is None else include.get(key)
+        if not include_rule:
+            continue
+        exclude_rule = exclude.get(key) if exclude else None
+        if exclude_rule is True:
+            continue
+        if isinstance(value, dict) and (include_rule is not True or exclude_rule):
+            value = _project(
+                value, None if include_rule is True else include_rule, exclude_rule
+            )
+        result[key] = value
+    return result
+
+
+@attr.s(frozen=True)
+class FieldsProjector:
+    """Compiled fields extension includes/excludes.
+
+    Projectors are compiled once per unique set of includes and excludes, use
+    `FieldsProjector.compile` rather than instantiating one directly.
+
+    Attributes:
+        include: tree of included paths, `None` to include everything.
+        exclude: tree of excluded paths, applied after the includes.
+    """
+
+    include: Optional[FieldTree] = attr.ib()
+    exclude: Optional[FieldTree] = attr.ib()
+
+    @classmethod
+    def compile(
+        cls, include: AbstractSet[str], exclude: AbstractSet[str]
+    ) -> "FieldsProjector":
+        """Get the projector of a fields spec, from cache when possible."""
+        return _compile(frozenset(include or ()), frozenset(exclude or ()))
+
+    def includes(self, field: str) -> bool:
+        """Whether any part of a (dotted) field is returned."""
+        include: Any = self.include
+        exclude: Any = self.exclude
+        for key in field.split("."):
+            if include is not True and include is not None:
+                include = include.get(key)
+                if not include:
+                    return False
+            if exclude:
+                exclude = exclude.get(key)
+                if exclude is True:
+                    return False
+        return True
+
+    def __call__(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Project an item."""
+        return _project(item, self.include, self.exclude)
+
+
+@lru_cache(maxsize=PROJECTOR_CACHE_SIZE)
+def _compile(include: FrozenSet[str], exclude: FrozenSet[str]) -> FieldsProjector:
+    """Compile a fields spec."""
+    return FieldsProjector(include=_build_tree(include), exclude=_build_tree(exclude))
@@ -5,6 +5,7 @@ from typing import Dict, Optional, Set
 import attr
 from pydantic import BaseModel, Field
 
+from stac_fastapi.extensions.core.fields.projector import FieldsProjector
 from stac_fastapi.types.config import Settings
 from stac_fastapi.types.search import APIRequest, str2list
 
@@ -57,6 +58,17 @@ class PostFieldsExtension(BaseModel):
             "exclude": self._get_field_dict(self.exclude),
         }
 
+    @property
+    def projector(self) -> FieldsProjector:
+        """Compiled projector applying the includes/excludes to plain dictionaries.
+
+        Unlike `filter_fields`, field paths may be dotted to any depth.  The
+        `default_includes` are always included unless they are explicitly excluded.
+        """
+        include = (self.include or set()) - (self.exclude or set())
+        include |= Settings.get().default_includes or set()
+        return FieldsProjector.compile(include, self.exclude or set())
+
 
 @attr.s
 class FieldsExtensionGetRequest(APIRequest):
@@ -7,8 +7,12 @@ from pydantic import BaseModel
 from stac_pydantic import Collection, Item
 from starlette.responses import JSONResponse, Response
 
-from stac_fastapi.api.models import APIRequest, CollectionUri, ItemUri
-from stac_fastapi.api.routes import create_async_endpoint, create_sync_endpoint
+from stac_fastapi.api.models import APIRequest, CollectionUri, ItemPatch, ItemUri
+from stac_fastapi.api.routes import (
+    ORJSONRoute,
+    create_async_endpoint,
+    create_sync_endpoint,
+)
 from stac_fastapi.types import stac as stac_types
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.core import AsyncBaseTransactionsClient, BaseTransactionsClient
@@ -26,6 +30,7 @@ class TransactionExtension(ApiExtension):
         DELETE /collections/{collection_id}
         POST /collections/{collection_id}/items
         PUT /collections/{collection_id}/items
+        PATCH /collections/{collection_id}/items/{item_id} (if the client implements it)
         DELETE /collections/{collection_id}/items
 
     https://github.com/radiantearth/stac-api-spec/blob/master/ogcapi-features/extensions/transaction/README.md
@@ -43,7 +48,7 @@ class TransactionExtension(ApiExtension):
         ]
     )
     schema_href: Optional[str] = attr.ib(default=None)
-    router: APIRouter = attr.ib(factory=APIRouter)
+    router: APIRouter = attr.ib(factory=lambda: APIRouter(route_class=ORJSONRoute))
     response_class: Type[Response] = attr.ib(default=JSONResponse)
 
     def _create_endpoint(
@@ -67,6 +72,13 @@ class TransactionExtension(ApiExtension):
             )
         raise NotImplementedError
 
+    def _client_implements(self, name: str) -> bool:
+        """Whether the client overrides an optional method of its base class."""
+        for base in (AsyncBaseTransactionsClient, BaseTransactionsClient):
+            if isinstance(self.client, base):
+                return getattr(type(self.client), name) is not getattr(base, name)
+        return False
+
     def register_create_item(self):
         """Register create item endpoint (POST /collections/{collection_id}/items)."""
         self.router.add_api_route(
@@ -93,6 +105,19 @@ class TransactionExtension(ApiExtension):
             endpoint=self._create_endpoint(self.client.update_item, stac_types.Item),
         )
 
+    def register_patch_item(self):
+        """Register patch item endpoint (PATCH /collections/{collection_id}/items/{item_id})."""
+        self.router.add_api_route(
+            name="Patch Item",
+            path="/collections/{collection_id}/items/{item_id}",
+            response_model=Item if self.settings.enable_response_models else None,
+            response_class=self.response_class,
+            response_model_exclude_unset=True,
+            response_model_exclude_none=True,
+            methods=["PATCH"],
+            endpoint=self._create_endpoint(self.client.patch_item, ItemPatch),
+        )
+
     def register_delete_item(self):
         """Register delete item endpoint (DELETE /collections/{collection_id}/items/{item_id})."""
         self.router.add_api_route(
@@ -162,6 +187,9 @@ class TransactionExtension(ApiExtension):
         """
         self.register_create_item()
         self.register_update_item()
+        # Only clients which support partial updates get the PATCH endpoint
+        if self._client_implements("patch_item"):
+            self.register_patch_item()
         self.register_delete_item()
         self.register_create_collection()
         self.register_update_collection()
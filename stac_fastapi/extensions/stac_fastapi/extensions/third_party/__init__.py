@@ -1,4 +1,15 @@
 """stac_api.extensions.third_party module."""
-from .bulk_transactions import BulkTransactionExtension
+from .bulk_transactions import (
+    AsyncBaseBulkTransactionsClient,
+    BaseBulkTransactionsClient,
+    BulkTransactionExtension,
+)
+from .ingest_jobs import IngestJob, IngestJobs
 
-__all__ = ("BulkTransactionExtension",)
+__all__ = (
+    "AsyncBaseBulkTransactionsClient",
+    "BaseBulkTransactionsClient",
+    "BulkTransactionExtension",
+    "IngestJob",
+    "IngestJobs",
+)
@@ -1,15 +1,33 @@
 """bulk transactions extension."""
 import abc
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import zlib
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type, Union
 
 import attr
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, Body, FastAPI, HTTPException
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
-from stac_fastapi.api.models import create_request_model
-from stac_fastapi.api.routes import create_sync_endpoint
+from stac_fastapi.api.models import (
+    NDJSON_MEDIA_TYPE,
+    CollectionUri,
+    create_request_model,
+)
+from stac_fastapi.api.routes import create_async_endpoint, create_sync_endpoint
+from stac_fastapi.extensions.third_party.ingest_jobs import IngestJobs
 from stac_fastapi.types.extension import ApiExtension
 
+# Items of an NDJSON upload written to the database at a time
+NDJSON_BATCH_SIZE = 1000
+# Largest amount of decompressed data held at a time while reading an upload
+NDJSON_READ_SIZE = 1 << 20
+
 
 class Items(BaseModel):
     """A list of STAC items."""
@@ -18,7 +36,14 @@ class Items(BaseModel):
 
     def __iter__(self):
         """Return an iterable of STAC items."""
-        return iter(self.items)
+        return iter(self.items.values())
+
+
+@attr.s
+class ItemPatches(CollectionUri):
+    """Merge patches of items of a collection, by item id."""
+
+    items: Dict[str, Dict[str, Any]] = attr.ib(default=Body(..., embed=True))
 
 
 @attr.s  # type: ignore
@@ -50,18 +75,248 @@ class BaseBulkTransactionsClient(abc.ABC):
         """
         raise NotImplementedError
 
+    def bulk_item_patch(
+        self, collection_id: str, items: Dict[str, Dict[str, Any]], **kwargs
+    ) -> str:
+        """Apply JSON merge patches to items of a collection.
+
+        Clients which leave this unimplemented get no `PATCH` bulk items endpoint.
+
+        Args:
+            collection_id: id of the collection.
+            items: merge patch of each item, by item id.
+
+        Returns:
+            Message indicating the status of the update.
+
+        """
+        raise NotImplementedError
+
+
+async def iter_ndjson(
+    stream: AsyncIterator[bytes], gzipped: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Parse newline delimited JSON objects from a stream of body chunks.
+
+    Gzip compressed streams are decompressed on the fly, holding at most
+    `NDJSON_READ_SIZE` bytes of decompressed data besides the line being read.
+    A gzip stream ending before its trailer is rejected.
+    """
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if gzipped else None
+    pending = b""
+    line_number = 0
+
+    def lines(data: bytes):
+        nonlocal pending, line_number
+        *complete, pending = (pending + data).split(b"\n")
+        for line in complete:
+            line_number += 1
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=400, detail=f"Invalid JSON on line {line_number}"
+                    )
+
+    async for chunk in stream:
+        if decompressor is None:
+            for item in lines(chunk):
+                yield item
+            continue
+        try:
+            data = decompressor.decompress(chunk, NDJSON_READ_SIZE)
+            while data:
+                for item in lines(data):
+                    yield item
+                data = decompressor.decompress(
+                    decompressor.unconsumed_tail, NDJSON_READ_SIZE
+                )
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip request body")
+
+    if decompressor is not None:
+        if not decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip request body")
+        pending += decompressor.flush()
+    for item in lines(b"\n"):
+        yield item
+
+
+def is_gzipped(request: Request) -> bool:
+    """Whether the request body is gzip encoded."""
+    return request.headers.get("content-encoding", "").strip().lower() == "gzip"
+
+
+async def iter_json_items(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    """Items of a JSON bulk items request body."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON request body")
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, dict):
+        raise HTTPException(status_code=400, detail="Expected an object of items")
+    for item in items.values():
+        yield item
+
+
+def create_bulk_items_route_class(
+    bulk_item_insert: Callable,
+    batch_size: int = NDJSON_BATCH_SIZE,
+    jobs: Optional[IngestJobs] = None,
+) -> Type[APIRoute]:
+    """Create a route class which also accepts bulk items as NDJSON.
+
+    Requests with an `application/x-ndjson` body, optionally with a gzip
+    `Content-Encoding`, are read incrementally from the ASGI receive stream and
+    written `batch_size` items at a time, so the memory used by an upload does not
+    grow with its size.  Each batch is committed on its own, so items of the
+    batches written before an invalid line or a failed batch remain added; a 400
+    response for an invalid body reports how many were.  Other requests are
+    handled by the route's endpoint.
+
+    With `jobs`, every upload is spooled to disk and loaded by a background job
+    instead, and the request is answered with `202 Accepted` and the job's status.
+    """
+
+    class BulkItemsRoute(APIRoute):
+        """Route accepting JSON or NDJSON bulk items."""
+
+        def get_route_handler(self) -> Callable:
+            """Dispatch NDJSON uploads to the streaming handler."""
+            route_handler = super().get_route_handler()
+
+            async def insert(items: List[Dict[str, Any]], request: Request) -> Any:
+                if asyncio.iscoroutinefunction(bulk_item_insert):
+                    return await bulk_item_insert(items, request=request)
+                return await run_in_threadpool(bulk_item_insert, items, request=request)
+
+            async def submit(request: Request, ndjson: bool) -> Response:
+                if ndjson:
+                    items = iter_ndjson(request.stream(), gzipped=is_gzipped(request))
+                else:
+                    items = iter_json_items(request)
+                job = await jobs.submit(
+                    request.path_params["collection_id"],
+                    items,
+                    partial(insert, request=request),
+                )
+                status = job.to_dict(str(request.base_url))
+                return JSONResponse(
+                    status,
+                    status_code=202,
+                    headers={"Location": status["links"][0]["href"]},
+                )
+
+            async def handler(request: Request) -> Response:
+                content_type = request.headers.get("content-type", "")
+                ndjson = content_type.split(";")[0].strip() == NDJSON_MEDIA_TYPE
+                if jobs is not None:
+                    return await submit(request, ndjson)
+                if not ndjson:
+                    return await route_handler(request)
+
+                items = iter_ndjson(request.stream(), gzipped=is_gzipped(request))
+                count = 0
+                batch: List[Dict[str, Any]] = []
+                try:
+                    async for item in items:
+                        batch.append(item)
+                        if len(batch) >= batch_size:
+                            await insert(batch, request)
+                            count += len(batch)
+                            batch = []
+                except HTTPException as e:
+                    if count:
+                        e.detail = f"{e.detail} ({count} items were already added)"
+                    raise
+                if batch:
+                    await insert(batch, request)
+                    count += len(batch)
+                return JSONResponse(f"Successfully added {count} items.")
+
+            return handler
+
+    return BulkItemsRoute
+
+
+@attr.s  # type: ignore
+class AsyncBaseBulkTransactionsClient(abc.ABC):
+    """BulkTransactionsClient."""
+
+    @staticmethod
+    def _chunks(lst, n):
+        """Yield successive n-sized chunks from list.
+
+        https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
+        """
+        for i in range(0, len(lst), n):
+            yield lst[i : i + n]
+
+    @abc.abstractmethod
+    async def bulk_item_insert(
+        self, items: Items, chunk_size: Optional[int] = None, **kwargs
+    ) -> str:
+        """Bulk creation of items.
+
+        Args:
+            items: list of items.
+            chunk_size: number of items processed at a time.
+
+        Returns:
+            Message indicating the status of the insert.
+
+        """
+        raise NotImplementedError
+
+    async def bulk_item_patch(
+        self, collection_id: str, items: Dict[str, Dict[str, Any]], **kwargs
+    ) -> str:
+        """Apply JSON merge patches to items of a collection.
+
+        Clients which leave this unimplemented get no `PATCH` bulk items endpoint.
+
+        Args:
+            collection_id: id of the collection.
+            items: merge patch of each item, by item id.
+
+        Returns:
+            Message indicating the status of the update.
+
+        """
+        raise NotImplementedError
+
 
 @attr.s
 class BulkTransactionExtension(ApiExtension):
     """Bulk Transaction Extension.
 
     Bulk Transaction extension adds the `POST /collections/{collection_id}/bulk_items` endpoint to the application
-    for efficient bulk insertion of items.
+    for efficient bulk insertion of items, and `PATCH /collections/{collection_id}/bulk_items` applying a JSON merge
+    patch to each of many items, if the client implements `bulk_item_patch`.  Items are sent either as a JSON object, or as
+    (gzip compressed) `application/x-ndjson` with one item per line, which is streamed
+    to the database in batches of `ndjson_batch_size` items.
+
+    With `jobs`, uploads are loaded by background ingest jobs: the endpoint answers
+    `202 Accepted` once the upload is spooled to disk, and `GET /jobs/{job_id}` reports
+    the progress, throughput and failed items of a job.
     """
 
-    client: BaseBulkTransactionsClient = attr.ib()
+    client: Union[
+        BaseBulkTransactionsClient, AsyncBaseBulkTransactionsClient
+    ] = attr.ib()
     conformance_classes: List[str] = attr.ib(default=list())
     schema_href: Optional[str] = attr.ib(default=None)
+    ndjson_batch_size: int = attr.ib(default=NDJSON_BATCH_SIZE)
+    jobs: Optional[IngestJobs] = attr.ib(default=None)
+
+    def _client_implements(self, name: str) -> bool:
+        """Whether the client overrides an optional method of its base class."""
+        for base in (AsyncBaseBulkTransactionsClient, BaseBulkTransactionsClient):
+            if isinstance(self.client, base):
+                return getattr(type(self.client), name) is not getattr(base, name)
+        return False
 
     def register(self, app: FastAPI) -> None:
         """Register the extension with a FastAPI application.
@@ -73,6 +328,20 @@ class BulkTransactionExtension(ApiExtension):
             None
         """
         items_request_model = create_request_model("Items", base_model=Items)
+        if isinstance(self.client, AsyncBaseBulkTransactionsClient):
+            endpoint = create_async_endpoint(
+                self.client.bulk_item_insert, items_request_model
+            )
+            patch_endpoint = create_async_endpoint(
+                self.client.bulk_item_patch, ItemPatches
+            )
+        else:
+            endpoint = create_sync_endpoint(
+                self.client.bulk_item_insert, items_request_model
+            )
+            patch_endpoint = create_sync_endpoint(
+                self.client.bulk_item_patch, ItemPatches
+            )
 
         router = APIRouter()
         router.add_api_route(
@@ -82,8 +351,31 @@ class BulkTransactionExtension(ApiExtension):
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
             methods=["POST"],
-            endpoint=create_sync_endpoint(
-                self.client.bulk_item_insert, items_request_model
+            endpoint=endpoint,
+            route_class_override=create_bulk_items_route_class(
+                self.client.bulk_item_insert,
+                batch_size=self.ndjson_batch_size,
+                jobs=self.jobs,
             ),
         )
+        if self._client_implements("bulk_item_patch"):
+            router.add_api_route(
+                name="Bulk Patch Item",
+                path="/collections/{collection_id}/bulk_items",
+                response_model=str,
+                methods=["PATCH"],
+                endpoint=patch_endpoint,
+            )
+        if self.jobs is not None:
+            jobs = self.jobs
+
+            async def get_job(job_id: str, request: Request) -> Dict[str, Any]:
+                return jobs.get(job_id).to_dict(str(request.base_url))
+
+            router.add_api_route(
+                name="Get Ingest Job",
+                path="/jobs/{job_id}",
+                methods=["GET"],
+                endpoint=get_job,
+            )
         app.include_router(router, tags=["Bulk Transaction Extension"])
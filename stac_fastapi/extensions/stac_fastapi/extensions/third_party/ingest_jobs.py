@@ -0,0 +1,212 @@
+"""Background ingest jobs for the bulk transactions extension."""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+import attr
+from starlette.concurrency import run_in_threadpool
+
+from stac_fastapi.types.errors import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(seconds: Optional[float]) -> Optional[str]:
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def _read_batch(spool: IO[bytes], size: int) -> List[Dict[str, Any]]:
+    """Read the next `size` items of a spool file."""
+    batch = []
+    for line in spool:
+        batch.append(json.loads(line))
+        if len(batch) >= size:
+            break
+    return batch
+
+
+@attr.s
+class IngestJob:
+    """Progress of a bulk item load running in the background."""
+
+    id: str = attr.ib()
+    collection_id: str = attr.ib()
+    spool_path: str = attr.ib()
+    status: str = attr.ib(default="queued")
+    items_total: int = attr.ib(default=0)
+    items_processed: int = attr.ib(default=0)
+    items_failed: int = attr.ib(default=0)
+    failures: List[Dict[str, Any]] = attr.ib(factory=list)
+    error: Optional[str] = attr.ib(default=None)
+    created: float = attr.ib(factory=time.time)
+    started: Optional[float] = attr.ib(default=None)
+    finished: Optional[float] = attr.ib(default=None)
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has stopped running."""
+        return self.status in ("succeeded", "failed")
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        """Load throughput so far."""
+        if self.started is None:
+            return None
+        elapsed = (self.finished or time.time()) - self.started
+        return round(self.items_processed / elapsed, 1) if elapsed else None
+
+    def to_dict(self, base_url: str) -> Dict[str, Any]:
+        """Status document returned by the api."""
+        return {
+            "id": self.id,
+            "collection_id": self.collection_id,
+            "status": self.status,
+            "items_total": self.items_total,
+            "items_processed": self.items_processed,
+            "items_failed": self.items_failed,
+            "items_per_second": self.items_per_second,
+            "failures": self.failures,
+            "error": self.error,
+            "created": _timestamp(self.created),
+            "started": _timestamp(self.started),
+            "finished": _timestamp(self.finished),
+            "links": [
+                {
+                    "rel": "self",
+                    "type": "application/json",
+                    "href": f"{base_url}jobs/{self.id}",
+                }
+            ],
+        }
+
+
+@attr.s
+class IngestJobs:
+    """Run bulk item loads as background jobs.
+
+    Uploads are spooled to an NDJSON file in `spool_dir` before the request returns,
+    then loaded by asyncio tasks `batch_size` items at a time, at most `max_running`
+    jobs at once.  A batch which fails is retried item by item, so the failures of a
+    job are reported per item (up to `max_failures` of them).  Jobs are kept in the
+    memory of the process which accepted them, the oldest finished jobs being
+    forgotten beyond `max_jobs`.
+    """
+
+    spool_dir: str = attr.ib(factory=tempfile.gettempdir)
+    batch_size: int = attr.ib(default=1000)
+    max_running: int = attr.ib(default=1)
+    max_failures: int = attr.ib(default=100)
+    max_jobs: int = attr.ib(default=1000)
+    _jobs: Dict[str, IngestJob] = attr.ib(init=False, factory=dict)
+    _tasks: Set[asyncio.Future] = attr.ib(init=False, factory=set)
+    _running: Optional[asyncio.Semaphore] = attr.ib(init=False, default=None)
+
+    def get(self, job_id: str) -> IngestJob:
+        """Look up a job by id."""
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise NotFoundError(f"Ingest job {job_id} not found")
+
+    async def submit(
+        self,
+        collection_id: str,
+        items: AsyncIterator[Dict[str, Any]],
+        insert: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+    ) -> IngestJob:
+        """Spool items to disk and queue a job loading them with `insert`."""
+        job_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, f"stac-ingest-{job_id}.ndjson")
+        total = 0
+        try:
+            with open(spool_path, "wb") as spool:
+                lines: List[bytes] = []
+                async for item in items:
+                    lines.append(json.dumps(item).encode() + b"\n")
+                    if len(lines) >= self.batch_size:
+                        await run_in_threadpool(spool.writelines, lines)
+                        total += len(lines)
+                        lines = []
+                await run_in_threadpool(spool.writelines, lines)
+                total += len(lines)
+        except BaseException:
+            os.remove(spool_path)
+            raise
+
+        job = IngestJob(
+            id=job_id,
+            collection_id=collection_id,
+            spool_path=spool_path,
+            items_total=total,
+        )
+        self._jobs[job_id] = job
+        self._forget_finished()
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.max_running)
+        task = asyncio.ensure_future(self._run(job, insert))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _forget_finished(self):
+        """Drop the oldest finished jobs beyond `max_jobs`."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job.id for job in self._jobs.values() if job.done][:excess]:
+            del self._jobs[job_id]
+
+    def _record_failure(self, job: IngestJob, item: Dict[str, Any], error: Exception):
+        job.items_failed += 1
+        if len(job.failures) < self.max_failures:
+            job.failures.append({"id": item.get("id"), "error": repr(error)})
+
+    async def _run(
+        self,
+        job: IngestJob,
+        insert: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+    ):
+        async with self._running:
+            job.status = "running"
+            job.started = time.time()
+            try:
+                with open(job.spool_path, "rb") as spool:
+                    while True:
+                        batch = await run_in_threadpool(
+                            _read_batch, spool, self.batch_size
+                        )
+                        if not batch:
+                            break
+                        try:
+                            await insert(batch)
+                        except Exception:
+                            for item in batch:
+                                try:
+                                    await insert([item])
+                                except Exception as e:
+                                    self._record_failure(job, item, e)
+                        job.items_processed += len(batch)
+                job.status = "succeeded"
+            except Exception as e:
+                logger.error("Ingest job %s failed", job.id, exc_info=True)
+                job.status = "failed"
+                job.error = repr(e)
+            finally:
+                job.finished = time.time()
+                os.remove(job.spool_path)
@@ -8,14 +8,13 @@ with open("README.md") as f:
 install_requires = [
     "attrs",
     "orjson",
-    "pydantic[dotenv]",
+    "pydantic[dotenv]>=1.9,<2",
     "stac_pydantic==2.0.*",
     "stac-fastapi.types",
     "stac-fastapi.api",
     "stac-fastapi.extensions",
     "asyncpg",
     "buildpg",
-    "brotli_asgi",
 ]
 
 extra_reqs = {
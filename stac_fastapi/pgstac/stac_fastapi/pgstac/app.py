@@ -10,17 +10,21 @@ from stac_fastapi.extensions.core import (
     TokenPaginationExtension,
     TransactionExtension,
 )
+from stac_fastapi.extensions.third_party import BulkTransactionExtension, IngestJobs
 from stac_fastapi.pgstac.config import Settings
 from stac_fastapi.pgstac.core import CoreCrudClient
 from stac_fastapi.pgstac.db import close_db_connection, connect_to_db
 from stac_fastapi.pgstac.extensions import QueryExtension
-from stac_fastapi.pgstac.transactions import TransactionsClient
+from stac_fastapi.pgstac.transactions import BulkTransactionsClient, TransactionsClient
 from stac_fastapi.pgstac.types.search import PgstacSearch
 
 settings = Settings()
 extensions = [
     TransactionExtension(
-        client=TransactionsClient(),
+        client=TransactionsClient(
+            write_coalesce_window=settings.write_coalesce_window,
+            write_coalesce_max_items=settings.write_coalesce_max_items,
+        ),
         settings=settings,
         response_class=ORJSONResponse,
     ),
@@ -28,7 +32,18 @@ extensions = [
     SortExtension(),
     FieldsExtension(),
     TokenPaginationExtension(),
-    ContextExtension(),
+    ContextExtension(
+        mode=settings.context_mode, exact_threshold=settings.context_exact_threshold
+    ),
+    BulkTransactionExtension(
+        client=BulkTransactionsClient(
+            batch_size=settings.bulk_batch_size,
+            max_concurrency=settings.bulk_max_concurrency,
+        ),
+        jobs=IngestJobs(spool_dir=settings.ingest_spool_dir)
+        if settings.ingest_spool_dir
+        else None,
+    ),
 ]
 
 post_request_model = create_post_request_model(extensions, base_model=PgstacSearch)
@@ -36,7 +51,10 @@ post_request_model = create_post_request_model(extensions, base_model=PgstacSear
 api = StacApi(
     settings=settings,
     extensions=extensions,
-    client=CoreCrudClient(post_request_model=post_request_model),
+    client=CoreCrudClient(
+        post_request_model=post_request_model,
+        raw_json_passthrough=settings.raw_json_passthrough,
+    ),
     response_class=ORJSONResponse,
     search_get_request_model=create_get_request_model(extensions),
     search_post_request_model=post_request_model,
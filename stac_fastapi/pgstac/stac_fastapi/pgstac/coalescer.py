@@ -0,0 +1,118 @@
+"""Group commits of concurrent single item writes."""
+import asyncio
+import itertools
+import logging
+from typing import List, Optional, Set
+
+import attr
+from asyncpg import Connection, exceptions, pool
+
+from stac_fastapi.pgstac.db import dbcall, translate_error, update_changed_item
+from stac_fastapi.types import stac as stac_types
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s
+class PendingWrite:
+    """An item waiting to be written, and the future of its caller."""
+
+    func: str = attr.ib()
+    item: stac_types.Item = attr.ib()
+    future: asyncio.Future = attr.ib()
+    error: Optional[Exception] = attr.ib(default=None)
+
+
+@attr.s
+class WriteCoalescer:
+    """Commit concurrent item creates and updates together.
+
+    Writes are collected for up to `window` seconds after the first one arrives, or
+    until `max_items` are pending, and committed in one transaction.  Consecutive
+    creates are inserted with a single `create_items` call.  If that fails, each write
+    is retried on a savepoint of its own, so every caller gets its own result or error.
+    """
+
+    window: float = attr.ib(default=0.005)
+    max_items: int = attr.ib(default=100)
+    _pending: List[PendingWrite] = attr.ib(init=False, factory=list)
+    _pool: Optional[pool.Pool] = attr.ib(init=False, default=None)
+    _timer: Optional[asyncio.TimerHandle] = attr.ib(init=False, default=None)
+    _tasks: Set[asyncio.Future] = attr.ib(init=False, factory=set)
+
+    async def create(self, pool: pool.Pool, item: stac_types.Item) -> None:
+        """Create an item, returning once its batch has committed."""
+        await self._submit(pool, "create_item", item)
+
+    async def update(self, pool: pool.Pool, item: stac_types.Item) -> None:
+        """Update an item unless it is unchanged, returning once its batch commits."""
+        await self._submit(pool, "update_item", item)
+
+    async def _submit(self, pool: pool.Pool, func: str, item: stac_types.Item):
+        loop = asyncio.get_event_loop()
+        write = PendingWrite(func, item, loop.create_future())
+        self._pending.append(write)
+        self._pool = pool
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        await write.future
+
+    def _flush(self):
+        """Commit the pending writes in the background."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        writes, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._commit(self._pool, writes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _commit(self, pool: pool.Pool, writes: List[PendingWrite]):
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    for func, run in itertools.groupby(writes, key=lambda w: w.func):
+                        run = list(run)
+                        if func == "create_item" and len(run) > 1:
+                            if await self._create_all(conn, run):
+                                continue
+                        for write in run:
+                            await self._write_one(conn, write)
+        except Exception as e:
+            logger.error("write batch of %s items failed", len(writes), exc_info=True)
+            error = e
+            if isinstance(e, exceptions.PostgresError):
+                error = translate_error(e) or e
+            for write in writes:
+                if not write.future.done():
+                    write.future.set_exception(write.error or error)
+            return
+        for write in writes:
+            # Callers may have gone away, cancelling their futures
+            if write.future.done():
+                continue
+            if write.error:
+                write.future.set_exception(write.error)
+            else:
+                write.future.set_result(None)
+
+    async def _create_all(self, conn: Connection, writes: List[PendingWrite]) -> bool:
+        """Create every item of a run of creates with one call."""
+        try:
+            async with conn.transaction():
+                await dbcall(conn, "create_items", [write.item for write in writes])
+        except exceptions.PostgresError:
+            return False
+        return True
+
+    async def _write_one(self, conn: Connection, write: PendingWrite):
+        try:
+            async with conn.transaction():
+                if write.func == "update_item":
+                    await update_changed_item(conn, write.item)
+                else:
+                    await dbcall(conn, write.func, write.item)
+        except exceptions.PostgresError as e:
+            write.error = translate_error(e) or e
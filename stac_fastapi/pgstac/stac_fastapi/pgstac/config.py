@@ -1,5 +1,7 @@
 """Postgres API configuration."""
 
+from typing import Optional
+
 from stac_fastapi.types.config import ApiSettings
 
 
@@ -13,6 +15,20 @@ class Settings(ApiSettings):
         postgres_host_writer: hostname for the writer connection.
         postgres_port: database port.
         postgres_dbname: database name.
+        raw_json_passthrough:
+            splice search results into the response as the JSON text returned by
+            pgstac, instead of decoding and re-encoding every feature.
+        bulk_batch_size: number of items sent to pgstac in each bulk insert call.
+        bulk_max_concurrency: number of bulk insert batches loaded at once.
+        write_coalesce_window:
+            seconds concurrent item creates and updates are collected for, to be
+            committed together in one transaction.  Each write is committed on its own
+            when unset.
+        write_coalesce_max_items: most item writes committed together.
+        ingest_spool_dir:
+            directory bulk item uploads are spooled to.  When set, uploads are loaded by
+            background ingest jobs, reported by `GET /jobs/{job_id}`, and the bulk items
+            endpoint answers `202 Accepted`.
     """
 
     postgres_user: str
@@ -27,6 +43,16 @@ class Settings(ApiSettings):
     db_max_queries: int = 50000
     db_max_inactive_conn_lifetime: float = 300
 
+    raw_json_passthrough: bool = False
+
+    bulk_batch_size: int = 1000
+    bulk_max_concurrency: int = 4
+
+    write_coalesce_window: Optional[float] = None
+    write_coalesce_max_items: int = 100
+
+    ingest_spool_dir: Optional[str] = None
+
     testing: bool = False
 
     @property
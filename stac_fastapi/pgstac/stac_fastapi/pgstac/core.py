@@ -1,7 +1,7 @@
 """Item crud client."""
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from urllib.parse import urljoin
 
 import attr
@@ -13,7 +13,11 @@ from pydantic import ValidationError
 from stac_pydantic.links import Relations
 from stac_pydantic.shared import MimeTypes
 from starlette.requests import Request
+from starlette.responses import Response
 
+from stac_fastapi.api.models import GeoJSONSeqResponse, streaming_media_type
+from stac_fastapi.extensions.core.context import ContextMode
+from stac_fastapi.extensions.core.fields import FieldsProjector
 from stac_fastapi.pgstac.models.links import (
     CollectionLinks,
     ItemLinks,
@@ -27,11 +31,74 @@ from stac_fastapi.types.stac import Collection, Collections, Item, ItemCollectio
 
 NumType = Union[float, int]
 
+SEARCH_QUERY = """
+    SELECT * FROM search(:req::text::jsonb);
+"""
+
+# Search only if the collection exists, no row is returned otherwise
+COLLECTION_SEARCH_QUERY = """
+    SELECT search(:req::text::jsonb) FROM collections WHERE id = :collection_id;
+"""
+
+# Look up an item by key along with the existence of its collection
+ITEM_QUERY = """
+    SELECT
+        EXISTS(SELECT 1 FROM collections WHERE id = :collection_id) AS collection_exists,
+        (
+            SELECT content FROM items
+            WHERE collection_id = :collection_id AND id = :item_id
+            LIMIT 1
+        ) AS item;
+"""
+
+# Split the FeatureCollection returned by pgstac's search() into its envelope and
+# the features as text, with the parts of each feature links are built from.  The
+# search is scoped to an existing collection when `:collection_id` is given.
+RAW_SEARCH_QUERY = """
+    WITH search AS (
+        SELECT search(:req::text::jsonb) AS fc {collection_scope}
+    ), features AS (
+        SELECT f, n
+        FROM search, jsonb_array_elements(
+            CASE WHEN jsonb_typeof(fc->'features') = 'array'
+            THEN fc->'features' ELSE '[]'::jsonb END
+        ) WITH ORDINALITY AS t(f, n)
+    )
+    SELECT
+        (SELECT fc - 'features' FROM search) AS envelope,
+        ARRAY(SELECT (f - 'links')::text FROM features ORDER BY n) AS features,
+        ARRAY(SELECT f->>'id' FROM features ORDER BY n) AS ids,
+        ARRAY(SELECT f->>'collection' FROM features ORDER BY n) AS collections,
+        ARRAY(SELECT (f->'links')::text FROM features ORDER BY n) AS links;
+"""
+
+
+def context_conf(mode: ContextMode, exact_threshold: int) -> Dict[str, Any]:
+    """pgstac settings making search() compute context `matched` in a context mode."""
+    if mode == ContextMode.off:
+        return {"context": "off"}
+    if mode == ContextMode.estimated:
+        return {
+            "context": "auto",
+            "context_estimated_count": 0,
+            "context_estimated_cost": 0,
+        }
+    if mode == ContextMode.exact_if_cheap:
+        return {
+            "context": "auto",
+            "context_estimated_count": exact_threshold,
+            "context_estimated_cost": 0,
+        }
+    return {"context": "on"}
+
 
 @attr.s
 class CoreCrudClient(AsyncBaseCoreClient):
     """Client for core endpoints defined by stac."""
 
+    stream_chunk_size: int = attr.ib(default=500)
+    raw_json_passthrough: bool = attr.ib(default=False)
+
     async def all_collections(self, **kwargs) -> Collections:
         """Read all collections from the database."""
         request: Request = kwargs["request"]
@@ -106,8 +173,63 @@ class CoreCrudClient(AsyncBaseCoreClient):
 
         return Collection(**collection)
 
+    @staticmethod
+    def _fields_projector(search_request: PgstacSearch) -> FieldsProjector:
+        """Projector of the fields requested by the client.
+
+        pgstac applies the fields extension without any default includes, so neither
+        does the projector.
+        """
+        fields = search_request.fields
+        return FieldsProjector.compile(fields.include or set(), fields.exclude or set())
+
+    def _context_mode(self, search_request: PgstacSearch) -> Optional[ContextMode]:
+        """Context mode of a request, `None` to leave it to pgstac's settings."""
+        extension = self.get_extension("ContextExtension")
+        if extension is None:
+            return None
+        return getattr(search_request, "context", None) or extension.mode
+
+    def _search_json(
+        self, search_request: PgstacSearch, mode: Optional[ContextMode] = None
+    ) -> str:
+        """Serialize a search request for pgstac's search(), in a context mode.
+
+        Settings given in the request's own `conf` take precedence.
+        """
+        conf: Dict[str, Any] = {}
+        if mode is not None:
+            conf = context_conf(
+                mode, self.get_extension("ContextExtension").exact_threshold
+            )
+        conf.update(search_request.conf or {})
+        return search_request.copy(update={"conf": conf or None}).json(
+            exclude={"context"}, exclude_none=True, by_alias=True
+        )
+
+    @staticmethod
+    def _set_matched_mode(context: Any, mode: Optional[ContextMode]):
+        """Report the context mode in pgstac's context object."""
+        if mode is not None and isinstance(context, dict):
+            context["matched_mode"] = mode.value
+
+    async def _collection_exists(self, collection_id: str, request: Request) -> bool:
+        """Whether a collection exists, without reading it."""
+        pool = request.app.state.readpool
+        async with pool.acquire() as conn:
+            q, p = render(
+                """
+                SELECT EXISTS(SELECT 1 FROM collections WHERE id = :id);
+                """,
+                id=collection_id,
+            )
+            return await conn.fetchval(q, *p)
+
     async def _search_base(
-        self, search_request: PgstacSearch, **kwargs: Any
+        self,
+        search_request: PgstacSearch,
+        collection_id: Optional[str] = None,
+        **kwargs: Any,
     ) -> ItemCollection:
         """Cross catalog search (POST).
 
@@ -115,43 +237,47 @@ class CoreCrudClient(AsyncBaseCoreClient):
 
         Args:
             search_request: search request parameters.
+            collection_id: only search if this collection exists, in the same
+                statement, and raise NotFoundError otherwise.
 
         Returns:
             ItemCollection containing items which match the search criteria.
         """
-        items: Dict[str, Any]
+        items: Optional[Dict[str, Any]]
 
         request: Request = kwargs["request"]
         pool = request.app.state.readpool
 
-        # pool = kwargs["request"].app.state.readpool
-        req = search_request.json(exclude_none=True, by_alias=True)
+        mode = self._context_mode(search_request)
+        req = self._search_json(search_request, mode)
 
         try:
             async with pool.acquire() as conn:
-                q, p = render(
-                    """
-                    SELECT * FROM search(:req::text::jsonb);
-                    """,
-                    req=req,
-                )
+                if collection_id is None:
+                    q, p = render(SEARCH_QUERY, req=req)
+                else:
+                    q, p = render(
+                        COLLECTION_SEARCH_QUERY, req=req, collection_id=collection_id
+                    )
                 items = await conn.fetchval(q, *p)
         except InvalidDatetimeFormatError:
             raise InvalidQueryParameter(
                 f"Datetime parameter {search_request.datetime} is invalid."
             )
+        if items is None:
+            raise NotFoundError(f"Collection {collection_id} does not exist.")
 
         next: Optional[str] = items.pop("next", None)
         prev: Optional[str] = items.pop("prev", None)
+        self._set_matched_mode(items.get("context"), mode)
         collection = ItemCollection(**items)
         cleaned_features: List[Item] = []
 
+        projector = self._fields_projector(search_request)
+        include_links = projector.includes("links")
         for feature in collection.get("features") or []:
             feature = Item(**feature)
-            if (
-                search_request.fields.exclude is None
-                or "links" not in search_request.fields.exclude
-            ):
+            if include_links:
                 # TODO: feature.collection is not always included
                 # This code fails if it's left outside of the fields expression
                 # I've fields extension updated test cases to always include feature.collection
@@ -160,14 +286,7 @@ class CoreCrudClient(AsyncBaseCoreClient):
                     item_id=feature["id"],
                     request=request,
                 ).get_links(extra_links=feature.get("links"))
-
-                exclude = search_request.fields.exclude
-                if exclude and len(exclude) == 0:
-                    exclude = None
-                include = search_request.fields.include
-                if include and len(include) == 0:
-                    include = None
-            cleaned_features.append(feature)
+            cleaned_features.append(projector(feature))
 
         collection["features"] = cleaned_features
         collection["links"] = await PagingLinks(
@@ -177,6 +296,127 @@ class CoreCrudClient(AsyncBaseCoreClient):
         ).get_links()
         return collection
 
+    async def _search_base_raw(
+        self,
+        search_request: PgstacSearch,
+        request: Request,
+        media_type: str,
+        collection_id: Optional[str] = None,
+    ) -> Response:
+        """Cross catalog search, passing the features through as raw JSON.
+
+        Features are received from the database as JSON text and spliced into the
+        response body next to their links, so they are never decoded or re-encoded.
+        The fields extension is left entirely to pgstac.
+
+        Args:
+            search_request: search request parameters.
+            request: the request being served.
+            media_type: content type of the response.
+            collection_id: only search if this collection exists, in the same
+                statement, and add its links to the response.  NotFoundError is
+                raised if it does not exist.
+
+        Returns:
+            Response with the ItemCollection as body.
+        """
+        pool = request.app.state.readpool
+        mode = self._context_mode(search_request)
+        req = self._search_json(search_request, mode)
+        try:
+            async with pool.acquire() as conn:
+                if collection_id is None:
+                    q, p = render(RAW_SEARCH_QUERY.format(collection_scope=""), req=req)
+                else:
+                    q, p = render(
+                        RAW_SEARCH_QUERY.format(
+                            collection_scope="FROM collections WHERE id = :collection_id"
+                        ),
+                        req=req,
+                        collection_id=collection_id,
+                    )
+                row = await conn.fetchrow(q, *p)
+        except InvalidDatetimeFormatError:
+            raise InvalidQueryParameter(
+                f"Datetime parameter {search_request.datetime} is invalid."
+            )
+
+        envelope: Optional[Dict[str, Any]] = row["envelope"]
+        if envelope is None:
+            raise NotFoundError(f"Collection {collection_id} does not exist.")
+        self._set_matched_mode(envelope.get("context"), mode)
+        include_links = self._fields_projector(search_request).includes("links")
+        features: List[bytes] = []
+        for feature, item_id, item_collection, extra_links in zip(
+            row["features"], row["ids"], row["collections"], row["links"]
+        ):
+            feature = feature.encode()
+            # TODO: feature.collection is not always included
+            if include_links and item_collection is not None:
+                links = await ItemLinks(
+                    collection_id=item_collection, item_id=item_id, request=request
+                ).get_links(extra_links=orjson.loads(extra_links or "[]"))
+                separator = b"," if feature != b"{}" else b""
+                feature = (
+                    feature[:-1] + separator + b'"links":' + orjson.dumps(links) + b"}"
+                )
+            features.append(feature)
+
+        links = await PagingLinks(
+            request=request,
+            next=envelope.pop("next", None),
+            prev=envelope.pop("prev", None),
+        ).get_links()
+        if collection_id is not None:
+            links = await CollectionLinks(
+                collection_id=collection_id, request=request
+            ).get_links(extra_links=links)
+        envelope["links"] = links
+
+        body = orjson.dumps(envelope)
+        body = body[:-1] + b',"features":[' + b",".join(features) + b"]}"
+        return Response(content=body, media_type=media_type)
+
+    async def _stream_search(
+        self, search_request: PgstacSearch, request: Request
+    ) -> AsyncIterator[Item]:
+        """Yield the items matching a search, one pgstac page at a time.
+
+        Pages of at most `stream_chunk_size` items are requested from pgstac and
+        chained with its paging tokens until `limit` items have been produced.
+        """
+        pool = request.app.state.readpool
+        remaining = search_request.limit or 10
+        token = getattr(search_request, "token", None)
+        projector = self._fields_projector(search_request)
+        include_links = projector.includes("links")
+
+        while remaining > 0:
+            chunk = search_request.copy(
+                update={"limit": min(remaining, self.stream_chunk_size), "token": token}
+            )
+            async with pool.acquire() as conn:
+                # Streamed responses have no context, so it is never computed
+                q, p = render(
+                    SEARCH_QUERY, req=self._search_json(chunk, ContextMode.off)
+                )
+                items = await conn.fetchval(q, *p)
+
+            features = items.get("features") or []
+            for feature in features:
+                if include_links:
+                    feature["links"] = await ItemLinks(
+                        collection_id=feature["collection"],
+                        item_id=feature["id"],
+                        request=request,
+                    ).get_links(extra_links=feature.get("links"))
+                yield projector(feature)
+
+            remaining -= len(features)
+            if not features or not items.get("next"):
+                break
+            token = f"next:{items['next']}"
+
     async def item_collection(
         self,
         collection_id: str,
@@ -196,13 +436,30 @@ class CoreCrudClient(AsyncBaseCoreClient):
         Returns:
             An ItemCollection.
         """
-        # If collection does not exist, NotFoundError wil be raised
-        await self.get_collection(collection_id, **kwargs)
-
         req = self.post_request_model(
             collections=[collection_id], limit=limit, token=token
         )
-        item_collection = await self._search_base(req, **kwargs)
+        media_type = streaming_media_type(kwargs["request"])
+        if media_type:
+            # Checked up front, the response has started once the stream fails
+            if not await self._collection_exists(collection_id, kwargs["request"]):
+                raise NotFoundError(f"Collection {collection_id} does not exist.")
+            return GeoJSONSeqResponse(
+                self._stream_search(req, kwargs["request"]), media_type=media_type
+            )
+
+        if self.raw_json_passthrough:
+            return await self._search_base_raw(
+                req,
+                kwargs["request"],
+                media_type=MimeTypes.json.value,
+                collection_id=collection_id,
+            )
+
+        # If collection does not exist, NotFoundError will be raised
+        item_collection = await self._search_base(
+            req, collection_id=collection_id, **kwargs
+        )
         links = await CollectionLinks(
             collection_id=collection_id, request=kwargs["request"]
         ).get_links(extra_links=item_collection["links"])
@@ -220,19 +477,26 @@ class CoreCrudClient(AsyncBaseCoreClient):
         Returns:
             Item.
         """
-        # If collection does not exist, NotFoundError wil be raised
-        await self.get_collection(collection_id, **kwargs)
+        item: Optional[Dict[str, Any]]
 
-        req = self.post_request_model(
-            ids=[item_id], collections=[collection_id], limit=1
-        )
-        item_collection = await self._search_base(req, **kwargs)
-        if not item_collection["features"]:
+        request: Request = kwargs["request"]
+        pool = request.app.state.readpool
+        async with pool.acquire() as conn:
+            q, p = render(ITEM_QUERY, collection_id=collection_id, item_id=item_id)
+            row = await conn.fetchrow(q, *p)
+
+        if not row["collection_exists"]:
+            raise NotFoundError(f"Collection {collection_id} does not exist.")
+        item = row["item"]
+        if item is None:
             raise NotFoundError(
                 f"Item {item_id} in Collection {collection_id} does not exist."
             )
 
-        return Item(**item_collection["features"][0])
+        item["links"] = await ItemLinks(
+            collection_id=collection_id, item_id=item_id, request=request
+        ).get_links(extra_links=item.get("links"))
+        return Item(**item)
 
     async def post_search(
         self, search_request: PgstacSearch, **kwargs
@@ -247,6 +511,18 @@ class CoreCrudClient(AsyncBaseCoreClient):
         Returns:
             ItemCollection containing items which match the search criteria.
         """
+        media_type = streaming_media_type(kwargs["request"])
+        if media_type:
+            return GeoJSONSeqResponse(
+                self._stream_search(search_request, kwargs["request"]),
+                media_type=media_type,
+            )
+
+        if self.raw_json_passthrough:
+            return await self._search_base_raw(
+                search_request, kwargs["request"], media_type=MimeTypes.geojson.value
+            )
+
         item_collection = await self._search_base(search_request, **kwargs)
         return ItemCollection(**item_collection)
 
@@ -261,6 +537,7 @@ class CoreCrudClient(AsyncBaseCoreClient):
         token: Optional[str] = None,
         fields: Optional[List[str]] = None,
         sortby: Optional[str] = None,
+        context: Optional[str] = None,
         **kwargs,
     ) -> ItemCollection:
         """Cross catalog search (GET).
@@ -309,6 +586,9 @@ class CoreCrudClient(AsyncBaseCoreClient):
                     includes.add(field)
             base_args["fields"] = {"include": includes, "exclude": excludes}
 
+        if context:
+            base_args["context"] = context
+
         # Do the request
         try:
             search_request = self.post_request_model(**base_args)
@@ -1,11 +1,10 @@
 """Database connection handling."""
 
-import json
-from typing import Dict, Union
+from typing import Dict, List, Optional, Union
 
 import attr
 import orjson
-from asyncpg import exceptions, pool
+from asyncpg import Connection, exceptions, pool
 from buildpg import asyncpg, render
 from fastapi import FastAPI
 
@@ -14,6 +13,7 @@ from stac_fastapi.types.errors import (
     DatabaseError,
     ForeignKeyError,
     NotFoundError,
+    StacApiError,
 )
 
 
@@ -52,42 +52,74 @@ async def close_db_connection(app: FastAPI) -> None:
     await app.state.writepool.close()
 
 
-async def dbfunc(pool: pool, func: str, arg: Union[str, Dict]):
+def translate_error(e: exceptions.PostgresError) -> Optional[StacApiError]:
+    """Map a failed pgstac function call to the error returned by the api."""
+    if isinstance(e, exceptions.UniqueViolationError):
+        return ConflictError()
+    elif isinstance(e, exceptions.NoDataFoundError):
+        return NotFoundError()
+    elif isinstance(e, exceptions.NotNullViolationError):
+        return DatabaseError()
+    elif isinstance(e, exceptions.ForeignKeyViolationError):
+        return ForeignKeyError()
+    return None
+
+
+# Update an item with pgstac's `update_item`, unless it is stored with exactly the same
+# content, in one statement
+UPDATE_CHANGED_ITEM_QUERY = """
+    SELECT update_item(item) FROM (SELECT :item::text::jsonb AS item) AS new
+    WHERE NOT EXISTS(
+        SELECT 1 FROM items
+        WHERE id = item->>'id'
+        AND collection_id = item->>'collection'
+        AND content = item
+    );
+"""
+
+
+async def dbcall(conn: Connection, func: str, arg: Union[str, Dict, List]):
+    """Call a PLPGSQL function on an acquired connection, as `dbfunc` does."""
+    if isinstance(arg, str):
+        q, p = render(
+            f"""
+                SELECT * FROM {func}(:item::text);
+                """,
+            item=arg,
+        )
+    else:
+        q, p = render(
+            f"""
+                SELECT * FROM {func}(:item::text::jsonb);
+                """,
+            item=orjson.dumps(arg).decode(),
+        )
+    return await conn.fetchval(q, *p)
+
+
+async def update_changed_item(conn: Connection, item: Dict) -> None:
+    """Update an item on an acquired connection, unless its content is unchanged."""
+    q, p = render(UPDATE_CHANGED_ITEM_QUERY, item=orjson.dumps(item).decode())
+    await conn.execute(q, *p)
+
+
+async def dbfunc(pool: pool, func: str, arg: Union[str, Dict, List]):
     """Wrap PLPGSQL Functions.
 
     Keyword arguments:
     pool -- the asyncpg pool to use to connect to the database
     func -- the name of the PostgreSQL function to call
     arg -- the argument to the PostgreSQL function as either a string
-    or a dict that will be converted into jsonb
+    or a dict or list that will be converted into jsonb
     """
     try:
-        if isinstance(arg, str):
-            async with pool.acquire() as conn:
-                q, p = render(
-                    f"""
-                        SELECT * FROM {func}(:item::text);
-                        """,
-                    item=arg,
-                )
-                return await conn.fetchval(q, *p)
-        else:
-            async with pool.acquire() as conn:
-                q, p = render(
-                    f"""
-                        SELECT * FROM {func}(:item::text::jsonb);
-                        """,
-                    item=json.dumps(arg),
-                )
-                return await conn.fetchval(q, *p)
-    except exceptions.UniqueViolationError as e:
-        raise ConflictError from e
-    except exceptions.NoDataFoundError as e:
-        raise NotFoundError from e
-    except exceptions.NotNullViolationError as e:
-        raise DatabaseError from e
-    except exceptions.ForeignKeyViolationError as e:
-        raise ForeignKeyError from e
+        async with pool.acquire() as conn:
+            return await dbcall(conn, func, arg)
+    except exceptions.PostgresError as e:
+        error = translate_error(e)
+        if error is None:
+            raise
+        raise error from e
 
 
 @attr.s
@@ -1,8 +1,9 @@
 """link helpers."""
 
 import re
+from functools import lru_cache
 from http.client import HTTP_PORT, HTTPS_PORT
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 from urllib.parse import ParseResult, parse_qs, unquote, urlencode, urljoin, urlparse
 
 import attr
@@ -10,6 +11,8 @@ from stac_pydantic.links import Relations
 from stac_pydantic.shared import MimeTypes
 from starlette.requests import Request
 
+from stac_fastapi.types.links import link_templates
+
 # These can be inferred from the item/collection so they aren't included in the database
 # Instead they are dynamically generated when querying the database using the classes defined below
 INFERRED_LINK_RELS = ["self", "item", "parent", "collection", "root"]
@@ -84,6 +87,37 @@ def get_base_url_from_request(request: Request) -> str:
     return url
 
 
+def request_base_url(request: Request) -> str:
+    """Get the base url of a request, deriving it from the request only once."""
+    base_url = getattr(request.state, "base_url", None)
+    if base_url is None:
+        base_url = get_base_url_from_request(request)
+        request.state.base_url = base_url
+    return base_url
+
+
+@lru_cache()
+def _link_methods(cls: Type["BaseLinks"]) -> Tuple[str, ...]:
+    """Names of the `link_` methods of a links class."""
+    return tuple(
+        name
+        for name in dir(cls)
+        if name.startswith("link_") and callable(getattr(cls, name))
+    )
+
+
+@lru_cache()
+def _added_link_methods(
+    cls: Type["BaseLinks"], base: Type["BaseLinks"]
+) -> Tuple[str, ...]:
+    """Names of the `link_` methods which a subclass adds to, or overrides in, `base`."""
+    return tuple(
+        name
+        for name in _link_methods(cls)
+        if getattr(cls, name) is not getattr(base, name, None)
+    )
+
+
 @attr.s
 class BaseLinks:
     """Create inferred links common to collections and items."""
@@ -93,7 +127,7 @@ class BaseLinks:
     @property
     def base_url(self):
         """Get the base url."""
-        return get_base_url_from_request(self.request)
+        return request_base_url(self.request)
 
     @property
     def url(self):
@@ -117,11 +151,10 @@ class BaseLinks:
     def create_links(self) -> List[Dict[str, Any]]:
         """Return all inferred links."""
         links = []
-        for name in dir(self):
-            if name.startswith("link_") and callable(getattr(self, name)):
-                link = getattr(self, name)()
-                if link is not None:
-                    links.append(link)
+        for name in _link_methods(type(self)):
+            link = getattr(self, name)()
+            if link is not None:
+                links.append(link)
         return links
 
     async def get_links(
@@ -133,9 +166,6 @@ class BaseLinks:
         Get the links object for a stac resource by iterating through
         available methods on this class that start with link_.
         """
-        # TODO: Pass request.json() into function so this doesn't need to be coroutine
-        if self.request.method == "POST":
-            self.request.postbody = await self.request.json()
         # join passed in links with generated links
         # and update relative paths
         links = self.create_links()
@@ -165,6 +195,15 @@ class PagingLinks(BaseLinks):
     next: Optional[str] = attr.ib(kw_only=True, default=None)
     prev: Optional[str] = attr.ib(kw_only=True, default=None)
 
+    async def get_links(
+        self, extra_links: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Generate all the links, POST links carry the body of the request."""
+        # TODO: Pass request.json() into function so this doesn't need to be coroutine
+        if self.request.method == "POST":
+            self.request.postbody = await self.request.json()
+        return await super().get_links(extra_links=extra_links)
+
     def link_next(self) -> Optional[Dict[str, Any]]:
         """Create link for next page."""
         if self.next is not None:
@@ -226,10 +265,29 @@ class CollectionLinksBase(BaseLinks):
             href=self.resolve(f"collections/{self.collection_id}"),
         )
 
+    def with_added_links(
+        self, links: List[Dict[str, Any]], base: Type["CollectionLinksBase"]
+    ) -> List[Dict[str, Any]]:
+        """Apply the `link_` methods which subclasses add to, or override in, `base`.
+
+        A method named `link_<rel>` replaces the templated link of that rel, if any.
+        """
+        for name in _added_link_methods(type(self), base):
+            rel = name[len("link_") :]
+            links = [link for link in links if link["rel"] != rel]
+            link = getattr(self, name)()
+            if link is not None:
+                links.append(link)
+        return links
+
 
 @attr.s
 class CollectionLinks(CollectionLinksBase):
-    """Create inferred links specific to collections."""
+    """Create inferred links specific to collections.
+
+    The links of the `link_` methods are rendered from the templates of the base url,
+    those of methods subclasses add or override are created by calling them.
+    """
 
     def link_self(self) -> Dict:
         """Return the self link."""
@@ -251,10 +309,19 @@ class CollectionLinks(CollectionLinksBase):
             href=self.resolve(f"collections/{self.collection_id}/items"),
         )
 
+    def create_links(self) -> List[Dict[str, Any]]:
+        """Return all inferred links, rendered from the templates of the base url."""
+        links = link_templates(self.base_url).collection_links(self.collection_id)
+        return self.with_added_links(links, CollectionLinks)
+
 
 @attr.s
 class ItemLinks(CollectionLinksBase):
-    """Create inferred links specific to items."""
+    """Create inferred links specific to items.
+
+    The links of the `link_` methods are rendered from the templates of the base url,
+    those of methods subclasses add or override are created by calling them.
+    """
 
     item_id: str = attr.ib()
 
@@ -273,3 +340,10 @@ class ItemLinks(CollectionLinksBase):
     def link_collection(self) -> Dict:
         """Create the `collection` link."""
         return self.collection_link()
+
+    def create_links(self) -> List[Dict[str, Any]]:
+        """Return all inferred links, rendered from the templates of the base url."""
+        links = link_templates(self.base_url).item_links(
+            self.collection_id, self.item_id
+        )
+        return self.with_added_links(links, ItemLinks)
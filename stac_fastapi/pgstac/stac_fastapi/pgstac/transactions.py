@@ -1,36 +1,194 @@
 """transactions extension client."""
 
+import asyncio
 import logging
-from typing import Dict
+import time
+from typing import Any, Dict, Optional
 
 import attr
+import orjson
+from asyncpg import Connection, exceptions
+from buildpg import render
 
-from stac_fastapi.pgstac.db import dbfunc
+from stac_fastapi.extensions.third_party.bulk_transactions import (
+    AsyncBaseBulkTransactionsClient,
+    Items,
+)
+from stac_fastapi.pgstac.coalescer import WriteCoalescer
+from stac_fastapi.pgstac.db import (
+    dbcall,
+    dbfunc,
+    translate_error,
+    update_changed_item,
+)
 from stac_fastapi.types import stac as stac_types
 from stac_fastapi.types.core import AsyncBaseTransactionsClient
+from stac_fastapi.types.errors import InvalidPatchError, NotFoundError
 
 logger = logging.getLogger("uvicorn")
 logger.setLevel(logging.INFO)
 
+# Split a batch of items into those not stored yet and those whose content changed,
+# dropping the unchanged ones
+CHANGED_ITEMS_QUERY = """
+    SELECT
+        coalesce(jsonb_agg(item) FILTER (WHERE stored IS NULL), '[]') AS new,
+        coalesce(jsonb_agg(item) FILTER (WHERE stored <> item), '[]') AS changed
+    FROM jsonb_array_elements(:items::text::jsonb) AS batch(item)
+    LEFT JOIN LATERAL (
+        SELECT content AS stored FROM items
+        WHERE id = item->>'id' AND collection_id = item->>'collection'
+        LIMIT 1
+    ) AS existing ON true;
+"""
+
+# Update every item of a batch with pgstac's `update_item`, in one statement.  Not
+# `upsert_items`, which conflicts on (datetime, id) and so would add a second copy of
+# an item whose datetime changed.
+UPDATE_ITEMS_QUERY = """
+    SELECT update_item(item)
+    FROM jsonb_array_elements(:items::text::jsonb) AS batch(item);
+"""
+
+# Members of an item which a patch cannot remove, and properties pgstac indexes
+REQUIRED_MEMBERS = ("properties", "assets", "geometry", "bbox")
+INDEXED_PROPERTIES = ("datetime",)
+
+# Merge a patch into the stored content of an item and write it back with pgstac
+PATCH_ITEM_QUERY = """
+    WITH patched AS (
+        SELECT {content} AS content FROM items
+        WHERE id = :item_id AND collection_id = :collection_id
+    )
+    SELECT content, update_item(content) FROM patched;
+"""
+
+
+def merge_patch_sql(target: str, patch: Any, params: Dict[str, Any]) -> str:
+    """Apply a JSON merge patch (RFC 7396) to a jsonb expression, in SQL.
+
+    Keys set to `null` are removed with `-` and other values are set with `||`, nested
+    objects being merged recursively, so the whole patch is a single expression.  The
+    values of the patch are added to `params`, for `buildpg.render`.
+    """
+
+    def param(value: Any) -> str:
+        name = f"p{len(params)}"
+        params[name] = value
+        return f":{name}"
+
+    def jsonb(value: Any) -> str:
+        return f"{param(orjson.dumps(value).decode())}::text::jsonb"
+
+    if not isinstance(patch, dict):
+        return jsonb(patch)
+    # `->` gives null rather than an error on other types, so only the merge needs this
+    expression = (
+        f"(CASE WHEN jsonb_typeof({target}) = 'object' "
+        f"THEN {target} ELSE '{{}}'::jsonb END)"
+    )
+    removed = [key for key, value in patch.items() if value is None]
+    values = {
+        key: value
+        for key, value in patch.items()
+        if value is not None and not isinstance(value, dict)
+    }
+    if removed:
+        expression = f"({expression} - {param(removed)}::text[])"
+    if values:
+        expression = f"({expression} || {jsonb(values)})"
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            key_param = param(key)
+            nested = merge_patch_sql(f"({target} -> {key_param}::text)", value, params)
+            expression = (
+                f"({expression} || jsonb_build_object({key_param}::text, {nested}))"
+            )
+    return expression
+
+
+async def apply_item_patch(
+    conn: Connection, item_id: str, collection_id: str, patch: Dict[str, Any]
+) -> stac_types.Item:
+    """Apply a merge patch to an item with one query, returning the patched item."""
+    for key, value in (("id", item_id), ("collection", collection_id)):
+        if key in patch and patch[key] != value:
+            raise InvalidPatchError(f"The {key} of an item cannot be patched")
+    for key in REQUIRED_MEMBERS:
+        if key in patch and patch[key] is None:
+            raise InvalidPatchError(f"The {key} of an item cannot be removed")
+    properties = patch.get("properties") or {}
+    for field in INDEXED_PROPERTIES:
+        if field in properties and properties[field] is None:
+            raise InvalidPatchError(f"The {field} of an item cannot be removed")
+    params: Dict[str, Any] = {}
+    content = merge_patch_sql("content", patch, params)
+    q, p = render(
+        PATCH_ITEM_QUERY.format(content=content),
+        item_id=item_id,
+        collection_id=collection_id,
+        **params,
+    )
+    try:
+        row = await conn.fetchrow(q, *p)
+    except exceptions.PostgresError as e:
+        raise (translate_error(e) or e)
+    if row is None:
+        raise NotFoundError(f"Item {item_id} in collection {collection_id}")
+    return row["content"]
+
 
 @attr.s
 class TransactionsClient(AsyncBaseTransactionsClient):
     """Transactions extension specific CRUD operations."""
 
+    write_coalesce_window: Optional[float] = attr.ib(default=None)
+    write_coalesce_max_items: int = attr.ib(default=100)
+    _coalescer: Optional[WriteCoalescer] = attr.ib(init=False)
+
+    @_coalescer.default
+    def _create_coalescer(self) -> Optional[WriteCoalescer]:
+        """Group commits of item writes, when a coalescing window is set."""
+        if not self.write_coalesce_window:
+            return None
+        return WriteCoalescer(
+            window=self.write_coalesce_window,
+            max_items=self.write_coalesce_max_items,
+        )
+
     async def create_item(self, item: stac_types.Item, **kwargs) -> stac_types.Item:
         """Create item."""
         request = kwargs["request"]
         pool = request.app.state.writepool
-        await dbfunc(pool, "create_item", item)
+        if self._coalescer:
+            await self._coalescer.create(pool, item)
+        else:
+            await dbfunc(pool, "create_item", item)
         return item
 
     async def update_item(self, item: stac_types.Item, **kwargs) -> stac_types.Item:
-        """Update item."""
+        """Update item, unless it is stored with the same content already."""
         request = kwargs["request"]
         pool = request.app.state.writepool
-        await dbfunc(pool, "update_item", item)
+        if self._coalescer:
+            await self._coalescer.update(pool, item)
+            return item
+        async with pool.acquire() as conn:
+            try:
+                await update_changed_item(conn, item)
+            except exceptions.PostgresError as e:
+                raise (translate_error(e) or e)
         return item
 
+    async def patch_item(
+        self, item_id: str, collection_id: str, patch: Dict[str, Any], **kwargs
+    ) -> stac_types.Item:
+        """Apply a JSON merge patch to an item."""
+        request = kwargs["request"]
+        pool = request.app.state.writepool
+        async with pool.acquire() as conn:
+            return await apply_item_patch(conn, item_id, collection_id, patch)
+
     async def create_collection(
         self, collection: stac_types.Collection, **kwargs
     ) -> stac_types.Collection:
@@ -62,3 +220,81 @@ class TransactionsClient(AsyncBaseTransactionsClient):
         pool = request.app.state.writepool
         await dbfunc(pool, "delete_collection", collection_id)
         return {"deleted collection": collection_id}
+
+
+@attr.s
+class BulkTransactionsClient(AsyncBaseBulkTransactionsClient):
+    """Postgres bulk transactions.
+
+    Items are sent to pgstac's `create_items` in batches of `batch_size` as a single
+    jsonb array each, with up to `max_concurrency` batches loading at once.  Items
+    already stored with the same content are skipped, and those whose content
+    changed are updated with one statement per batch.  Each batch is loaded in a
+    transaction of its own, and when one fails the batches still loading are
+    cancelled and rolled back.
+    """
+
+    batch_size: int = attr.ib(default=1000)
+    max_concurrency: int = attr.ib(default=4)
+
+    async def bulk_item_insert(
+        self, items: Items, chunk_size: Optional[int] = None, **kwargs
+    ) -> str:
+        """Bulk item insertion using pgstac."""
+        request = kwargs["request"]
+        pool = request.app.state.writepool
+        items = list(items)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        inserted = updated = 0
+
+        async def load(batch):
+            nonlocal inserted, updated
+            async with semaphore, pool.acquire() as conn:
+                q, p = render(CHANGED_ITEMS_QUERY, items=orjson.dumps(batch).decode())
+                try:
+                    async with conn.transaction():
+                        new, changed = await conn.fetchrow(q, *p)
+                        if new:
+                            await dbcall(conn, "create_items", new)
+                        if changed:
+                            q, p = render(
+                                UPDATE_ITEMS_QUERY, items=orjson.dumps(changed).decode()
+                            )
+                            await conn.execute(q, *p)
+                except exceptions.PostgresError as e:
+                    raise (translate_error(e) or e)
+                inserted += len(new)
+                updated += len(changed)
+
+        start = time.perf_counter()
+        tasks = [
+            asyncio.ensure_future(load(batch))
+            for batch in self._chunks(items, chunk_size or self.batch_size)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the other batches, rolling back those still loading
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        elapsed = time.perf_counter() - start
+        rate = len(items) / elapsed if elapsed else 0.0
+        unchanged = len(items) - inserted - updated
+        return (
+            f"Successfully added {len(items)} items ({inserted} inserted, "
+            f"{updated} updated, {unchanged} unchanged, {rate:.0f} items/s)."
+        )
+
+    async def bulk_item_patch(
+        self, collection_id: str, items: Dict[str, Dict[str, Any]], **kwargs
+    ) -> str:
+        """Apply JSON merge patches to items, one query each in one transaction."""
+        request = kwargs["request"]
+        pool = request.app.state.writepool
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for item_id, patch in items.items():
+                    await apply_item_patch(conn, item_id, collection_id, patch)
+        return f"Successfully patched {len(items)} items."
@@ -1,7 +1,10 @@
+import json
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from os import environ
+from pathlib import Path
 
+import httpx
 import pytest
 from fastapi.middleware.cors import CORSMiddleware
 from tests.api.cors_support import (
@@ -13,6 +16,7 @@ from tests.api.cors_support import (
     cors_permit_origin,
 )
 
+from stac_fastapi.api.ingest import Ingester, iter_items, run
 from stac_fastapi.api.middleware import MiddlewareConfig
 
 STAC_CORE_ROUTES = [
@@ -90,6 +94,94 @@ async def test_app_transaction_extension(
     assert resp.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_ingest_resumes_from_checkpoint(app_client, tmp_path):
+    joplin = Path(__file__).parent.parent / "data" / "joplin"
+    with open(joplin / "collection.json") as f:
+        collection = json.load(f)
+    items = list(iter_items(joplin / "index.geojson"))
+    checkpoint = tmp_path / "checkpoint"
+
+    ingester = Ingester(client=app_client, concurrency=4, checkpoint=checkpoint)
+    await ingester.load_collection(collection)
+    await ingester.load_items(items[:10])
+    assert ingester.stats.loaded == 10
+
+    ingester = Ingester(client=app_client, bulk=True, checkpoint=checkpoint)
+    await ingester.load_items(iter_items(joplin))
+    assert ingester.stats.resumed == 10
+    assert ingester.stats.loaded == len(items) - 10
+    assert ingester.stats.failed == 0
+    assert len(checkpoint.read_text().splitlines()) == len(items)
+
+    resp = await app_client.get(
+        f"/collections/{collection['id']}/items", params={"limit": 100}
+    )
+    assert len(resp.json()["features"]) == len(items)
+
+
+@pytest.mark.asyncio
+async def test_ingest_waits_for_ingest_jobs(tmp_path):
+    polls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/bulk_items"):
+            return httpx.Response(202, headers={"location": "http://test/jobs/1"})
+        if request.url.path == "/jobs/1":
+            polls.append(request)
+            if len(polls) < 2:
+                return httpx.Response(200, json={"status": "running"})
+            return httpx.Response(
+                200,
+                json={
+                    "status": "succeeded",
+                    "items_failed": 1,
+                    "failures": [{"id": "b", "error": "invalid"}],
+                },
+            )
+        return httpx.Response(400)
+
+    checkpoint = tmp_path / "checkpoint"
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test/"
+    ) as client:
+        ingester = Ingester(
+            client=client, bulk=True, job_poll_interval=0, checkpoint=checkpoint
+        )
+        await ingester.load_items(
+            [{"id": "a", "collection": "c"}, {"id": "b", "collection": "c"}]
+        )
+
+    # Only the item the job loaded is checkpointed, the failed one is retried alone
+    assert len(polls) == 2
+    assert (ingester.stats.loaded, ingester.stats.failed) == (1, 1)
+    assert checkpoint.read_text().splitlines() == ["c/a"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_counts_unexpected_responses_as_failed():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/bulk_items"):
+            # An ingest job without a location
+            return httpx.Response(202)
+        return httpx.Response(400)
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test/"
+    ) as client:
+        ingester = Ingester(client=client, bulk=True)
+        await ingester.load_items(
+            [{"id": "a", "collection": "c"}, {"id": "b", "collection": "c"}]
+        )
+
+    assert (ingester.stats.loaded, ingester.stats.failed) == (0, 2)
+
+    with pytest.raises(ValueError):
+        Ingester(client=client, bulk=True, on_conflict="skip")
+    with pytest.raises(SystemExit):
+        run(["http://test", "--bulk", "--on-conflict", "skip"])
+
+
 @pytest.mark.asyncio
 async def test_app_query_extension(load_test_data, app_client, load_test_collection):
     coll = load_test_collection
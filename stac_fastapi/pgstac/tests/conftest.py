@@ -14,17 +14,19 @@ from stac_fastapi.api.app import StacApi
 from stac_fastapi.api.middleware import MiddlewareConfig
 from stac_fastapi.api.models import create_get_request_model, create_post_request_model
 from stac_fastapi.extensions.core import (
+    ContextExtension,
     FieldsExtension,
     FilterExtension,
     SortExtension,
     TokenPaginationExtension,
     TransactionExtension,
 )
+from stac_fastapi.extensions.third_party import BulkTransactionExtension, IngestJobs
 from stac_fastapi.pgstac.config import Settings
 from stac_fastapi.pgstac.core import CoreCrudClient
 from stac_fastapi.pgstac.db import close_db_connection, connect_to_db
 from stac_fastapi.pgstac.extensions import QueryExtension
-from stac_fastapi.pgstac.transactions import TransactionsClient
+from stac_fastapi.pgstac.transactions import BulkTransactionsClient, TransactionsClient
 from stac_fastapi.pgstac.types.search import PgstacSearch
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
@@ -92,7 +94,10 @@ async def pgstac(pg):
     await conn.close()
 
 
-def _api_client_provider(middleware_configs: Optional[MiddlewareConfig] = []):
+def _api_client_provider(
+    middleware_configs: Optional[MiddlewareConfig] = [],
+    ingest_jobs: Optional[IngestJobs] = None,
+):
     print("creating client with settings")
 
     extensions = [
@@ -102,6 +107,8 @@ def _api_client_provider(middleware_configs: Optional[MiddlewareConfig] = []):
         SortExtension(),
         FieldsExtension(),
         TokenPaginationExtension(),
+        ContextExtension(),
+        BulkTransactionExtension(client=BulkTransactionsClient(), jobs=ingest_jobs),
     ]
     post_request_model = create_post_request_model(extensions, base_model=PgstacSearch)
 
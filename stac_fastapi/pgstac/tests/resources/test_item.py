@@ -1,3 +1,4 @@
+import asyncio
 import json
 import uuid
 from datetime import datetime, timedelta
@@ -12,8 +13,13 @@ from shapely.geometry import Polygon
 from stac_pydantic import Collection, Item
 from stac_pydantic.shared import DATETIME_RFC339
 from starlette.requests import Request
+from tests.conftest import _api_client_provider
 
+from stac_fastapi.extensions.third_party import IngestJobs
+from stac_fastapi.pgstac.coalescer import WriteCoalescer
+from stac_fastapi.pgstac.db import close_db_connection, connect_to_db
 from stac_fastapi.pgstac.models.links import CollectionLinks
+from stac_fastapi.types.errors import ConflictError, NotFoundError
 
 
 @pytest.mark.asyncio
@@ -133,6 +139,58 @@ async def test_update_item(
     assert get_item.properties.description == "Update Test"
 
 
+@pytest.mark.asyncio
+async def test_patch_item(app_client, load_test_collection, load_test_item):
+    coll = load_test_collection
+    item = load_test_item
+
+    resp = await app_client.patch(
+        f"/collections/{coll.id}/items/{item.id}",
+        content=json.dumps(
+            {
+                "properties": {"description": "Patch Test", "gsd": None},
+                "assets": {"ANG": {"title": "Angles"}},
+            }
+        ),
+        headers={"content-type": "application/merge-patch+json"},
+    )
+    assert resp.status_code == 200
+
+    resp = await app_client.get(f"/collections/{coll.id}/items/{item.id}")
+    assert resp.status_code == 200
+    get_item = resp.json()
+    assert get_item["properties"]["description"] == "Patch Test"
+    assert "gsd" not in get_item["properties"]
+    assert get_item["properties"]["platform"] == item.properties.platform
+    assert get_item["assets"]["ANG"]["title"] == "Angles"
+    assert get_item["assets"]["ANG"]["href"] == item.assets["ANG"].href
+
+    resp = await app_client.patch(
+        f"/collections/{coll.id}/items/missing", json={"properties": {}}
+    )
+    assert resp.status_code == 404
+
+    # Patches cannot remove required members or indexed properties
+    for patch in (
+        {"geometry": None},
+        {"properties": None},
+        {"properties": {"datetime": None}},
+        {"id": "other"},
+    ):
+        resp = await app_client.patch(
+            f"/collections/{coll.id}/items/{item.id}", json=patch
+        )
+        assert resp.status_code == 400
+
+    resp = await app_client.patch(
+        f"/collections/{coll.id}/bulk_items",
+        json={"items": {item.id: {"properties": {"description": "Bulk Patch"}}}},
+    )
+    assert resp.status_code == 200
+    resp = await app_client.get(f"/collections/{coll.id}/items/{item.id}")
+    assert resp.json()["properties"]["description"] == "Bulk Patch"
+
+
 @pytest.mark.asyncio
 async def test_delete_item(
     app_client, load_test_data: Callable, load_test_collection, load_test_item
@@ -1022,6 +1080,25 @@ async def test_field_extension_exclude_and_include(
     assert "properties" not in resp_json["features"][0]
 
 
+@pytest.mark.asyncio
+async def test_field_extension_nested_fields(app_client, load_test_data):
+    """Test POST search excluding a nested field (fields extension)"""
+    test_item = load_test_data("test_item.json")
+    resp = await app_client.post(
+        f"/collections/{test_item['collection']}/items", json=test_item
+    )
+    assert resp.status_code == 200
+
+    body = {"fields": {"exclude": ["assets.ANG.description"]}}
+
+    resp = await app_client.post("/search", json=body)
+    assets = resp.json()["features"][0]["assets"]
+    expected = dict(test_item["assets"]["ANG"])
+    del expected["description"]
+    assert assets["ANG"] == expected
+    assert assets["SR_B1"] == test_item["assets"]["SR_B1"]
+
+
 @pytest.mark.asyncio
 async def test_field_extension_exclude_default_includes(
     app_client, load_test_data, load_test_collection
@@ -1077,6 +1154,37 @@ async def test_relative_link_construction():
     assert links.link_items()["href"] == "http://test/stac/collections/naip/items"
 
 
+@pytest.mark.asyncio
+async def test_link_methods_of_subclasses():
+    class ExtraLinks(CollectionLinks):
+        def link_license(self):
+            return dict(rel="license", href=self.resolve("license"))
+
+        def link_parent(self):
+            return None
+
+    req = Request(
+        scope={
+            "type": "http",
+            "scheme": "http",
+            "method": "GET",
+            "root_path": "",
+            "path": "/",
+            "raw_path": b"/",
+            "query_string": b"",
+            "headers": {},
+            "server": ("test", HTTP_PORT),
+        }
+    )
+    links = await ExtraLinks(collection_id="naip", request=req).get_links()
+    assert {link["rel"]: link["href"] for link in links} == {
+        "self": "http://test/collections/naip",
+        "items": "http://test/collections/naip/items",
+        "root": "http://test/",
+        "license": "http://test/license",
+    }
+
+
 @pytest.mark.asyncio
 async def test_search_bbox_errors(app_client):
     body = {"query": {"bbox": [0]}}
@@ -1301,3 +1409,252 @@ async def test_get_collection_items_duplicate_forwarded_headers(
     )
     for link in resp.json()["features"][0]["links"]:
         assert link["href"].startswith("https://test:1234/")
+
+
+@pytest.mark.asyncio
+async def test_search_streaming_ndjson(
+    app_client, load_test_data, load_test_collection
+):
+    test_item = load_test_data("test_item.json")
+    ids = []
+    for _ in range(3):
+        test_item["id"] = str(uuid.uuid4())
+        resp = await app_client.post(
+            f"/collections/{test_item['collection']}/items", json=test_item
+        )
+        assert resp.status_code == 200
+        ids.append(test_item["id"])
+
+    resp = await app_client.post(
+        "/search",
+        json={"ids": ids, "limit": 2},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = resp.text.splitlines()
+    assert len(lines) == 2
+    for line in lines:
+        feature = json.loads(line)
+        assert feature["id"] in ids
+        assert feature["links"]
+
+
+@pytest.mark.asyncio
+async def test_item_collection_streaming_geojson_seq(
+    app_client, load_test_collection, load_test_item
+):
+    coll = load_test_collection
+    resp = await app_client.get(
+        f"/collections/{coll.id}/items",
+        headers={"Accept": "application/geo+json-seq"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/geo+json-seq")
+    records = [r for r in resp.content.split(b"\x1e") if r]
+    assert len(records) == 1
+    assert json.loads(records[0])["id"] == load_test_item.id
+
+
+@pytest.mark.asyncio
+async def test_search_raw_json_passthrough(
+    app_client, load_test_data, load_test_collection
+):
+    test_item = load_test_data("test_item.json")
+    ids = []
+    for _ in range(3):
+        test_item["id"] = str(uuid.uuid4())
+        resp = await app_client.post(
+            f"/collections/{test_item['collection']}/items", json=test_item
+        )
+        assert resp.status_code == 200
+        ids.append(test_item["id"])
+
+    api = _api_client_provider()
+    api.client.raw_json_passthrough = True
+    async with AsyncClient(app=api.app, base_url="http://test") as client:
+        await connect_to_db(api.app)
+        for url, body in [
+            ("/search", {"ids": ids, "limit": 2}),
+            ("/search", {"ids": ids, "fields": {"exclude": ["links"]}}),
+        ]:
+            resp = await client.post(url, json=body)
+            expected = await app_client.post(url, json=body)
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "application/geo+json"
+            assert resp.json() == expected.json()
+
+        resp = await client.get(f"/collections/{test_item['collection']}/items")
+        expected = await app_client.get(f"/collections/{test_item['collection']}/items")
+        assert resp.json() == expected.json()
+        await close_db_connection(api.app)
+
+
+@pytest.mark.asyncio
+async def test_search_context_modes(app_client, load_test_data, load_test_collection):
+    test_item = load_test_data("test_item.json")
+    resp = await app_client.post(
+        f"/collections/{test_item['collection']}/items", json=test_item
+    )
+    assert resp.status_code == 200
+
+    for mode in ["off", "estimated", "exact-if-cheap", "exact"]:
+        body = {"collections": [test_item["collection"]], "context": mode}
+        resp = await app_client.post("/search", json=body)
+        assert resp.status_code == 200
+        context = resp.json()["context"]
+        assert context["matched_mode"] == mode
+        if mode == "exact":
+            assert context["matched"] == 1
+
+    params = {"collections": test_item["collection"], "context": "exact"}
+    resp = await app_client.get("/search", params=params)
+    assert resp.json()["context"]["matched_mode"] == "exact"
+
+    resp = await app_client.post("/search", json={"context": "sometimes"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_item_insert(app_client, load_test_data, load_test_collection):
+    test_item = load_test_data("test_item.json")
+    items = {}
+    for idx in range(10):
+        item = dict(test_item, id=f"{test_item['id']}-{idx}")
+        items[item["id"]] = item
+
+    resp = await app_client.post(
+        f"/collections/{test_item['collection']}/bulk_items", json={"items": items}
+    )
+    assert resp.status_code == 200
+    assert resp.json().startswith("Successfully added 10 items")
+
+    resp = await app_client.get(
+        f"/collections/{test_item['collection']}/items", params={"limit": 20}
+    )
+    assert {feature["id"] for feature in resp.json()["features"]} == set(items)
+
+    body = b"".join(
+        json.dumps(dict(test_item, id=f"{test_item['id']}-ndjson-{idx}")).encode()
+        + b"\n"
+        for idx in range(3)
+    )
+    resp = await app_client.post(
+        f"/collections/{test_item['collection']}/bulk_items",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == "Successfully added 3 items."
+
+
+@pytest.mark.asyncio
+async def test_write_coalescer(app_client, load_test_data, load_test_collection):
+    test_item = load_test_data("test_item.json")
+    items = [dict(test_item, id=f"{test_item['id']}-{idx}") for idx in range(10)]
+    # The duplicate fails on its own, without failing the rest of its batch
+    items.append(dict(items[0]))
+
+    api = _api_client_provider()
+    await connect_to_db(api.app)
+    pool = api.app.state.writepool
+    coalescer = WriteCoalescer(window=0.05, max_items=8)
+    results = await asyncio.gather(
+        *[coalescer.create(pool, item) for item in items], return_exceptions=True
+    )
+    assert sum(isinstance(result, ConflictError) for result in results) == 1
+
+    resp = await app_client.get(
+        f"/collections/{test_item['collection']}/items", params={"limit": 20}
+    )
+    assert {feature["id"] for feature in resp.json()["features"]} == {
+        item["id"] for item in items
+    }
+
+    updated = dict(items[1], properties=dict(items[1]["properties"], gsd=42))
+    await coalescer.update(pool, updated)
+    resp = await app_client.get(
+        f"/collections/{test_item['collection']}/items/{updated['id']}"
+    )
+    assert resp.json()["properties"]["gsd"] == 42
+
+    with pytest.raises(NotFoundError):
+        await coalescer.update(pool, dict(test_item, id="missing-item"))
+    await close_db_connection(api.app)
+
+
+@pytest.mark.asyncio
+async def test_bulk_items_ingest_job(
+    app_client, load_test_data, load_test_collection, tmp_path
+):
+    test_item = load_test_data("test_item.json")
+    items = {
+        f"{test_item['id']}-{idx}": dict(test_item, id=f"{test_item['id']}-{idx}")
+        for idx in range(5)
+    }
+    missing = dict(test_item, id="missing-collection-item", collection=None)
+    items[missing["id"]] = missing
+
+    api = _api_client_provider(
+        ingest_jobs=IngestJobs(spool_dir=str(tmp_path), batch_size=2)
+    )
+    async with AsyncClient(app=api.app, base_url="http://test") as client:
+        await connect_to_db(api.app)
+        resp = await client.post(
+            f"/collections/{test_item['collection']}/bulk_items",
+            json={"items": items},
+        )
+        assert resp.status_code == 202
+        assert resp.json()["items_total"] == 6
+
+        for _ in range(50):
+            job = (await client.get(resp.headers["location"])).json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            await asyncio.sleep(0.1)
+        assert job["status"] == "succeeded"
+        assert job["items_processed"] == 6
+        assert job["items_failed"] == 1
+        assert job["failures"][0]["id"] == missing["id"]
+        assert list(tmp_path.iterdir()) == []
+
+        resp = await client.get("/jobs/unknown")
+        assert resp.status_code == 404
+        await close_db_connection(api.app)
+
+    resp = await app_client.get(
+        f"/collections/{test_item['collection']}/items", params={"limit": 20}
+    )
+    assert len(resp.json()["features"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_item_insert_unchanged(
+    app_client, load_test_data, load_test_collection
+):
+    test_item = load_test_data("test_item.json")
+    items = {}
+    for idx in range(10):
+        item = dict(test_item, id=f"{test_item['id']}-{idx}")
+        items[item["id"]] = item
+    url = f"/collections/{test_item['collection']}/bulk_items"
+
+    resp = await app_client.post(url, json={"items": items})
+    assert "10 inserted, 0 updated, 0 unchanged" in resp.json()
+
+    # Only items whose content changed are rewritten
+    changed = items[f"{test_item['id']}-0"]
+    changed["properties"] = dict(changed["properties"], gsd=42)
+    resp = await app_client.post(url, json={"items": items})
+    assert resp.status_code == 200
+    assert "0 inserted, 1 updated, 9 unchanged" in resp.json()
+
+    resp = await app_client.get(
+        f"/collections/{test_item['collection']}/items/{changed['id']}"
+    )
+    assert resp.json()["properties"]["gsd"] == 42
+
+    resp = await app_client.put(
+        f"/collections/{test_item['collection']}/items", json=changed
+    )
+    assert resp.status_code == 200
@@ -0,0 +1,103 @@
+"""add collection item counts
+
+Revision ID: b3c9e1f0a7d2
+Revises: 5909bd10f2e6
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3c9e1f0a7d2"
+down_revision = "5909bd10f2e6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "collection_item_counts",
+        sa.Column(
+            "collection_id",
+            sa.VARCHAR(1024),
+            sa.ForeignKey("data.collections.id", ondelete="CASCADE"),
+            nullable=False,
+            primary_key=True,
+        ),
+        sa.Column("item_count", sa.BIGINT, nullable=False, server_default="0"),
+        schema="data",
+    )
+
+    # Statement level triggers, so bulk inserts update each counter once per
+    # statement rather than once per item
+    op.execute(
+        """
+        CREATE FUNCTION data.count_collection_items() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO data.collection_item_counts AS c (collection_id, item_count)
+                SELECT collection_id, count(*) FROM new_items GROUP BY collection_id
+                ON CONFLICT (collection_id)
+                DO UPDATE SET item_count = c.item_count + EXCLUDED.item_count;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE data.collection_item_counts AS c
+                SET item_count = c.item_count - d.n
+                FROM (
+                    SELECT collection_id, count(*) AS n
+                    FROM old_items GROUP BY collection_id
+                ) AS d
+                WHERE c.collection_id = d.collection_id;
+            ELSIF TG_OP = 'UPDATE' THEN
+                -- Only items moved to another collection change the counts
+                INSERT INTO data.collection_item_counts AS c (collection_id, item_count)
+                SELECT collection_id, sum(n) FROM (
+                    SELECT collection_id, 1 AS n FROM new_items
+                    UNION ALL
+                    SELECT collection_id, -1 AS n FROM old_items
+                ) AS d
+                GROUP BY collection_id
+                HAVING sum(n) <> 0
+                ON CONFLICT (collection_id)
+                DO UPDATE SET item_count = c.item_count + EXCLUDED.item_count;
+            ELSIF TG_OP = 'TRUNCATE' THEN
+                UPDATE data.collection_item_counts SET item_count = 0;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER count_inserted_items AFTER INSERT ON data.items
+        REFERENCING NEW TABLE AS new_items
+        FOR EACH STATEMENT EXECUTE FUNCTION data.count_collection_items();
+
+        CREATE TRIGGER count_deleted_items AFTER DELETE ON data.items
+        REFERENCING OLD TABLE AS old_items
+        FOR EACH STATEMENT EXECUTE FUNCTION data.count_collection_items();
+
+        CREATE TRIGGER count_updated_items AFTER UPDATE ON data.items
+        REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+        FOR EACH STATEMENT EXECUTE FUNCTION data.count_collection_items();
+
+        CREATE TRIGGER count_truncated_items AFTER TRUNCATE ON data.items
+        FOR EACH STATEMENT EXECUTE FUNCTION data.count_collection_items();
+        """
+    )
+
+    # Count the items which already exist.  Creating the triggers locks out writes to
+    # the items until the migration commits, so none are missed or counted twice
+    op.execute(
+        """
+        INSERT INTO data.collection_item_counts (collection_id, item_count)
+        SELECT collection_id, count(*) FROM data.items GROUP BY collection_id
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER count_truncated_items ON data.items")
+    op.execute("DROP TRIGGER count_updated_items ON data.items")
+    op.execute("DROP TRIGGER count_deleted_items ON data.items")
+    op.execute("DROP TRIGGER count_inserted_items ON data.items")
+    op.execute("DROP FUNCTION data.count_collection_items()")
+    op.drop_table("collection_item_counts", schema="data")
@@ -0,0 +1,28 @@
+"""add item content hash
+
+Revision ID: e4a7c2d9b1f3
+Revises: b3c9e1f0a7d2
+Create Date: 2026-10-17 14:03:27.118604
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4a7c2d9b1f3"
+down_revision = "b3c9e1f0a7d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing items have no hash, so their next write always updates them
+    op.add_column(
+        "items",
+        sa.Column("content_hash", sa.VARCHAR(64), nullable=True),
+        schema="data",
+    )
+
+
+def downgrade():
+    op.drop_column("items", "content_hash", schema="data")
@@ -7,7 +7,8 @@ with open("README.md") as f:
 
 install_requires = [
     "attrs",
-    "pydantic[dotenv]",
+    "orjson>=3.9",
+    "pydantic[dotenv]>=1.9,<2",
     "stac_pydantic==2.0.*",
     "stac-fastapi.types",
     "stac-fastapi.api",
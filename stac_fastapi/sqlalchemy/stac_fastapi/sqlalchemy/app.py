@@ -1,4 +1,6 @@
 """FastAPI application."""
+from fastapi.responses import ORJSONResponse
+
 from stac_fastapi.api.app import StacApi
 from stac_fastapi.api.models import create_get_request_model, create_post_request_model
 from stac_fastapi.extensions.core import (
@@ -8,7 +10,7 @@ from stac_fastapi.extensions.core import (
     TokenPaginationExtension,
     TransactionExtension,
 )
-from stac_fastapi.extensions.third_party import BulkTransactionExtension
+from stac_fastapi.extensions.third_party import BulkTransactionExtension, IngestJobs
 from stac_fastapi.sqlalchemy.config import SqlalchemySettings
 from stac_fastapi.sqlalchemy.core import CoreCrudClient
 from stac_fastapi.sqlalchemy.extensions import QueryExtension
@@ -21,13 +23,30 @@ from stac_fastapi.sqlalchemy.transactions import (
 settings = SqlalchemySettings()
 session = Session.create_from_settings(settings)
 extensions = [
-    TransactionExtension(client=TransactionsClient(session=session), settings=settings),
-    BulkTransactionExtension(client=BulkTransactionsClient(session=session)),
+    TransactionExtension(
+        client=TransactionsClient(
+            session=session,
+            write_coalesce_window=settings.write_coalesce_window,
+            write_coalesce_max_items=settings.write_coalesce_max_items,
+        ),
+        settings=settings,
+        response_class=ORJSONResponse,
+    ),
+    BulkTransactionExtension(
+        client=BulkTransactionsClient(
+            session=session, copy_ingest=settings.bulk_copy_ingest
+        ),
+        jobs=IngestJobs(spool_dir=settings.ingest_spool_dir)
+        if settings.ingest_spool_dir
+        else None,
+    ),
     FieldsExtension(),
     QueryExtension(),
     SortExtension(),
     TokenPaginationExtension(),
-    ContextExtension(),
+    ContextExtension(
+        mode=settings.context_mode, exact_threshold=settings.context_exact_threshold
+    ),
 ]
 
 post_request_model = create_post_request_model(extensions)
@@ -36,8 +55,18 @@ api = StacApi(
     settings=settings,
     extensions=extensions,
     client=CoreCrudClient(
-        session=session, extensions=extensions, post_request_model=post_request_model
+        session=session,
+        extensions=extensions,
+        post_request_model=post_request_model,
+        token_signing_key=settings.pagination_token_secret,
+        compress_tokens=settings.compress_pagination_tokens,
+        geometry_passthrough=settings.geometry_passthrough,
+        core_read_path=settings.core_read_path,
+        context_count_timeout=settings.context_count_timeout,
+        context_count_workers=settings.context_count_workers,
+        response_class=ORJSONResponse,
     ),
+    response_class=ORJSONResponse,
     search_get_request_model=create_get_request_model(extensions),
     search_post_request_model=post_request_model,
 )
@@ -0,0 +1,165 @@
+"""Group commits of concurrent single item writes."""
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Type
+
+import attr
+import sqlalchemy as sa
+from sqlalchemy.orm import Session as SqlSession
+
+from stac_fastapi.sqlalchemy.models import database
+from stac_fastapi.sqlalchemy.session import Session, translate_error
+from stac_fastapi.types.errors import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s
+class PendingWrite:
+    """The column values of an item waiting to be written, and its caller's future."""
+
+    op: str = attr.ib()
+    values: Dict[str, Any] = attr.ib()
+    future: Future = attr.ib(factory=Future)
+    result: Any = attr.ib(default=None)
+    error: Optional[Exception] = attr.ib(default=None)
+
+
+@attr.s
+class WriteCoalescer:
+    """Commit concurrent item creates and updates together.
+
+    Writes are collected for up to `window` seconds after the first one arrives, or
+    until `max_items` are pending, and committed in one transaction by a worker thread.
+    Consecutive creates are inserted with a single multi-row statement.  If that fails,
+    each write is retried on a savepoint of its own, so every caller gets its own result
+    or error.
+    """
+
+    session: Session = attr.ib()
+    item_table: Type[database.Item] = attr.ib(default=database.Item)
+    window: float = attr.ib(default=0.005)
+    max_items: int = attr.ib(default=100)
+    _queue: queue.Queue = attr.ib(init=False, factory=queue.Queue)
+    _worker: Optional[threading.Thread] = attr.ib(init=False, default=None)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def create(self, values: Dict[str, Any]) -> None:
+        """Insert an item row, blocking until its batch has committed."""
+        self._submit(PendingWrite("create", values))
+
+    def update(self, values: Dict[str, Any]) -> Optional[Any]:
+        """Update the columns of an item, blocking until its batch has committed.
+
+        Returns the stored row, with its geometry as GeoJSON text, when the item's
+        content hash is unchanged and it was not rewritten.
+        """
+        return self._submit(PendingWrite("update", values))
+
+    def _submit(self, write: PendingWrite) -> Any:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="write-coalescer", daemon=True
+                )
+                self._worker.start()
+        self._queue.put(write)
+        return write.future.result()
+
+    def _collect(self) -> List[PendingWrite]:
+        """Block for the next write, then gather those arriving within the window."""
+        writes = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(writes) < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                writes.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return writes
+
+    def _run(self):
+        while True:
+            writes = self._collect()
+            try:
+                with self.session.writer.context_session() as session:
+                    for op, run in itertools.groupby(writes, key=lambda w: w.op):
+                        run = list(run)
+                        if op == "create" and len(run) > 1:
+                            if self._insert_all(session, run):
+                                continue
+                        for write in run:
+                            self._write_one(session, write)
+            except Exception as e:
+                logger.error(
+                    "write batch of %s items failed", len(writes), exc_info=True
+                )
+                for write in writes:
+                    write.future.set_exception(write.error or e)
+                continue
+            for write in writes:
+                if write.error:
+                    write.future.set_exception(write.error)
+                else:
+                    write.future.set_result(write.result)
+
+    def _insert_all(self, session: SqlSession, writes: List[PendingWrite]) -> bool:
+        """Insert every item of a run of creates with one statement."""
+        statement = self.item_table.__table__.insert().values(
+            [write.values for write in writes]
+        )
+        try:
+            with session.begin_nested():
+                session.execute(statement)
+        except sa.exc.StatementError:
+            return False
+        return True
+
+    def _write_one(self, session: SqlSession, write: PendingWrite):
+        try:
+            with session.begin_nested():
+                if write.op == "create":
+                    session.execute(
+                        self.item_table.__table__.insert().values(write.values)
+                    )
+                    return
+                item_id = write.values["id"]
+                collection_id = write.values["collection_id"]
+                query = (
+                    session.query(self.item_table)
+                    .filter(self.item_table.id == item_id)
+                    .filter(self.item_table.collection_id == collection_id)
+                )
+                # Items whose content hash is unchanged are not rewritten
+                updated = query.filter(
+                    self.item_table.content_hash.is_distinct_from(
+                        write.values.get("content_hash")
+                    )
+                ).update(write.values, synchronize_session=False)
+                if updated:
+                    return
+                table = self.item_table.__table__
+                columns = [c for c in table.columns if c.name != "geometry"]
+                stored = session.execute(
+                    sa.select(
+                        [
+                            *columns,
+                            sa.func.ST_AsGeoJSON(table.c.geometry).label("geometry"),
+                        ]
+                    )
+                    .where(table.c.id == item_id)
+                    .where(table.c.collection_id == collection_id)
+                ).first()
+                if stored is None:
+                    write.error = NotFoundError(
+                        f"Item {item_id} in collection {collection_id}"
+                    )
+                write.result = stored
+        except sa.exc.StatementError as e:
+            write.error = translate_error(e)
@@ -1,5 +1,5 @@
 """Postgres API configuration."""
-from typing import Set
+from typing import Optional, Set
 
 from stac_fastapi.types.config import ApiSettings
 
@@ -14,6 +14,35 @@ class SqlalchemySettings(ApiSettings):
         postgres_host_writer: hostname for the writer connection.
         postgres_port: database port.
         postgres_dbname: database name.
+        pagination_token_secret:
+            secret used to sign stateless pagination tokens.  When unset, keysets are
+            stored in the `data.tokens` table.
+        compress_pagination_tokens:
+            zlib compress stateless pagination tokens when it makes them shorter.
+        geometry_passthrough:
+            select item geometries as GeoJSON rendered by PostGIS rather than decoding
+            WKB in python.
+        core_read_path:
+            run search and item collection queries with SQLAlchemy core rather than
+            hydrating ORM instances.
+        context_count_timeout:
+            seconds the context extension's `matched` count may take, counted from the
+            start of the request's queries.  The count runs concurrently with the page
+            query.  When it runs out, `matched` is the planner's estimate with
+            `matched_mode: estimated` if that is known by then, and is omitted otherwise.
+        context_count_workers: number of counts which may run concurrently.
+        bulk_copy_ingest:
+            load bulk item inserts with COPY through a staging table, updating items
+            which already exist.
+        write_coalesce_window:
+            seconds concurrent item creates and updates are collected for, to be
+            committed together in one transaction.  Each write is committed on its own
+            when unset.
+        write_coalesce_max_items: most item writes committed together.
+        ingest_spool_dir:
+            directory bulk item uploads are spooled to.  When set, uploads are loaded by
+            background ingest jobs, reported by `GET /jobs/{job_id}`, and the bulk items
+            endpoint answers `202 Accepted`.
     """
 
     postgres_user: str
@@ -29,6 +58,22 @@ class SqlalchemySettings(ApiSettings):
     # Fields which are item properties but indexed as distinct fields in the database model
     indexed_fields: Set[str] = {"datetime"}
 
+    pagination_token_secret: Optional[str] = None
+    compress_pagination_tokens: bool = True
+
+    geometry_passthrough: bool = False
+    core_read_path: bool = False
+
+    context_count_timeout: Optional[float] = None
+    context_count_workers: int = 4
+
+    bulk_copy_ingest: bool = False
+
+    write_coalesce_window: Optional[float] = None
+    write_coalesce_max_items: int = 100
+
+    ingest_spool_dir: Optional[str] = None
+
     @property
     def reader_connection_string(self):
         """Create reader psql connection string."""
@@ -1,29 +1,55 @@
 """Item crud client."""
+import functools
 import json
 import logging
 import operator
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import List, Optional, Set, Type, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 from urllib.parse import urlencode, urljoin
 
 import attr
 import geoalchemy2 as ga
+import psycopg2
 import sqlalchemy as sa
-import stac_pydantic
 from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 from shapely.geometry import Polygon as ShapelyPolygon
 from shapely.geometry import shape
-from sqlakeyset import get_page
+from sqlakeyset import get_page, select_page
+from sqlakeyset.results import Page
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array
+from sqlalchemy.orm import Query
 from sqlalchemy.orm import Session as SqlSession
+from sqlalchemy.orm import defer, with_expression
 from stac_pydantic.links import Relations
 from stac_pydantic.shared import MimeTypes
+from starlette.responses import JSONResponse, Response
 
+from stac_fastapi.api.models import GeoJSONSeqResponse, streaming_media_type
+from stac_fastapi.extensions.core.context import ContextMode
+from stac_fastapi.extensions.core.fields import FieldsProjector
 from stac_fastapi.sqlalchemy import serializers
+from stac_fastapi.sqlalchemy.explain import estimate_rows
 from stac_fastapi.sqlalchemy.extensions.query import Operator
 from stac_fastapi.sqlalchemy.links import get_base_url_from_request
 from stac_fastapi.sqlalchemy.models import database
+from stac_fastapi.sqlalchemy.serializers import FieldsProjection, is_projected
 from stac_fastapi.sqlalchemy.session import Session
 from stac_fastapi.sqlalchemy.tokens import PaginationTokenClient
 from stac_fastapi.types.config import Settings
@@ -36,6 +62,35 @@ logger = logging.getLogger(__name__)
 
 NumType = Union[float, int]
 
+# Enough decimal digits for ST_AsGeoJSON to round trip double precision coordinates
+GEOJSON_MAX_DECIMAL_DIGITS = 15
+
+# Top level item fields, in the order they are returned
+ITEM_FIELDS = (
+    "type",
+    "stac_version",
+    "stac_extensions",
+    "id",
+    "collection",
+    "geometry",
+    "bbox",
+    "properties",
+    "links",
+    "assets",
+)
+# Item fields stored as JSONB, which the fields extension can project key by key
+JSONB_ITEM_FIELDS = ("properties", "assets")
+# Search parameters which select, sort or page items without filtering them
+NON_FILTERING_SEARCH_FIELDS = {
+    "collections",
+    "limit",
+    "token",
+    "sortby",
+    "fields",
+    "context",
+    "filter_lang",
+}
+
 
 @attr.s
 class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
@@ -44,12 +99,31 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
     session: Session = attr.ib(default=attr.Factory(Session.create_from_env))
     item_table: Type[database.Item] = attr.ib(default=database.Item)
     collection_table: Type[database.Collection] = attr.ib(default=database.Collection)
+    item_count_table: Type[database.CollectionItemCount] = attr.ib(
+        default=database.CollectionItemCount
+    )
     item_serializer: Type[serializers.Serializer] = attr.ib(
         default=serializers.ItemSerializer
     )
     collection_serializer: Type[serializers.Serializer] = attr.ib(
         default=serializers.CollectionSerializer
     )
+    stream_chunk_size: int = attr.ib(default=500)
+    geometry_passthrough: bool = attr.ib(default=False)
+    core_read_path: bool = attr.ib(default=False)
+    context_count_timeout: Optional[float] = attr.ib(default=None)
+    context_count_workers: int = attr.ib(default=4)
+    # Response class of the api, search geometries are only passed through by orjson
+    response_class: Type[Response] = attr.ib(default=JSONResponse)
+    _count_executor: ThreadPoolExecutor = attr.ib(init=False)
+
+    @_count_executor.default
+    def _create_count_executor(self) -> ThreadPoolExecutor:
+        """Threads running context counts next to the page queries."""
+        return ThreadPoolExecutor(
+            max_workers=self.context_count_workers,
+            thread_name_prefix="context-count",
+        )
 
     @staticmethod
     def _lookup_id(
@@ -99,26 +173,179 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
             collection = self._lookup_id(collection_id, self.collection_table, session)
             return self.collection_serializer.db_to_stac(collection, base_url)
 
+    def _context_mode(
+        self, search_request: Optional[BaseSearchPostRequest] = None
+    ) -> ContextMode:
+        """Context mode of a request, falling back to the extension's default."""
+        mode = getattr(search_request, "context", None)
+        if mode is None:
+            mode = self.get_extension("ContextExtension").mode or ContextMode.exact
+        return mode
+
+    def _count(
+        self,
+        build_query: Callable[[SqlSession], Query],
+        mode: ContextMode,
+        estimate: Dict[str, int],
+    ) -> Tuple[Optional[int], ContextMode]:
+        """Count the rows of a query within the context count budget.
+
+        Runs on a reader connection of its own.  The planner's estimate is stored in
+        `estimate` as soon as it is known, so it can stand in for an exact count which
+        misses the budget.  The budget is also enforced by the database as a statement
+        timeout.
+
+        Returns:
+            `matched` and the mode it was computed with.
+        """
+        with self.session.reader.context_session() as session:
+            if self.context_count_timeout is not None:
+                session.execute(
+                    sa.text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": str(max(1, int(self.context_count_timeout * 1000)))},
+                )
+            statement = build_query(session).statement.order_by(None)
+            try:
+                if mode != ContextMode.exact or self.context_count_timeout is not None:
+                    estimate["rows"] = estimate_rows(session, statement)
+                    if mode == ContextMode.estimated or (
+                        mode == ContextMode.exact_if_cheap
+                        and estimate["rows"]
+                        >= self.get_extension("ContextExtension").exact_threshold
+                    ):
+                        return estimate["rows"], ContextMode.estimated
+
+                count_query = statement.with_only_columns([func.count()])
+                return session.execute(count_query).scalar(), ContextMode.exact
+            except sa.exc.OperationalError as e:
+                if isinstance(e.orig, psycopg2.errors.QueryCanceled):
+                    if "rows" in estimate:
+                        return estimate["rows"], ContextMode.estimated
+                    return None, ContextMode.off
+                raise
+
+    @staticmethod
+    def _counted(
+        matched: Optional[int], mode: ContextMode
+    ) -> Callable[[], Tuple[Optional[int], ContextMode]]:
+        """Count known without querying, in the form returned by `_start_count`."""
+        return lambda: (matched, mode)
+
+    def _collection_item_count(self, collection_ids: Optional[List[str]]) -> int:
+        """Number of items in some collections, or in all of them, from the counters."""
+        with self.session.reader.context_session() as session:
+            query = session.query(
+                func.coalesce(func.sum(self.item_count_table.item_count), 0)
+            )
+            if collection_ids:
+                query = query.filter(
+                    self.item_count_table.collection_id.in_(collection_ids)
+                )
+            return int(query.scalar())
+
+    def _collection_count(
+        self, collection_ids: Optional[List[str]], mode: ContextMode
+    ) -> Callable[[], Tuple[Optional[int], ContextMode]]:
+        """Count the items of some collections, or of all of them.
+
+        The per-collection counters kept by the database make this exact and cheap,
+        whatever the number of items, so it is only skipped in `off` mode.
+        """
+        if mode == ContextMode.off:
+            return self._counted(None, ContextMode.off)
+        return self._counted(
+            self._collection_item_count(collection_ids), ContextMode.exact
+        )
+
+    @staticmethod
+    def _filters_only_collections(search_request: BaseSearchPostRequest) -> bool:
+        """Whether a search selects whole collections (or everything)."""
+        return not any(
+            value
+            for key, value in search_request.dict(
+                exclude=NON_FILTERING_SEARCH_FIELDS
+            ).items()
+        )
+
+    def _start_count(
+        self, build_query: Callable[[SqlSession], Query], mode: ContextMode
+    ) -> Callable[[], Tuple[Optional[int], ContextMode]]:
+        """Start counting the rows of a query, concurrently with the page query.
+
+        Returns a function waiting for the count until `context_count_timeout`
+        seconds after the count was started.  An exact count which does not finish in
+        time is replaced with the planner's estimate, if that is known by then, and a
+        count still waiting for a worker is cancelled.
+        """
+        if mode == ContextMode.off:
+            return self._counted(None, ContextMode.off)
+
+        deadline = (
+            None
+            if self.context_count_timeout is None
+            else time.monotonic() + self.context_count_timeout
+        )
+        estimate: Dict[str, int] = {}
+        future: Future = self._count_executor.submit(
+            self._count, build_query, mode, estimate
+        )
+
+        def wait() -> Tuple[Optional[int], ContextMode]:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # A count still queued behind others is not started at all
+                future.cancel()
+                logger.debug(
+                    "Context count missed its %ss budget", self.context_count_timeout
+                )
+                if "rows" in estimate:
+                    return estimate["rows"], ContextMode.estimated
+                return None, ContextMode.off
+
+        return wait
+
+    @staticmethod
+    def _context(
+        returned: int, limit: int, matched: Optional[int], mode: ContextMode
+    ) -> Dict[str, Union[int, str]]:
+        """Context extension object, `matched` is omitted when it is unknown."""
+        context: Dict[str, Union[int, str]] = {"returned": returned, "limit": limit}
+        if matched is not None:
+            context["matched"] = matched
+        context["matched_mode"] = mode.value
+        return context
+
     def item_collection(
         self, collection_id: str, limit: int = 10, token: str = None, **kwargs
     ) -> ItemCollection:
         """Read an item collection from the database."""
         base_url = get_base_url_from_request(kwargs["request"])
-        with self.session.reader.context_session() as session:
-            collection_children = (
-                session.query(self.item_table)
-                .join(self.collection_table)
-                .filter(self.collection_table.id == collection_id)
-                .order_by(self.item_table.datetime.desc(), self.item_table.id)
+        media_type = streaming_media_type(kwargs["request"])
+        if media_type:
+            return GeoJSONSeqResponse(
+                self._stream_items(
+                    lambda session: self._item_collection_query(session, collection_id),
+                    limit=limit,
+                    token=self.get_token(token) if token else False,
+                    base_url=base_url,
+                ),
+                media_type=media_type,
             )
-            count = None
-            if self.extension_is_enabled("ContextExtension"):
-                count_query = collection_children.statement.with_only_columns(
-                    [func.count()]
-                ).order_by(None)
-                count = collection_children.session.execute(count_query).scalar()
+
+        matched: Optional[Callable[[], Tuple[Optional[int], ContextMode]]] = None
+        if self.extension_is_enabled("ContextExtension"):
+            matched = self._collection_count([collection_id], self._context_mode())
+
+        with self.session.reader.context_session() as session:
+            collection_children = self._item_collection_query(session, collection_id)
             token = self.get_token(token) if token else token
-            page = get_page(collection_children, per_page=limit, page=(token or False))
+            page = self._get_page(
+                collection_children, per_page=limit, page=(token or False)
+            )
             # Create dynamic attributes for each page
             page.next = (
                 self.insert_token(keyset=page.paging.bookmark_next)
@@ -153,17 +380,11 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
 
             response_features = []
             for item in page:
-                response_features.append(
-                    self.item_serializer.db_to_stac(item, base_url=base_url)
-                )
+                response_features.append(self._serialize_item(item, base_url))
 
             context_obj = None
-            if self.extension_is_enabled("ContextExtension"):
-                context_obj = {
-                    "returned": len(page),
-                    "limit": limit,
-                    "matched": count,
-                }
+            if matched is not None:
+                context_obj = self._context(len(page), limit, *matched())
 
             return ItemCollection(
                 type="FeatureCollection",
@@ -172,17 +393,140 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
                 context=context_obj,
             )
 
+    def _item_query(self, session: SqlSession) -> Query:
+        """Query items, selecting geometries as GeoJSON text in passthrough mode."""
+        query = session.query(self.item_table)
+        if self.geometry_passthrough:
+            query = query.options(
+                defer(self.item_table.geometry),
+                with_expression(
+                    self.item_table.geometry_geojson,
+                    ga.func.ST_AsGeoJSON(
+                        self.item_table.geometry, GEOJSON_MAX_DECIMAL_DIGITS
+                    ),
+                ),
+            )
+        return query
+
+    def _geometry_column(self) -> sa.sql.ColumnElement:
+        """Geometry column selected by the core read path."""
+        geometry = self.item_table.__table__.c.geometry
+        if self.geometry_passthrough:
+            return ga.func.ST_AsGeoJSON(geometry, GEOJSON_MAX_DECIMAL_DIGITS).label(
+                "geometry"
+            )
+        return geometry
+
+    def _item_columns(self) -> List[sa.sql.ColumnElement]:
+        """Columns selected by the core read path."""
+        table = self.item_table.__table__
+        columns = [column for column in table.columns if column.name != "geometry"]
+        columns.append(self._geometry_column())
+        return columns
+
+    def _get_page(
+        self,
+        query: Query,
+        per_page: int,
+        page: Union[str, bool],
+        columns: Optional[Sequence[sa.sql.ColumnElement]] = None,
+    ) -> Page:
+        """Fetch a page of items.
+
+        With `core_read_path`, or when `columns` are given, the statement built by the
+        ORM query is executed with SQLAlchemy core instead, which yields plain rows
+        and skips ORM instance hydration.  Keyset pagination is the same in all cases.
+        """
+        if columns is None and self.core_read_path:
+            columns = self._item_columns()
+        if columns is not None:
+            statement = query.statement.with_only_columns(columns)
+            return select_page(query.session, statement, per_page=per_page, page=page)
+        return get_page(query, per_page=per_page, page=page)
+
+    @property
+    def _raw_geometry(self) -> bool:
+        """Whether search responses are rendered by orjson, so can hold fragments."""
+        return issubclass(self.response_class, ORJSONResponse)
+
+    def _serialize_item(
+        self, item: database.Item, base_url: str, raw_geometry: bool = False
+    ) -> Item:
+        """Serialize an item, passing its geometry through unparsed if allowed."""
+        if self.core_read_path:
+            return self.item_serializer.row_to_stac(
+                item, base_url=base_url, raw_geometry=raw_geometry
+            )
+        if self.geometry_passthrough:
+            return self.item_serializer.db_to_stac(
+                item, base_url=base_url, raw_geometry=raw_geometry
+            )
+        return self.item_serializer.db_to_stac(item, base_url=base_url)
+
+    def _item_collection_query(self, session: SqlSession, collection_id: str) -> Query:
+        """Build the query for all items of a collection."""
+        return (
+            self._item_query(session)
+            .join(self.collection_table)
+            .filter(self.collection_table.id == collection_id)
+            .order_by(self.item_table.datetime.desc(), self.item_table.id)
+        )
+
+    def _stream_items(
+        self,
+        build_query: Callable[[SqlSession], Query],
+        limit: int,
+        token: Union[str, bool],
+        base_url: str,
+        projector: Optional[FieldsProjector] = None,
+    ) -> Iterator[Item]:
+        """Yield serialized items, fetching at most `stream_chunk_size` rows at a time.
+
+        The response body is produced after the endpoint returns, so the generator
+        owns its session.  Chunks are fetched with the same keyset pagination used
+        for pages, which keeps memory flat regardless of `limit`.
+        """
+        columns = None
+        if projector is not None:
+            projection = self._fields_projection(projector)
+            columns = self._projected_columns(projection)
+        with self.session.reader.context_session() as session:
+            query = build_query(session)
+            remaining = limit
+            while remaining > 0:
+                page = self._get_page(
+                    query,
+                    per_page=min(remaining, self.stream_chunk_size),
+                    page=token,
+                    columns=columns,
+                )
+                for item in page:
+                    if projector is not None:
+                        yield projector(
+                            self.item_serializer.projected_row_to_stac(
+                                item, projection, base_url, raw_geometry=True
+                            )
+                        )
+                    else:
+                        yield self._serialize_item(item, base_url, raw_geometry=True)
+                remaining -= len(page)
+                if not page.paging.has_next:
+                    break
+                token = page.paging.bookmark_next
+                # Release the ORM instances of the chunk we just streamed
+                session.expunge_all()
+
     def get_item(self, item_id: str, collection_id: str, **kwargs) -> Item:
         """Get item by id."""
         base_url = get_base_url_from_request(kwargs["request"])
         with self.session.reader.context_session() as session:
-            db_query = session.query(self.item_table)
+            db_query = self._item_query(session)
             db_query = db_query.filter(self.item_table.collection_id == collection_id)
             db_query = db_query.filter(self.item_table.id == item_id)
             item = db_query.first()
             if not item:
                 raise NotFoundError(f"{self.item_table.__name__} {item_id} not found")
-            return self.item_serializer.db_to_stac(item, base_url=base_url)
+            return self._serialize_item(item, base_url)
 
     def get_search(
         self,
@@ -195,6 +539,7 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
         token: Optional[str] = None,
         fields: Optional[List[str]] = None,
         sortby: Optional[str] = None,
+        context: Optional[str] = None,
         **kwargs,
     ) -> ItemCollection:
         """GET search catalog."""
@@ -235,12 +580,17 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
                     includes.add(field)
             base_args["fields"] = {"include": includes, "exclude": excludes}
 
+        if context:
+            base_args["context"] = context
+
         # Do the request
         try:
             search_request = self.post_request_model(**base_args)
         except ValidationError:
             raise HTTPException(status_code=400, detail="Invalid parameters provided")
         resp = self.post_search(search_request, request=kwargs["request"])
+        if isinstance(resp, Response):
+            return resp
 
         # Pagination
         page_links = []
@@ -259,136 +609,255 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
         resp["links"] = page_links
         return resp
 
+    def _search_query(
+        self, session: SqlSession, search_request: BaseSearchPostRequest
+    ) -> Query:
+        """Build the filtered and sorted item query for a search request."""
+        query = self._item_query(session)
+
+        # Filter by collection
+        if search_request.collections:
+            query = query.join(self.collection_table).filter(
+                sa.or_(
+                    *[
+                        self.collection_table.id == col_id
+                        for col_id in search_request.collections
+                    ]
+                )
+            )
+
+        # Sort
+        if search_request.sortby:
+            sort_fields = [
+                getattr(
+                    self.item_table.get_field(sort.field),
+                    sort.direction.value,
+                )()
+                for sort in search_request.sortby
+            ]
+            sort_fields.append(self.item_table.id)
+            query = query.order_by(*sort_fields)
+        else:
+            # Default sort is date
+            query = query.order_by(self.item_table.datetime.desc(), self.item_table.id)
+
+        # Ignore other parameters if ID is present
+        if search_request.ids:
+            id_filter = sa.or_(*[self.item_table.id == i for i in search_request.ids])
+            return query.filter(id_filter).order_by(self.item_table.id)
+
+        # Spatial query
+        geom = None
+        if search_request.intersects is not None:
+            geom = shape(search_request.intersects)
+        elif search_request.bbox:
+            if len(search_request.bbox) == 4:
+                geom = ShapelyPolygon.from_bounds(*search_request.bbox)
+            elif len(search_request.bbox) == 6:
+                """Shapely doesn't support 3d bounding boxes we'll just use the 2d portion"""
+                bbox_2d = [
+                    search_request.bbox[0],
+                    search_request.bbox[1],
+                    search_request.bbox[3],
+                    search_request.bbox[4],
+                ]
+                geom = ShapelyPolygon.from_bounds(*bbox_2d)
+
+        if geom:
+            filter_geom = ga.shape.from_shape(geom, srid=4326)
+            query = query.filter(
+                ga.func.ST_Intersects(self.item_table.geometry, filter_geom)
+            )
+
+        # Temporal query
+        if search_request.datetime:
+            # Two tailed query (between)
+            dts = search_request.datetime.split("/")
+            # Non-interval date ex. "2000-02-02T00:00:00.00Z"
+            if len(dts) == 1:
+                query = query.filter(self.item_table.datetime == dts[0])
+            elif ".." not in search_request.datetime:
+                query = query.filter(self.item_table.datetime.between(*dts))
+            # All items after the start date
+            elif dts[0] != "..":
+                query = query.filter(self.item_table.datetime >= dts[0])
+            # All items before the end date
+            elif dts[1] != "..":
+                query = query.filter(self.item_table.datetime <= dts[1])
+
+        # Query fields
+        if search_request.query:
+            for (field_name, expr) in search_request.query.items():
+                field = self.item_table.get_field(field_name)
+                for (op, value) in expr.items():
+                    if op == Operator.gte:
+                        query = query.filter(operator.ge(field, value))
+                    elif op == Operator.lte:
+                        query = query.filter(operator.le(field, value))
+                    else:
+                        query = query.filter(op.operator(field, value))
+
+        return query
+
+    def _fields_projector(
+        self, search_request: BaseSearchPostRequest
+    ) -> Optional[FieldsProjector]:
+        """Projector implementing the fields extension, if enabled."""
+        if not self.extension_is_enabled("FieldsExtension"):
+            return None
+
+        if search_request.query is not None:
+            query_include: Set[str] = set(
+                [
+                    k if k in Settings.get().indexed_fields else f"properties.{k}"
+                    for k in search_request.query.keys()
+                ]
+            )
+            if not search_request.fields.include:
+                search_request.fields.include = query_include
+            else:
+                search_request.fields.include.union(query_include)
+
+        return search_request.fields.projector
+
+    @staticmethod
+    def _fields_projection(projector: FieldsProjector) -> FieldsProjection:
+        """Narrow a fields projector down to what can be selected in the database.
+
+        Only the first level of keys of the JSONB fields can be filtered in the
+        database, the projector itself takes care of anything deeper.
+        """
+        projection = {}
+        for field in ITEM_FIELDS:
+            if not projector.includes(field):
+                continue
+            include = projector.include.get(field) if projector.include else None
+            exclude = projector.exclude.get(field) if projector.exclude else None
+            if field not in JSONB_ITEM_FIELDS:
+                projection[field] = (None, set())
+                continue
+            projection[field] = (
+                set(include) if isinstance(include, dict) else None,
+                {key for key, rule in (exclude or {}).items() if rule is True},
+            )
+        return projection
+
+    @staticmethod
+    def _project_jsonb(
+        column: sa.Column, include: Optional[Set[str]], exclude: Set[str]
+    ) -> sa.sql.ColumnElement:
+        """Filter the keys of a JSONB column.
+
+        Included keys are picked with `jsonb_build_object`, skipping the ones the
+        document does not have, excluded keys are removed with the `-` operator.
+        """
+        if include is not None:
+            keys = [
+                sa.case(
+                    [(column.has_key(key), func.jsonb_build_object(key, column[key]))],
+                    else_=func.jsonb_build_object(),
+                )
+                for key in sorted(include - exclude)
+            ]
+            if not keys:
+                return func.jsonb_build_object(type_=JSONB)
+            return functools.reduce(lambda left, right: left.op("||")(right), keys)
+        if exclude:
+            return column.op("-")(sa.cast(array(sorted(exclude)), ARRAY(sa.Text)))
+        return column
+
+    def _projected_columns(
+        self, projection: FieldsProjection
+    ) -> List[sa.sql.ColumnElement]:
+        """Columns to select for a fields extension projection.
+
+        Unrequested columns are not selected at all, so they are never read or decoded.
+        The id and collection are always selected as links are built from them.
+        """
+        table = self.item_table.__table__
+        columns = [table.c.id, table.c.collection_id]
+        for field in ("stac_version", "stac_extensions", "bbox", "links"):
+            if field in projection:
+                columns.append(table.c[field])
+        if "geometry" in projection:
+            columns.append(self._geometry_column())
+
+        indexed_fields = Settings.get().indexed_fields
+        for field in JSONB_ITEM_FIELDS:
+            if field not in projection:
+                continue
+            include, exclude = projection[field]
+            if field == "properties":
+                # Indexed fields are read from their own columns
+                for name in indexed_fields:
+                    if is_projected(name, include, exclude):
+                        columns.append(table.c[name.split(":")[-1]])
+                if include is not None:
+                    include = include - indexed_fields
+            columns.append(
+                self._project_jsonb(table.c[field], include, exclude).label(field)
+            )
+        return columns
+
     def post_search(
         self, search_request: BaseSearchPostRequest, **kwargs
     ) -> ItemCollection:
         """POST search catalog."""
         base_url = get_base_url_from_request(kwargs["request"])
-        with self.session.reader.context_session() as session:
-            token = (
-                self.get_token(search_request.token) if search_request.token else False
+        token = self.get_token(search_request.token) if search_request.token else False
+
+        media_type = streaming_media_type(kwargs["request"])
+        if media_type:
+            return GeoJSONSeqResponse(
+                self._stream_items(
+                    lambda session: self._search_query(session, search_request),
+                    limit=search_request.limit,
+                    token=token,
+                    base_url=base_url,
+                    projector=self._fields_projector(search_request),
+                ),
+                media_type=media_type,
             )
-            query = session.query(self.item_table)
-
-            # Filter by collection
-            count = None
-            if search_request.collections:
-                query = query.join(self.collection_table).filter(
-                    sa.or_(
-                        *[
-                            self.collection_table.id == col_id
-                            for col_id in search_request.collections
-                        ]
-                    )
-                )
-
-            # Sort
-            if search_request.sortby:
-                sort_fields = [
-                    getattr(
-                        self.item_table.get_field(sort.field),
-                        sort.direction.value,
-                    )()
-                    for sort in search_request.sortby
-                ]
-                sort_fields.append(self.item_table.id)
-                query = query.order_by(*sort_fields)
-            else:
-                # Default sort is date
-                query = query.order_by(
-                    self.item_table.datetime.desc(), self.item_table.id
-                )
 
-            # Ignore other parameters if ID is present
+        matched: Optional[Callable[[], Tuple[Optional[int], ContextMode]]] = None
+        if self.extension_is_enabled("ContextExtension"):
             if search_request.ids:
-                id_filter = sa.or_(
-                    *[self.item_table.id == i for i in search_request.ids]
-                )
-                items = query.filter(id_filter).order_by(self.item_table.id)
-                page = get_page(items, per_page=search_request.limit, page=token)
-                if self.extension_is_enabled("ContextExtension"):
-                    count = len(search_request.ids)
-                page.next = (
-                    self.insert_token(keyset=page.paging.bookmark_next)
-                    if page.paging.has_next
-                    else None
-                )
-                page.previous = (
-                    self.insert_token(keyset=page.paging.bookmark_previous)
-                    if page.paging.has_previous
-                    else None
+                matched = self._counted(len(search_request.ids), ContextMode.exact)
+            elif self._filters_only_collections(search_request):
+                matched = self._collection_count(
+                    search_request.collections, self._context_mode(search_request)
                 )
-
             else:
-                # Spatial query
-                geom = None
-                if search_request.intersects is not None:
-                    geom = shape(search_request.intersects)
-                elif search_request.bbox:
-                    if len(search_request.bbox) == 4:
-                        geom = ShapelyPolygon.from_bounds(*search_request.bbox)
-                    elif len(search_request.bbox) == 6:
-                        """Shapely doesn't support 3d bounding boxes we'll just use the 2d portion"""
-                        bbox_2d = [
-                            search_request.bbox[0],
-                            search_request.bbox[1],
-                            search_request.bbox[3],
-                            search_request.bbox[4],
-                        ]
-                        geom = ShapelyPolygon.from_bounds(*bbox_2d)
-
-                if geom:
-                    filter_geom = ga.shape.from_shape(geom, srid=4326)
-                    query = query.filter(
-                        ga.func.ST_Intersects(self.item_table.geometry, filter_geom)
-                    )
-
-                # Temporal query
-                if search_request.datetime:
-                    # Two tailed query (between)
-                    dts = search_request.datetime.split("/")
-                    # Non-interval date ex. "2000-02-02T00:00:00.00Z"
-                    if len(dts) == 1:
-                        query = query.filter(self.item_table.datetime == dts[0])
-                    elif ".." not in search_request.datetime:
-                        query = query.filter(self.item_table.datetime.between(*dts))
-                    # All items after the start date
-                    elif dts[0] != "..":
-                        query = query.filter(self.item_table.datetime >= dts[0])
-                    # All items before the end date
-                    elif dts[1] != "..":
-                        query = query.filter(self.item_table.datetime <= dts[1])
-
-                # Query fields
-                if search_request.query:
-                    for (field_name, expr) in search_request.query.items():
-                        field = self.item_table.get_field(field_name)
-                        for (op, value) in expr.items():
-                            if op == Operator.gte:
-                                query = query.filter(operator.ge(field, value))
-                            elif op == Operator.lte:
-                                query = query.filter(operator.le(field, value))
-                            else:
-                                query = query.filter(op.operator(field, value))
-
-                if self.extension_is_enabled("ContextExtension"):
-                    count_query = query.statement.with_only_columns(
-                        [func.count()]
-                    ).order_by(None)
-                    count = query.session.execute(count_query).scalar()
-                page = get_page(query, per_page=search_request.limit, page=token)
-                # Create dynamic attributes for each page
-                page.next = (
-                    self.insert_token(keyset=page.paging.bookmark_next)
-                    if page.paging.has_next
-                    else None
-                )
-                page.previous = (
-                    self.insert_token(keyset=page.paging.bookmark_previous)
-                    if page.paging.has_previous
-                    else None
+                matched = self._start_count(
+                    lambda session: self._search_query(session, search_request),
+                    self._context_mode(search_request),
                 )
 
+        with self.session.reader.context_session() as session:
+            query = self._search_query(session, search_request)
+
+            # Fields extension includes/excludes are projected in the database as far
+            # as possible, which only reads the requested parts of each item
+            projector = self._fields_projector(search_request)
+            columns = None
+            if projector is not None:
+                projection = self._fields_projection(projector)
+                columns = self._projected_columns(projection)
+            page = self._get_page(
+                query, per_page=search_request.limit, page=token, columns=columns
+            )
+            # Create dynamic attributes for each page
+            page.next = (
+                self.insert_token(keyset=page.paging.bookmark_next)
+                if page.paging.has_next
+                else None
+            )
+            page.previous = (
+                self.insert_token(keyset=page.paging.bookmark_previous)
+                if page.paging.has_previous
+                else None
+            )
+
             links = []
             if page.next:
                 links.append(
@@ -413,45 +882,26 @@ class CoreCrudClient(PaginationTokenClient, BaseCoreClient):
                     }
                 )
 
-            response_features = []
-            filter_kwargs = {}
-
-            for item in page:
-                response_features.append(
-                    self.item_serializer.db_to_stac(item, base_url=base_url)
-                )
-
-            # Use pydantic includes/excludes syntax to implement fields extension
-            if self.extension_is_enabled("FieldsExtension"):
-                if search_request.query is not None:
-                    query_include: Set[str] = set(
-                        [
-                            k
-                            if k in Settings.get().indexed_fields
-                            else f"properties.{k}"
-                            for k in search_request.query.keys()
-                        ]
+            if projector is not None:
+                response_features = [
+                    projector(
+                        self.item_serializer.projected_row_to_stac(
+                            row, projection, base_url, raw_geometry=self._raw_geometry
+                        )
                     )
-                    if not search_request.fields.include:
-                        search_request.fields.include = query_include
-                    else:
-                        search_request.fields.include.union(query_include)
-
-                filter_kwargs = search_request.fields.filter_fields
-                # Need to pass through `.json()` for proper serialization
-                # of datetime
+                    for row in page
+                ]
+            else:
                 response_features = [
-                    json.loads(stac_pydantic.Item(**feat).json(**filter_kwargs))
-                    for feat in response_features
+                    self._serialize_item(
+                        item, base_url, raw_geometry=self._raw_geometry
+                    )
+                    for item in page
                 ]
 
         context_obj = None
-        if self.extension_is_enabled("ContextExtension"):
-            context_obj = {
-                "returned": len(page),
-                "limit": search_request.limit,
-                "matched": count,
-            }
+        if matched is not None:
+            context_obj = self._context(len(page), search_request.limit, *matched())
 
         return ItemCollection(
             type="FeatureCollection",
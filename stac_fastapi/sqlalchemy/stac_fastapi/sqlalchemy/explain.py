@@ -0,0 +1,28 @@
+"""Query planner row estimates."""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session as SqlSession
+from sqlalchemy.sql.expression import ClauseElement, Executable, Select
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a select statement."""
+
+    def __init__(self, statement: Select):
+        """Explain `statement`."""
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    """Compile an explain, rendering the binds of the statement as usual."""
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_rows(session: SqlSession, statement: Select) -> int:
+    """Number of rows the query planner expects a select statement to return.
+
+    The statement is planned but not executed, so this is cheap whatever the size of
+    the result.
+    """
+    plan = session.execute(Explain(statement)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -74,6 +74,10 @@ class Item(BaseModel):  # type:ignore
     parent_collection = sa.orm.relationship("Collection", back_populates="children")
     datetime = sa.Column(sa.TIMESTAMP(timezone=True), nullable=False)
     links = sa.Column(JSONB)
+    # sha256 of the canonical JSON of the item, see `ItemSerializer.content_hash`
+    content_hash = sa.Column(sa.VARCHAR(64))
+    # GeoJSON text of the geometry, only populated when selected with `with_expression`
+    geometry_geojson = sa.orm.query_expression()
 
     @classmethod
     def get_field(cls, field_name):
@@ -87,6 +91,21 @@ class Item(BaseModel):  # type:ignore
             )
 
 
+class CollectionItemCount(BaseModel):  # type:ignore
+    """Number of items in a collection, maintained by triggers on the items table."""
+
+    __tablename__ = "collection_item_counts"
+    __table_args__ = {"schema": "data"}
+
+    collection_id = sa.Column(
+        sa.VARCHAR(1024),
+        sa.ForeignKey(Collection.id, ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    item_count = sa.Column(sa.BIGINT, nullable=False, server_default="0")
+
+
 class PaginationToken(BaseModel):  # type:ignore
     """Pagination orm model."""
 
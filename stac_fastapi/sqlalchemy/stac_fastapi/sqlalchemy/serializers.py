@@ -1,11 +1,15 @@
 """Serializers."""
 import abc
+import hashlib
 import json
 from datetime import datetime
-from typing import TypedDict
+from typing import Any, Dict, Optional, Set, Tuple, TypedDict, Union
 
 import attr
 import geoalchemy2 as ga
+import orjson
+from shapely import wkb
+from shapely.geometry import shape
 from stac_pydantic.shared import DATETIME_RFC339
 
 from stac_fastapi.sqlalchemy.models import database
@@ -14,6 +18,30 @@ from stac_fastapi.types.config import Settings
 from stac_fastapi.types.links import CollectionLinks, ItemLinks, resolve_links
 
 
+def geometry_from_geojson(
+    geojson: str, raw: bool = False
+) -> Union[Dict[str, Any], "orjson.Fragment"]:
+    """Load geometry GeoJSON text rendered by the database.
+
+    When `raw` is set the text is wrapped in an `orjson.Fragment`, which orjson writes
+    to the response as is without ever decoding it.  Only responses rendered by orjson
+    can hold fragments.
+    """
+    if raw:
+        return orjson.Fragment(geojson)
+    return orjson.loads(geojson)
+
+
+# Item fields selected by the fields extension, mapped to the keys of the field to
+# include (`None` for all of them) and the keys to exclude
+FieldsProjection = Dict[str, Tuple[Optional[Set[str]], Set[str]]]
+
+
+def is_projected(key: str, include: Optional[Set[str]], exclude: Set[str]) -> bool:
+    """Whether a key survives the include and exclude sets of a projection."""
+    return (include is None or key in include) and key not in exclude
+
+
 @attr.s  # type:ignore
 class Serializer(abc.ABC):
     """Defines serialization methods between the API and the data model."""
@@ -47,8 +75,14 @@ class ItemSerializer(Serializer):
     """Serialization methods for STAC items."""
 
     @classmethod
-    def db_to_stac(cls, db_model: database.Item, base_url: str) -> stac_types.Item:
-        """Transform database model to stac item."""
+    def db_to_stac(
+        cls, db_model: database.Item, base_url: str, raw_geometry: bool = False
+    ) -> stac_types.Item:
+        """Transform database model to stac item.
+
+        Geometries selected as GeoJSON text (`Item.geometry_geojson`) are used in place
+        of the geometry column, `raw_geometry` passes that text through unparsed.
+        """
         properties = db_model.properties.copy()
         indexed_fields = Settings.get().indexed_fields
         for field in indexed_fields:
@@ -69,14 +103,19 @@ class ItemSerializer(Serializer):
 
         stac_extensions = db_model.stac_extensions or []
 
-        # The custom geometry we are using emits geojson if the geometry is bound to the database
-        # Otherwise it will return a geoalchemy2 WKBElement
-        # TODO: It's probably best to just remove the custom geometry type
-        geometry = db_model.geometry
-        if isinstance(geometry, ga.elements.WKBElement):
-            geometry = ga.shape.to_shape(geometry).__geo_interface__
-        if isinstance(geometry, str):
-            geometry = json.loads(geometry)
+        if db_model.geometry_geojson is not None:
+            geometry = geometry_from_geojson(
+                db_model.geometry_geojson, raw=raw_geometry
+            )
+        else:
+            # The custom geometry we are using emits geojson if the geometry is bound to the database
+            # Otherwise it will return a geoalchemy2 WKBElement
+            # TODO: It's probably best to just remove the custom geometry type
+            geometry = db_model.geometry
+            if isinstance(geometry, ga.elements.WKBElement):
+                geometry = ga.shape.to_shape(geometry).__geo_interface__
+            if isinstance(geometry, str):
+                geometry = json.loads(geometry)
 
         return stac_types.Item(
             type="Feature",
@@ -91,11 +130,125 @@ class ItemSerializer(Serializer):
             assets=db_model.assets,
         )
 
+    @classmethod
+    def row_to_stac(
+        cls, row: Any, base_url: str, raw_geometry: bool = False
+    ) -> stac_types.Item:
+        """Transform a row selected with SQLAlchemy core to stac item.
+
+        Produces the same item as `db_to_stac` from a plain result row, so no ORM
+        instance is built for it.  The geometry column holds either GeoJSON text or
+        the GeoJSON dictionary emitted by `GeojsonGeometry`.
+        """
+        properties = dict(row.properties)
+        for field in Settings.get().indexed_fields:
+            field_value = getattr(row, field.split(":")[-1])
+            if field == "datetime":
+                field_value = field_value.strftime(DATETIME_RFC339)
+            properties[field] = field_value
+
+        item_links = ItemLinks(
+            collection_id=row.collection_id, item_id=row.id, base_url=base_url
+        ).create_links()
+        if row.links:
+            item_links += resolve_links(row.links, base_url)
+
+        geometry = row.geometry
+        if isinstance(geometry, str):
+            geometry = geometry_from_geojson(geometry, raw=raw_geometry)
+
+        return stac_types.Item(
+            type="Feature",
+            stac_version=row.stac_version,
+            stac_extensions=row.stac_extensions or [],
+            id=row.id,
+            collection=row.collection_id,
+            geometry=geometry,
+            bbox=[float(x) for x in row.bbox],
+            properties=properties,
+            links=item_links,
+            assets=row.assets,
+        )
+
+    @classmethod
+    def projected_row_to_stac(
+        cls,
+        row: Any,
+        projection: FieldsProjection,
+        base_url: str,
+        raw_geometry: bool = False,
+    ) -> Dict[str, Any]:
+        """Transform a row selected for a fields extension projection to stac item.
+
+        Only the fields in `projection` are returned, their JSONB keys have already been
+        filtered by the database.  `raw_geometry` passes the geometry text through
+        unparsed.
+        """
+        item: Dict[str, Any] = {}
+        if "type" in projection:
+            item["type"] = "Feature"
+        if "stac_version" in projection:
+            item["stac_version"] = row.stac_version
+        if "stac_extensions" in projection:
+            item["stac_extensions"] = row.stac_extensions or []
+        if "id" in projection:
+            item["id"] = row.id
+        if "collection" in projection:
+            item["collection"] = row.collection_id
+        if "geometry" in projection:
+            geometry = row.geometry
+            if isinstance(geometry, str):
+                geometry = geometry_from_geojson(geometry, raw=raw_geometry)
+            item["geometry"] = geometry
+        if "bbox" in projection:
+            item["bbox"] = [float(x) for x in row.bbox]
+        if "properties" in projection:
+            properties = dict(row.properties)
+            for field in Settings.get().indexed_fields:
+                if not is_projected(field, *projection["properties"]):
+                    continue
+                field_value = getattr(row, field.split(":")[-1])
+                if field == "datetime":
+                    field_value = field_value.strftime(DATETIME_RFC339)
+                properties[field] = field_value
+            item["properties"] = properties
+        if "links" in projection:
+            item_links = ItemLinks(
+                collection_id=row.collection_id, item_id=row.id, base_url=base_url
+            ).create_links()
+            if row.links:
+                item_links += resolve_links(row.links, base_url)
+            item["links"] = item_links
+        if "assets" in projection:
+            item["assets"] = row.assets
+        return item
+
+    @classmethod
+    def content_hash(cls, stac_data: TypedDict) -> str:
+        """Hash of the canonical JSON of a stac item.
+
+        Links, which are not stored, and the `created` and `updated` timestamps, which
+        are filled in on write, are left out so an item sent again unchanged hashes the
+        same.
+        """
+        content = {
+            k: v for k, v in stac_data.items() if k not in ("links", "properties")
+        }
+        content["properties"] = {
+            k: v
+            for k, v in stac_data["properties"].items()
+            if k not in ("created", "updated")
+        }
+        return hashlib.sha256(
+            orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+
     @classmethod
     def stac_to_db(
         cls, stac_data: TypedDict, exclude_geometry: bool = False
     ) -> database.Item:
         """Transform stac item to database model."""
+        content_hash = cls.content_hash(stac_data)
         indexed_fields = {}
         for field in Settings.get().indexed_fields:
             # Use getattr to accommodate extension namespaces
@@ -120,6 +273,40 @@ class ItemSerializer(Serializer):
             bbox=stac_data["bbox"],
             properties=stac_data["properties"],
             assets=stac_data["assets"],
+            content_hash=content_hash,
+            **indexed_fields,
+        )
+
+    @classmethod
+    def stac_to_row(cls, stac_data: TypedDict) -> Dict[str, Any]:
+        """Transform stac item to the column values of a row, without an ORM object.
+
+        Columns match `stac_to_db`, except for the geometry which is hex encoded EWKB.
+        """
+        content_hash = cls.content_hash(stac_data)
+        indexed_fields = {}
+        now = datetime.utcnow().strftime(DATETIME_RFC339)
+        for field in Settings.get().indexed_fields:
+            field_value = stac_data["properties"][field]
+            if field == "datetime":
+                # Validated like `stac_to_db`, the text is sent as is
+                datetime.strptime(field_value, DATETIME_RFC339)
+            indexed_fields[field.split(":")[-1]] = field_value
+
+            if "created" not in stac_data["properties"]:
+                stac_data["properties"]["created"] = now
+            stac_data["properties"]["updated"] = now
+
+        return dict(
+            id=stac_data["id"],
+            collection_id=stac_data["collection"],
+            stac_version=stac_data["stac_version"],
+            stac_extensions=stac_data.get("stac_extensions"),
+            geometry=wkb.dumps(shape(stac_data["geometry"]), hex=True, srid=4326),
+            bbox=stac_data["bbox"],
+            properties=stac_data["properties"],
+            assets=stac_data["assets"],
+            content_hash=content_hash,
             **indexed_fields,
         )
 
@@ -16,6 +16,16 @@ from stac_fastapi.types import errors
 logger = logging.getLogger(__name__)
 
 
+def translate_error(e: sa.exc.StatementError) -> errors.StacApiError:
+    """Map a failed statement to the error returned by the api."""
+    if isinstance(e.orig, psycopg2.errors.UniqueViolation):
+        return errors.ConflictError("resource already exists")
+    elif isinstance(e.orig, psycopg2.errors.ForeignKeyViolation):
+        return errors.ForeignKeyError("collection does not exist")
+    logger.error(e, exc_info=True)
+    return errors.DatabaseError("unhandled database error")
+
+
 class FastAPISessionMaker(_FastAPISessionMaker):
     """FastAPISessionMaker."""
 
@@ -25,12 +35,7 @@ class FastAPISessionMaker(_FastAPISessionMaker):
         try:
             yield from self.get_db()
         except sa.exc.StatementError as e:
-            if isinstance(e.orig, psycopg2.errors.UniqueViolation):
-                raise errors.ConflictError("resource already exists") from e
-            elif isinstance(e.orig, psycopg2.errors.ForeignKeyViolation):
-                raise errors.ForeignKeyError("collection does not exist") from e
-            logger.error(e, exc_info=True)
-            raise errors.DatabaseError("unhandled database error")
+            raise translate_error(e) from e
 
 
 @attr.s
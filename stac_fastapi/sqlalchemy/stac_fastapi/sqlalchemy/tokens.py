@@ -1,28 +1,50 @@
 """Pagination token client."""
 import abc
+import binascii
+import hashlib
+import hmac
 import logging
 import os
-from base64 import urlsafe_b64encode
-from typing import Type
+import zlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Optional, Type
 
 import attr
 from sqlalchemy.orm import Session as SqlSession
 
 from stac_fastapi.sqlalchemy.models import database
 from stac_fastapi.sqlalchemy.session import Session
-from stac_fastapi.types.errors import DatabaseError
+from stac_fastapi.types.errors import DatabaseError, InvalidQueryParameter
 
 logger = logging.getLogger(__name__)
 
+# Leading byte of a signed token, describing how the keyset is encoded
+RAW_KEYSET = b"r"
+COMPRESSED_KEYSET = b"z"
+# Truncated HMAC-SHA256 digest, 128 bits is plenty for a pagination token
+SIGNATURE_LENGTH = 16
+
 
 @attr.s
 class PaginationTokenClient(abc.ABC):
-    """Pagination token specific CRUD operations."""
+    """Pagination token specific CRUD operations.
+
+    By default keysets are stored in the `data.tokens` table and the client is handed
+    the id of the row.  When `token_signing_key` is set, the keyset is instead encoded
+    into the token itself and signed with HMAC-SHA256, so paging through results never
+    touches the database.
+
+    Attributes:
+        token_signing_key: secret used to sign stateless tokens.
+        compress_tokens: zlib compress stateless tokens when it makes them smaller.
+    """
 
     session: Session = attr.ib(default=attr.Factory(Session.create_from_env))
     token_table: Type[database.PaginationToken] = attr.ib(
         default=database.PaginationToken
     )
+    token_signing_key: Optional[str] = attr.ib(default=None)
+    compress_tokens: bool = attr.ib(default=True)
 
     @staticmethod
     @abc.abstractmethod
@@ -32,8 +54,43 @@ class PaginationTokenClient(abc.ABC):
         """Lookup row by id."""
         ...
 
+    def _sign(self, payload: bytes) -> bytes:
+        """Sign a token payload."""
+        return hmac.new(
+            self.token_signing_key.encode(), payload, hashlib.sha256
+        ).digest()[:SIGNATURE_LENGTH]
+
+    def encode_token(self, keyset: str) -> str:
+        """Encode a keyset into a signed, url-safe token."""
+        payload = RAW_KEYSET + keyset.encode()
+        if self.compress_tokens:
+            compressed = COMPRESSED_KEYSET + zlib.compress(keyset.encode(), 9)
+            if len(compressed) < len(payload):
+                payload = compressed
+        token = urlsafe_b64encode(payload + self._sign(payload)).decode()
+        return token.rstrip("=")
+
+    def decode_token(self, token: str) -> str:
+        """Verify a signed token and return the keyset it holds."""
+        try:
+            data = urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (binascii.Error, ValueError):
+            raise InvalidQueryParameter(f"Invalid pagination token {token}")
+
+        payload, signature = data[:-SIGNATURE_LENGTH], data[-SIGNATURE_LENGTH:]
+        if not payload or not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidQueryParameter(f"Invalid pagination token {token}")
+
+        kind, body = payload[:1], payload[1:]
+        if kind == COMPRESSED_KEYSET:
+            body = zlib.decompress(body)
+        return body.decode()
+
     def insert_token(self, keyset: str, tries: int = 0) -> str:  # type:ignore
         """Insert a keyset into the database."""
+        if self.token_signing_key:
+            return self.encode_token(keyset)
+
         # uid has collision chance of 1e-7 percent
         uid = urlsafe_b64encode(os.urandom(6)).decode()
         with self.session.writer.context_session() as session:
@@ -50,6 +107,9 @@ class PaginationTokenClient(abc.ABC):
 
     def get_token(self, token_id: str) -> str:
         """Retrieve a keyset from the database."""
+        if self.token_signing_key:
+            return self.decode_token(token_id)
+
         with self.session.reader.context_session() as session:
             token = self._lookup_id(token_id, self.token_table, session)
             return token.keyset
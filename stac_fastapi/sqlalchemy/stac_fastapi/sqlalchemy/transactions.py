@@ -1,24 +1,144 @@
 """transactions extension client."""
 
+import csv
+import io
+import itertools
+import json
 import logging
-from typing import Optional, Type
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Type
 
 import attr
+import psycopg2
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert
+from stac_pydantic.shared import DATETIME_RFC339
 
 from stac_fastapi.extensions.third_party.bulk_transactions import (
     BaseBulkTransactionsClient,
     Items,
 )
 from stac_fastapi.sqlalchemy import serializers
+from stac_fastapi.sqlalchemy.coalescer import WriteCoalescer
 from stac_fastapi.sqlalchemy.links import get_base_url_from_request
 from stac_fastapi.sqlalchemy.models import database
 from stac_fastapi.sqlalchemy.session import Session
 from stac_fastapi.types import stac as stac_types
+from stac_fastapi.types.config import Settings
 from stac_fastapi.types.core import BaseTransactionsClient
-from stac_fastapi.types.errors import NotFoundError
+from stac_fastapi.types.errors import ForeignKeyError, InvalidPatchError, NotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Items copied to the staging table per COPY statement when no chunk size is given
+COPY_CHUNK_SIZE = 10000
+
+
+def copy_value(value: Any) -> Optional[str]:
+    """Format a column value as COPY csv text, arrays as postgres array literals."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        elements = (
+            "NULL"
+            if v is None
+            else '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for v in value
+        )
+        return "{" + ",".join(elements) + "}"
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def merge_patch_expression(target: Any, patch: Any) -> Any:
+    """Apply a JSON merge patch (RFC 7396) to a jsonb expression, in SQL.
+
+    Keys set to `null` are removed with `-` and other values are set with `||`, nested
+    objects being merged recursively, so the whole patch is a single expression.
+    """
+    if not isinstance(patch, dict):
+        return sa.cast(patch, JSONB)
+    # `->` gives null rather than an error on other types, so only the merge needs this
+    expression = sa.case(
+        [(sa.func.jsonb_typeof(target) == "object", target)],
+        else_=sa.cast({}, JSONB),
+    )
+    removed = [key for key, value in patch.items() if value is None]
+    values = {
+        key: value
+        for key, value in patch.items()
+        if value is not None and not isinstance(value, dict)
+    }
+    if removed:
+        expression = expression.op("-", return_type=JSONB)(
+            sa.cast(removed, ARRAY(sa.Text))
+        )
+    if values:
+        expression = expression.op("||", return_type=JSONB)(sa.cast(values, JSONB))
+    for key, value in patch.items():
+        if isinstance(value, dict):
+            nested = target.op("->", return_type=JSONB)(key)
+            expression = expression.op("||", return_type=JSONB)(
+                sa.func.jsonb_build_object(key, merge_patch_expression(nested, value))
+            )
+    return expression
+
+
+def patch_item_statement(
+    item_table: Type[database.Item],
+    item_id: str,
+    collection_id: str,
+    patch: Dict[str, Any],
+) -> Any:
+    """UPDATE statement applying a merge patch to an item, returning the patched row.
+
+    Only the columns the patch touches are set, besides the `updated` property.
+    Properties and assets are merged in the database, geometry, bbox and the other
+    top level fields are replaced.  Links, which are not stored, are ignored.
+    """
+    for key, value in (("id", item_id), ("collection", collection_id)):
+        if key in patch and patch[key] != value:
+            raise InvalidPatchError(f"The {key} of an item cannot be patched")
+    for key in ("properties", "assets", "geometry", "bbox"):
+        if key in patch and patch[key] is None:
+            raise InvalidPatchError(f"The {key} of an item cannot be removed")
+
+    table = item_table.__table__
+    properties = dict(patch.get("properties") or {})
+    properties["updated"] = datetime.utcnow().strftime(DATETIME_RFC339)
+    values: Dict[str, Any] = {
+        "properties": merge_patch_expression(table.c.properties, properties),
+        # The stored hash no longer describes the item, its next full update rewrites it
+        "content_hash": None,
+    }
+    for field in Settings.get().indexed_fields:
+        if field not in properties:
+            continue
+        value = properties[field]
+        if value is None:
+            raise InvalidPatchError(f"The {field} of an item cannot be removed")
+        if field == "datetime":
+            value = datetime.strptime(value, DATETIME_RFC339)
+        values[field.split(":")[-1]] = value
+    if "assets" in patch:
+        values["assets"] = merge_patch_expression(table.c.assets, patch["assets"])
+    if "geometry" in patch:
+        values["geometry"] = json.dumps(patch["geometry"])
+    for key in ("bbox", "stac_extensions", "stac_version"):
+        if key in patch:
+            values[key] = patch[key]
+
+    columns = [c for c in table.columns if c.name != "geometry"]
+    return (
+        table.update()
+        .where(table.c.id == item_id)
+        .where(table.c.collection_id == collection_id)
+        .values(values)
+        .returning(*columns, sa.func.ST_AsGeoJSON(table.c.geometry).label("geometry"))
+    )
+
 
 @attr.s
 class TransactionsClient(BaseTransactionsClient):
@@ -33,11 +153,35 @@ class TransactionsClient(BaseTransactionsClient):
     collection_serializer: Type[serializers.Serializer] = attr.ib(
         default=serializers.CollectionSerializer
     )
+    write_coalesce_window: Optional[float] = attr.ib(default=None)
+    write_coalesce_max_items: int = attr.ib(default=100)
+    _coalescer: Optional[WriteCoalescer] = attr.ib(init=False)
+
+    @_coalescer.default
+    def _create_coalescer(self) -> Optional[WriteCoalescer]:
+        """Group commits of item writes, when a coalescing window is set."""
+        if not self.write_coalesce_window:
+            return None
+        return WriteCoalescer(
+            session=self.session,
+            item_table=self.item_table,
+            window=self.write_coalesce_window,
+            max_items=self.write_coalesce_max_items,
+        )
 
     def create_item(self, model: stac_types.Item, **kwargs) -> stac_types.Item:
         """Create item."""
         base_url = get_base_url_from_request(kwargs["request"])
         data = self.item_serializer.stac_to_db(model)
+        if self._coalescer:
+            # Every column is given, so the rows of a batch share one insert statement
+            self._coalescer.create(
+                {
+                    column.name: getattr(data, column.name)
+                    for column in self.item_table.__table__.columns
+                }
+            )
+            return self.item_serializer.db_to_stac(data, base_url)
         with self.session.writer.context_session() as session:
             session.add(data)
             return self.item_serializer.db_to_stac(data, base_url)
@@ -53,23 +197,48 @@ class TransactionsClient(BaseTransactionsClient):
             return self.collection_serializer.db_to_stac(data, base_url=base_url)
 
     def update_item(self, model: stac_types.Item, **kwargs) -> stac_types.Item:
-        """Update item."""
+        """Update item.
+
+        Items whose content hash matches the stored one are left untouched, and the
+        stored item is returned.
+        """
         base_url = get_base_url_from_request(kwargs["request"])
-        with self.session.reader.context_session() as session:
+        if self._coalescer:
+            db_model = self.item_serializer.stac_to_db(model)
+            stored = self._coalescer.update(self.item_serializer.row_to_dict(db_model))
+            if stored is not None:
+                return self.item_serializer.row_to_stac(stored, base_url)
+            return self.item_serializer.db_to_stac(db_model, base_url)
+        with self.session.writer.context_session() as session:
             query = session.query(self.item_table).filter(
                 self.item_table.id == model["id"]
             )
             query = query.filter(self.item_table.collection_id == model["collection"])
-            if not query.scalar():
+            unchanged = query.filter(
+                self.item_table.content_hash == self.item_serializer.content_hash(model)
+            ).first()
+            if unchanged:
+                return self.item_serializer.db_to_stac(unchanged, base_url)
+
+            # SQLAlchemy orm updates don't seem to like geoalchemy types
+            db_model = self.item_serializer.stac_to_db(model)
+            if not query.update(self.item_serializer.row_to_dict(db_model)):
                 raise NotFoundError(
                     f"Item {model['id']} in collection {model['collection']}"
                 )
-            # SQLAlchemy orm updates don't seem to like geoalchemy types
-            db_model = self.item_serializer.stac_to_db(model)
-            query.update(self.item_serializer.row_to_dict(db_model))
-            stac_item = self.item_serializer.db_to_stac(db_model, base_url)
+            return self.item_serializer.db_to_stac(db_model, base_url)
 
-            return stac_item
+    def patch_item(
+        self, item_id: str, collection_id: str, patch: Dict[str, Any], **kwargs
+    ) -> stac_types.Item:
+        """Apply a JSON merge patch to an item with a single UPDATE statement."""
+        base_url = get_base_url_from_request(kwargs["request"])
+        statement = patch_item_statement(self.item_table, item_id, collection_id, patch)
+        with self.session.writer.context_session() as session:
+            row = session.execute(statement).first()
+        if row is None:
+            raise NotFoundError(f"Item {item_id} in collection {collection_id}")
+        return self.item_serializer.row_to_stac(row, base_url)
 
     def update_collection(
         self, model: stac_types.Collection, **kwargs
@@ -127,6 +296,7 @@ class BulkTransactionsClient(BaseBulkTransactionsClient):
 
     session: Session = attr.ib(default=attr.Factory(Session.create_from_env))
     debug: bool = attr.ib(default=False)
+    copy_ingest: bool = attr.ib(default=False)
     item_table: Type[database.Item] = attr.ib(default=database.Item)
     item_serializer: Type[serializers.Serializer] = attr.ib(
         default=serializers.ItemSerializer
@@ -149,15 +319,177 @@ class BulkTransactionsClient(BaseBulkTransactionsClient):
     ) -> str:
         """Bulk item insertion using sqlalchemy core.
 
+        Items are merged into the items table with one multi-row `INSERT ... ON
+        CONFLICT` statement per chunk, in a single transaction.  Like
+        `bulk_item_copy`, existing items are only updated when their content hash
+        differs.
+
         https://docs.sqlalchemy.org/en/13/faq/performance.html#i-m-inserting-400-000-rows-with-the-orm-and-it-s-really-slow
         """
-        # Use items.items because schemas.Items is a model with an items key
-        processed_items = [self._preprocess_item(item) for item in items]
-        return_msg = f"Successfully added {len(processed_items)} items."
-        if chunk_size:
-            for chunk in self._chunks(processed_items, chunk_size):
-                self.engine.execute(self.item_table.__table__.insert(), chunk)
-            return return_msg
-
-        self.engine.execute(self.item_table.__table__.insert(), processed_items)
-        return return_msg
+        if self.copy_ingest:
+            return self.bulk_item_copy(items, chunk_size=chunk_size)
+
+        # The last copy of an item wins when it appears more than once
+        rows = {}
+        count = 0
+        for item in items:
+            row = self._preprocess_item(item)
+            rows[(row["id"], row["collection_id"])] = row
+            count += 1
+        inserted = updated = 0
+        chunk_size = chunk_size or max(len(rows), 1)
+        with self.session.writer.context_session() as session:
+            for chunk in self._chunks(list(rows.values()), chunk_size):
+                for (was_inserted,) in session.execute(self._merge_statement(chunk)):
+                    if was_inserted:
+                        inserted += 1
+                    else:
+                        updated += 1
+        unchanged = len(rows) - inserted - updated
+        return (
+            f"Successfully added {count} items ({inserted} inserted, {updated} updated, "
+            f"{unchanged} unchanged)."
+        )
+
+    def _merge_statement(self, rows: List[Dict[str, Any]]) -> Any:
+        """Insert rows, updating the existing items whose content hash differs."""
+        table = self.item_table.__table__
+        statement = insert(table).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.id, table.c.collection_id],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column not in ("id", "collection_id")
+            },
+            where=table.c.content_hash.is_distinct_from(
+                statement.excluded.content_hash
+            ),
+        ).returning(sa.literal_column("xmax = 0"))
+
+    def bulk_item_patch(
+        self, collection_id: str, items: Dict[str, Dict[str, Any]], **kwargs
+    ) -> str:
+        """Apply JSON merge patches to items, one statement each in one transaction."""
+        with self.session.writer.context_session() as session:
+            for item_id, patch in items.items():
+                statement = patch_item_statement(
+                    self.item_table, item_id, collection_id, patch
+                )
+                if session.execute(statement).first() is None:
+                    raise NotFoundError(f"Item {item_id} in collection {collection_id}")
+        return f"Successfully patched {len(items)} items."
+
+    def _copy_columns(self) -> List[str]:
+        """Columns written by `ItemSerializer.stac_to_row`."""
+        indexed = [field.split(":")[-1] for field in Settings.get().indexed_fields]
+        return [
+            "id",
+            "collection_id",
+            "stac_version",
+            "stac_extensions",
+            "geometry",
+            "bbox",
+            "properties",
+            "assets",
+            "content_hash",
+            *sorted(indexed),
+        ]
+
+    def _copy_chunk(
+        self, cursor, columns: List[str], items: Iterable[stac_types.Item]
+    ) -> int:
+        """COPY a chunk of items into the staging table as csv."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        count = 0
+        for item in items:
+            row = self.item_serializer.stac_to_row(item)
+            writer.writerow([copy_value(row.get(column)) for column in columns])
+            count += 1
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY items_staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        return count
+
+    def bulk_item_copy(
+        self, items: Items, chunk_size: Optional[int] = None, **kwargs
+    ) -> str:
+        """Bulk item insertion with COPY FROM STDIN.
+
+        Items are copied as csv, with geometries as hex EWKB, into a temporary staging
+        table `chunk_size` items at a time, then merged into the items table in a
+        single statement.  Existing items are updated when their content hash differs,
+        so loads may be re-run cheaply.  The whole load is one transaction.
+        """
+        table = self.item_table.__table__
+        columns = self._copy_columns()
+        merge_columns = [c for c in columns if c not in ("id", "collection_id")]
+        chunk_size = chunk_size or COPY_CHUNK_SIZE
+
+        start = time.perf_counter()
+        count = 0
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    CREATE TEMPORARY TABLE items_staging
+                    (LIKE {table.schema}.{table.name} INCLUDING DEFAULTS)
+                    ON COMMIT DROP
+                    """
+                )
+                items = iter(items)
+                while True:
+                    copied = self._copy_chunk(
+                        cursor, columns, itertools.islice(items, chunk_size)
+                    )
+                    if not copied:
+                        break
+                    count += copied
+
+                # The last copy of an item wins when it appears more than once
+                cursor.execute(
+                    f"""
+                    WITH merged AS (
+                        INSERT INTO {table.schema}.{table.name} AS target
+                        ({', '.join(columns)})
+                        SELECT DISTINCT ON (id, collection_id) {', '.join(columns)}
+                        FROM items_staging
+                        ORDER BY id, collection_id, ctid DESC
+                        ON CONFLICT (id, collection_id) DO UPDATE SET
+                        {', '.join(f"{c} = EXCLUDED.{c}" for c in merge_columns)}
+                        WHERE target.content_hash
+                            IS DISTINCT FROM EXCLUDED.content_hash
+                        RETURNING xmax = 0 AS inserted
+                    )
+                    SELECT
+                        (SELECT count(*) FROM merged WHERE inserted),
+                        (SELECT count(*) FROM merged WHERE NOT inserted),
+                        (SELECT count(DISTINCT (id, collection_id)) FROM items_staging)
+                    """
+                )
+                inserted, updated, distinct = cursor.fetchone()
+            connection.commit()
+        except psycopg2.errors.ForeignKeyViolation as e:
+            connection.rollback()
+            raise ForeignKeyError("collection does not exist") from e
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else float(count)
+        unchanged = distinct - inserted - updated
+        logger.info(
+            f"Copied {count} items in {elapsed:.2f}s ({rate:.0f} items/s), "
+            f"{inserted} inserted, {updated} updated, {unchanged} unchanged"
+        )
+        return (
+            f"Successfully added {count} items ({inserted} inserted, {updated} updated, "
+            f"{unchanged} unchanged, {rate:.0f} items/s)."
+        )
@@ -1,9 +1,18 @@
+import asyncio
+import gzip
+import json
+import zlib
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from os import environ
 
+import brotli
 import pytest
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.testclient import TestClient
 from tests.api.cors_support import (
     cors_config_location_key,
     cors_deny_origin,
@@ -13,7 +22,24 @@ from tests.api.cors_support import (
     cors_permit_origin,
 )
 
-from stac_fastapi.api.middleware import MiddlewareConfig
+from stac_fastapi.api.coalesce import RequestCoalescer
+from stac_fastapi.api.compression import CompressionMiddleware, CompressionStats
+from stac_fastapi.api.documents import DocumentCache, create_document_endpoint
+from stac_fastapi.api.middleware import (
+    MiddlewareConfig,
+    RouterMiddleware,
+    router_middleware,
+)
+from stac_fastapi.api.openapi import update_openapi
+from stac_fastapi.api.routes import ORJSONRoute, create_async_endpoint
+from stac_fastapi.extensions.core import TransactionExtension
+from stac_fastapi.extensions.third_party import BulkTransactionExtension
+from stac_fastapi.extensions.third_party.bulk_transactions import (
+    BaseBulkTransactionsClient,
+)
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.core import BaseTransactionsClient
+from stac_fastapi.types.search import BaseSearchPostRequest
 
 from ..conftest import MockStarletteRequest
 
@@ -35,6 +61,7 @@ STAC_TRANSACTION_ROUTES = [
     "POST /collections/{collection_id}/items",
     "PUT /collections",
     "PUT /collections/{collection_id}/items",
+    "PATCH /collections/{collection_id}/items/{item_id}",
 ]
 
 
@@ -77,6 +104,60 @@ def test_transactions_router(api_client):
     assert not transaction_routes - api_routes
 
 
+def test_patch_routes_need_client_support():
+    class Transactions(BaseTransactionsClient):
+        def create_item(self, item, **kwargs):
+            return item
+
+        update_item = create_collection = update_collection = create_item
+
+        def delete_item(self, item_id, collection_id, **kwargs):
+            return {}
+
+        def delete_collection(self, collection_id, **kwargs):
+            return {}
+
+    class BulkTransactions(BaseBulkTransactionsClient):
+        def bulk_item_insert(self, items, chunk_size=None, **kwargs):
+            return "ok"
+
+    app = FastAPI()
+    TransactionExtension(client=Transactions(), settings=ApiSettings()).register(app)
+    BulkTransactionExtension(client=BulkTransactions()).register(app)
+    methods = {method for route in app.routes for method in route.methods}
+    assert "PUT" in methods
+    assert "PATCH" not in methods
+
+
+def test_bulk_items_rejects_truncated_gzip():
+    batches = []
+
+    class BulkTransactions(BaseBulkTransactionsClient):
+        def bulk_item_insert(self, items, chunk_size=None, **kwargs):
+            batches.append(items)
+            return "ok"
+
+    app = FastAPI()
+    BulkTransactionExtension(client=BulkTransactions(), ndjson_batch_size=2).register(
+        app
+    )
+    client = TestClient(app)
+    body = gzip.compress(b"".join(b'{"id": "%d"}\n' % i for i in range(5)))
+    headers = {"content-type": "application/x-ndjson", "content-encoding": "GZIP"}
+
+    resp = client.post("/collections/test/bulk_items", data=body, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == "Successfully added 5 items."
+
+    batches.clear()
+    resp = client.post("/collections/test/bulk_items", data=body[:-4], headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == (
+        "Truncated gzip request body (4 items were already added)"
+    )
+    assert [len(batch) for batch in batches] == [2, 2]
+
+
 def test_app_transaction_extension(app_client, load_test_data):
     item = load_test_data("test_item.json")
     resp = app_client.post(f"/collections/{item['collection']}/items", json=item)
@@ -443,3 +524,276 @@ async def test_with_existing_cors(app_client):
         )
         == 0
     )
+
+
+def test_router_middleware():
+    def tag(app):
+        async def tagged(scope, receive, send):
+            async def send_tagged(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message["headers"], (b"x-router", b"1")]
+                await send(message)
+
+            await app(scope, receive, send_tagged)
+
+        return tagged
+
+    app = FastAPI()
+    router = APIRouter()
+    router.add_api_route("/things/{thing_id}", lambda thing_id: thing_id)
+    app.include_router(router)
+    app.add_api_route("/other", lambda: "other")
+    app.add_api_route("/things/{thing_id}", lambda thing_id: thing_id, methods=["PUT"])
+    app.add_middleware(RouterMiddleware, router=router, middleware=tag)
+
+    @router_middleware(app, router)
+    async def decorated(request, call_next):
+        response = await call_next(request)
+        response.headers["x-decorated"] = "1"
+        return response
+
+    # Routes added after the middleware are matched too
+    router.add_api_route("/late", lambda: "late")
+    app.include_router(router)
+
+    client = TestClient(app)
+    for path, body in (("/things/a", "a"), ("/late", "late")):
+        resp = client.get(path)
+        assert resp.json() == body
+        assert resp.headers["x-router"] == "1"
+        assert resp.headers["x-decorated"] == "1"
+    for resp in (client.get("/other"), client.put("/things/a")):
+        assert resp.status_code == 200
+        assert "x-router" not in resp.headers
+        assert "x-decorated" not in resp.headers
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_orjson_route_intersects(validate):
+    async def search(search_request, **kwargs):
+        return search_request.intersects.dict()
+
+    app = FastAPI()
+    app.state.settings = ApiSettings(validate_search_geometries=validate)
+    router = APIRouter(route_class=ORJSONRoute)
+    router.add_api_route(
+        "/search",
+        create_async_endpoint(search, BaseSearchPostRequest),
+        methods=["POST"],
+    )
+    app.include_router(router)
+    client = TestClient(app)
+
+    polygon = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}
+    resp = client.post("/search", json={"intersects": polygon})
+    assert resp.status_code == 200
+    assert resp.json()["coordinates"] == polygon["coordinates"]
+
+    # Coordinates are only validated when geometry validation is on
+    invalid = {"type": "Polygon", "coordinates": [["x"]]}
+    resp = client.post("/search", json={"intersects": invalid})
+    assert resp.status_code == (422 if validate else 200)
+
+    resp = client.post("/search", json={"intersects": polygon, "bbox": [0, 0, 1, 1]})
+    assert resp.status_code == 422
+    resp = client.post("/search", data="{not json")
+    assert resp.status_code == 422
+
+
+def test_document_endpoint_etag():
+    calls = []
+
+    def conformance(**kwargs):
+        calls.append(str(kwargs["request"].base_url))
+        return {"conformsTo": ["a", "b"]}
+
+    app = update_openapi(FastAPI())
+    app.add_api_route(
+        "/conformance",
+        create_document_endpoint(conformance, JSONResponse, cache=DocumentCache()),
+    )
+    client = TestClient(app)
+
+    resp = client.get("/conformance")
+    assert resp.json() == {"conformsTo": ["a", "b"]}
+    etag = resp.headers["etag"]
+    assert resp.headers["vary"] == "Accept-Encoding"
+
+    # Rendered once per base url, compressed for clients accepting brotli
+    resp = client.get("/conformance", headers={"accept-encoding": "br"})
+    assert resp.headers["content-encoding"] == "br"
+    assert resp.json() == {"conformsTo": ["a", "b"]}
+    client.get("http://other.host/conformance")
+    assert calls == ["http://testserver/", "http://other.host/"]
+
+    for if_none_match in (etag, f'W/{etag}, "other"', "*"):
+        resp = client.get("/conformance", headers={"if-none-match": if_none_match})
+        assert resp.status_code == 304
+        assert resp.content == b""
+    resp = client.get("/conformance", headers={"if-none-match": '"other"'})
+    assert resp.status_code == 200
+
+    resp = client.get("/openapi.json")
+    assert resp.headers["content-type"] == (
+        "application/vnd.oai.openapi+json;version=3.0"
+    )
+    resp = client.get("/openapi.json", headers={"if-none-match": resp.headers["etag"]})
+    assert resp.status_code == 304
+
+
+def test_compression_middleware():
+    page = {"features": [{"id": str(i), "properties": {}} for i in range(1000)]}
+
+    def lines():
+        for feature in page["features"]:
+            yield json.dumps(feature).encode() + b"\n"
+
+    app = FastAPI()
+    app.add_api_route("/page", lambda: page)
+    app.add_api_route("/item", lambda: page["features"][0])
+    app.add_api_route(
+        "/stream", lambda: StreamingResponse(lines(), media_type="application/x-ndjson")
+    )
+    stats = CompressionStats()
+    load = 0.0
+    app.add_middleware(CompressionMiddleware, stats=stats, cpu_load=lambda: load)
+    client = TestClient(app)
+
+    resp = client.get("/page", headers={"accept-encoding": "gzip, br"})
+    assert resp.headers["content-encoding"] == "br"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert "server-timing" in resp.headers
+    assert resp.json() == page
+    resp = client.get("/page", headers={"accept-encoding": "br;q=0, gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    resp = client.get("/page", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in resp.headers
+
+    # Small bodies are not compressed
+    resp = client.get("/item", headers={"accept-encoding": "gzip, br"})
+    assert "content-encoding" not in resp.headers
+
+    # Streams are compressed incrementally
+    resp = client.get("/stream", headers={"accept-encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    assert len(resp.text.splitlines()) == 1000
+
+    load = 1.0
+    resp = client.get("/page", headers={"accept-encoding": "gzip, br"})
+    assert "content-encoding" not in resp.headers
+
+    assert stats.encodings["br"].responses == 1
+    assert stats.encodings["gzip"].responses == 2
+    assert stats.encodings["br"].ratio > 1
+    assert (stats.small, stats.overloaded) == (1, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "encoding,decompressor",
+    [
+        ("gzip", lambda: zlib.decompressobj(16 + zlib.MAX_WBITS).decompress),
+        ("br", lambda: brotli.Decompressor().process),
+    ],
+)
+async def test_compression_middleware_flushes_chunks(encoding, decompressor):
+    chunks = [json.dumps({"id": str(i)}).encode() + b"\n" for i in range(3)]
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            more_body = i < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    middleware = CompressionMiddleware(app, cpu_load=lambda: 0.0)
+    await middleware(scope, receive, send)
+
+    assert dict(sent[0]["headers"])[b"content-encoding"] == encoding.encode()
+    bodies = [message for message in sent[1:] if message["body"]]
+    # Every chunk can be decoded as soon as it is received
+    decompress = decompressor()
+    for message, chunk in zip(bodies, chunks):
+        assert decompress(message["body"]) == chunk
+    assert bodies[0]["more_body"]
+
+
+@pytest.mark.asyncio
+async def test_request_coalescer():
+    calls = []
+    release = asyncio.Event()
+
+    async def post_search(search_request, **kwargs):
+        calls.append(search_request)
+        await release.wait()
+        base_url = str(kwargs["request"].base_url)
+        return {"self": f"{base_url}search", "limit": search_request.limit}
+
+    def request(host):
+        return Request(
+            {
+                "type": "http",
+                "method": "POST",
+                "scheme": "http",
+                "server": (host, 80),
+                "path": "/search",
+                "root_path": "",
+                "query_string": b"",
+                "headers": [(b"host", host.encode())],
+            }
+        )
+
+    coalescer = RequestCoalescer()
+    search = coalescer.wrap(post_search)
+    searches = [
+        ({"collections": ["a"], "limit": 10}, "one.host"),
+        # Identical once validated, with the default limit
+        ({"collections": ["a"]}, "one.host"),
+        ({"collections": ["a"]}, "two.host"),
+        ({"collections": ["a"], "limit": 5}, "one.host"),
+    ]
+    tasks = [
+        asyncio.ensure_future(
+            search(BaseSearchPostRequest(**body), request=request(host))
+        )
+        for body, host in searches
+    ]
+    await asyncio.sleep(0)
+    # Cancelling the first request does not fail the one sharing its call
+    tasks[0].cancel()
+    release.set()
+    await asyncio.wait(tasks)
+
+    assert len(calls) == 3
+    assert (coalescer.calls, coalescer.shared) == (3, 1)
+    assert [json.loads(task.result().body) for task in tasks[1:]] == [
+        {"self": "http://one.host/search", "limit": 10},
+        {"self": "http://two.host/search", "limit": 10},
+        {"self": "http://one.host/search", "limit": 5},
+    ]
+
+    # Requests after the call are not coalesced with it
+    await search(BaseSearchPostRequest(collections=["a"]), request=request("one.host"))
+    assert len(calls) == 4
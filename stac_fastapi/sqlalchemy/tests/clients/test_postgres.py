@@ -1,18 +1,33 @@
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import Callable
 
+import orjson
 import pytest
+from fastapi.responses import ORJSONResponse
 from stac_pydantic import Collection, Item
 from tests.conftest import MockStarletteRequest
 
 from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.models import create_post_request_model
+from stac_fastapi.extensions.core import ContextExtension
+from stac_fastapi.extensions.core.context import ContextMode
 from stac_fastapi.sqlalchemy.core import CoreCrudClient
 from stac_fastapi.sqlalchemy.transactions import (
     BulkTransactionsClient,
     TransactionsClient,
 )
-from stac_fastapi.types.errors import ConflictError, NotFoundError
+from stac_fastapi.types.errors import (
+    ConflictError,
+    ForeignKeyError,
+    InvalidPatchError,
+    InvalidQueryParameter,
+    NotFoundError,
+)
+from stac_fastapi.types.links import ItemLinks
+from stac_fastapi.types.search import BaseSearchPostRequest
 
 
 def test_create_collection(
@@ -215,6 +230,35 @@ def test_update_item(
     assert updated_item["properties"]["foo"] == "bar"
 
 
+def test_update_item_unchanged(
+    postgres_core: CoreCrudClient,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+
+    item = load_test_data("test_item.json")
+    postgres_transactions.create_item(deepcopy(item), request=MockStarletteRequest)
+    stored = postgres_core.get_item(
+        item["id"], item["collection"], request=MockStarletteRequest
+    )
+
+    # Sending the same content again does not rewrite the item
+    resp = postgres_transactions.update_item(
+        deepcopy(item), request=MockStarletteRequest
+    )
+    assert resp["properties"]["updated"] == stored["properties"]["updated"]
+
+    item["properties"]["foo"] = "bar"
+    time.sleep(1)
+    resp = postgres_transactions.update_item(
+        deepcopy(item), request=MockStarletteRequest
+    )
+    assert resp["properties"]["foo"] == "bar"
+    assert resp["properties"]["updated"] != stored["properties"]["updated"]
+
+
 def test_update_geometry(
     postgres_core: CoreCrudClient,
     postgres_transactions: TransactionsClient,
@@ -276,11 +320,21 @@ def test_bulk_item_insert(
     fc = postgres_core.item_collection(coll["id"], request=MockStarletteRequest)
     assert len(fc["features"]) == 0
 
-    postgres_bulk_transactions.bulk_item_insert(items=items)
+    msg = postgres_bulk_transactions.bulk_item_insert(items=items)
+    assert "10 inserted, 0 updated, 0 unchanged" in msg
 
     fc = postgres_core.item_collection(coll["id"], request=MockStarletteRequest)
     assert len(fc["features"]) == 10
 
+    # Existing items are merged, only those whose content changed are rewritten
+    items[0]["properties"]["gsd"] = 42
+    msg = postgres_bulk_transactions.bulk_item_insert(items=deepcopy(items))
+    assert "0 inserted, 1 updated, 9 unchanged" in msg
+    resp = postgres_core.get_item(
+        items[0]["id"], coll["id"], request=MockStarletteRequest
+    )
+    assert resp["properties"]["gsd"] == 42
+
     for item in items:
         postgres_transactions.delete_item(
             item["id"], item["collection"], request=MockStarletteRequest
@@ -311,6 +365,434 @@ def test_bulk_item_insert_chunked(
         )
 
 
+def test_patch_item(
+    postgres_core: CoreCrudClient,
+    postgres_transactions: TransactionsClient,
+    postgres_bulk_transactions: BulkTransactionsClient,
+    load_test_data: Callable,
+):
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+
+    item = load_test_data("test_item.json")
+    postgres_transactions.create_item(deepcopy(item), request=MockStarletteRequest)
+
+    patched = postgres_transactions.patch_item(
+        item["id"],
+        item["collection"],
+        {
+            "properties": {
+                "gsd": 42,
+                "eo:cloud_cover": None,
+                "datetime": "2021-01-01T00:00:00Z",
+            },
+            "assets": {"ANG": {"title": "Angles"}, "SR_B1": None},
+        },
+        request=MockStarletteRequest,
+    )
+    stored = postgres_core.get_item(
+        item["id"], item["collection"], request=MockStarletteRequest
+    )
+    for resp in (patched, stored):
+        assert resp["properties"]["gsd"] == 42
+        assert "eo:cloud_cover" not in resp["properties"]
+        assert resp["properties"]["datetime"] == "2021-01-01T00:00:00Z"
+        assert resp["properties"]["platform"] == item["properties"]["platform"]
+        assert resp["assets"]["ANG"]["title"] == "Angles"
+        assert resp["assets"]["ANG"]["href"] == item["assets"]["ANG"]["href"]
+        assert "SR_B1" not in resp["assets"]
+        assert resp["geometry"] == item["geometry"]
+
+    with pytest.raises(NotFoundError):
+        postgres_transactions.patch_item(
+            "missing", item["collection"], {}, request=MockStarletteRequest
+        )
+    with pytest.raises(InvalidPatchError):
+        postgres_transactions.patch_item(
+            item["id"], item["collection"], {"id": "renamed"}
+        )
+
+    msg = postgres_bulk_transactions.bulk_item_patch(
+        item["collection"], {item["id"]: {"properties": {"gsd": 7}}}
+    )
+    assert msg == "Successfully patched 1 items."
+    stored = postgres_core.get_item(
+        item["id"], item["collection"], request=MockStarletteRequest
+    )
+    assert stored["properties"]["gsd"] == 7
+
+
+def test_bulk_item_copy(
+    postgres_core: CoreCrudClient,
+    postgres_transactions: TransactionsClient,
+    postgres_bulk_transactions: BulkTransactionsClient,
+    load_test_data: Callable,
+):
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+
+    item = load_test_data("test_item.json")
+    items = []
+    for idx in range(10):
+        _item = deepcopy(item)
+        _item["id"] = f"{item['id']}-{idx}"
+        items.append(_item)
+
+    msg = postgres_bulk_transactions.bulk_item_copy(items, chunk_size=3)
+    assert msg.startswith("Successfully added 10 items")
+    for _item in items:
+        resp = postgres_core.get_item(
+            _item["id"], coll["id"], request=MockStarletteRequest
+        )
+        assert resp["geometry"] == _item["geometry"]
+        assert resp["bbox"] == _item["bbox"]
+        assert resp["stac_extensions"] == _item["stac_extensions"]
+        assert resp["assets"] == _item["assets"]
+
+    # Copying existing items again updates them
+    items[0]["properties"]["gsd"] = 42
+    postgres_bulk_transactions.bulk_item_copy(items[:1])
+    resp = postgres_core.get_item(
+        items[0]["id"], coll["id"], request=MockStarletteRequest
+    )
+    assert resp["properties"]["gsd"] == 42
+    fc = postgres_core.item_collection(coll["id"], request=MockStarletteRequest)
+    assert len(fc["features"]) == 10
+
+    # Only items whose content changed are rewritten
+    items[1]["properties"]["gsd"] = 42
+    msg = postgres_bulk_transactions.bulk_item_copy(deepcopy(items))
+    assert "0 inserted, 1 updated, 9 unchanged" in msg
+
+    missing = deepcopy(item)
+    missing["collection"] = "missing-collection"
+    with pytest.raises(ForeignKeyError):
+        postgres_bulk_transactions.bulk_item_copy([missing])
+
+
+def test_write_coalescer(
+    db_session,
+    postgres_core: CoreCrudClient,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    client = TransactionsClient(
+        session=db_session, write_coalesce_window=0.05, write_coalesce_max_items=8
+    )
+
+    item = load_test_data("test_item.json")
+    items = []
+    for idx in range(10):
+        _item = deepcopy(item)
+        _item["id"] = f"{item['id']}-{idx}"
+        items.append(_item)
+    # The duplicate fails on its own, without failing the rest of its batch
+    items.append(deepcopy(items[0]))
+
+    def create(_item):
+        try:
+            return client.create_item(_item, request=MockStarletteRequest)
+        except ConflictError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(items)) as executor:
+        results = list(executor.map(create, items))
+    assert sum(isinstance(result, ConflictError) for result in results) == 1
+    fc = postgres_core.item_collection(coll["id"], request=MockStarletteRequest)
+    assert {feature["id"] for feature in fc["features"]} == {
+        _item["id"] for _item in items
+    }
+
+    items[1]["properties"]["gsd"] = 42
+    client.update_item(items[1], request=MockStarletteRequest)
+    resp = postgres_core.get_item(
+        items[1]["id"], coll["id"], request=MockStarletteRequest
+    )
+    assert resp["properties"]["gsd"] == 42
+
+    # Unchanged items are answered with the stored item, like uncoalesced updates
+    assert client.update_item(
+        deepcopy(items[1]), request=MockStarletteRequest
+    ) == postgres_transactions.update_item(
+        deepcopy(items[1]), request=MockStarletteRequest
+    )
+
+    missing = deepcopy(item)
+    missing["id"] = "missing-item"
+    with pytest.raises(NotFoundError):
+        client.update_item(missing, request=MockStarletteRequest)
+
+
+def test_signed_pagination_tokens(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    core = CoreCrudClient(session=db_session, token_signing_key="not-a-secret")
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+
+    item = load_test_data("test_item.json")
+    ids = set()
+    for _ in range(3):
+        item["id"] = str(uuid.uuid4())
+        postgres_transactions.create_item(item, request=MockStarletteRequest)
+        ids.add(item["id"])
+
+    seen = set()
+    token = None
+    while True:
+        fc = core.item_collection(
+            coll["id"], limit=1, token=token, request=MockStarletteRequest
+        )
+        seen.update(feat["id"] for feat in fc["features"])
+        next_link = [link for link in fc["links"] if link["rel"] == "next"]
+        if not next_link:
+            break
+        token = next_link[0]["href"].split("token=")[1].split("&")[0]
+
+    assert seen == ids
+
+
+def test_signed_pagination_token_tampered(db_session):
+    core = CoreCrudClient(session=db_session, token_signing_key="not-a-secret")
+    token = core.insert_token(keyset=">i:1~s:foo")
+    assert core.get_token(token) == ">i:1~s:foo"
+
+    tampered = ("A" if token[0] != "A" else "B") + token[1:]
+    with pytest.raises(InvalidQueryParameter):
+        core.get_token(tampered)
+
+    other = CoreCrudClient(session=db_session, token_signing_key="other-secret")
+    with pytest.raises(InvalidQueryParameter):
+        other.get_token(token)
+
+
+def test_stream_items_in_chunks(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    core = CoreCrudClient(session=db_session, stream_chunk_size=2)
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+
+    item = load_test_data("test_item.json")
+    ids = []
+    for _ in range(5):
+        item["id"] = str(uuid.uuid4())
+        postgres_transactions.create_item(item, request=MockStarletteRequest)
+        ids.append(item["id"])
+
+    features = list(
+        core._stream_items(
+            lambda session: core._item_collection_query(session, coll["id"]),
+            limit=4,
+            token=False,
+            base_url=MockStarletteRequest.base_url,
+        )
+    )
+    assert len(features) == 4
+    assert len({feat["id"] for feat in features}) == 4
+    assert {feat["id"] for feat in features} < set(ids)
+
+
+def test_geometry_passthrough(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    core = CoreCrudClient(session=db_session, geometry_passthrough=True)
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    item = load_test_data("test_item.json")
+    postgres_transactions.create_item(item, request=MockStarletteRequest)
+
+    resp = core.get_item(item["id"], item["collection"], request=MockStarletteRequest)
+    assert resp["geometry"] == item["geometry"]
+
+    fc = core.item_collection(coll["id"], request=MockStarletteRequest)
+    assert fc["features"][0]["geometry"] == item["geometry"]
+
+    # Search geometries are only passed through to responses rendered by orjson
+    search_request = BaseSearchPostRequest(collections=[coll["id"]])
+    fc = core.post_search(search_request, request=MockStarletteRequest)
+    assert fc["features"][0]["geometry"] == item["geometry"]
+
+    core = CoreCrudClient(
+        session=db_session, geometry_passthrough=True, response_class=ORJSONResponse
+    )
+    fc = core.post_search(search_request, request=MockStarletteRequest)
+    assert isinstance(fc["features"][0]["geometry"], orjson.Fragment)
+    body = orjson.loads(ORJSONResponse(fc).body)
+    assert body["features"][0]["geometry"] == item["geometry"]
+
+
+def test_core_read_path(
+    db_session,
+    postgres_core: CoreCrudClient,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+):
+    core = CoreCrudClient(session=db_session, core_read_path=True)
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    item = load_test_data("test_item.json")
+    for idx in range(3):
+        _item = deepcopy(item)
+        _item["id"] = item["id"] + str(idx)
+        postgres_transactions.create_item(_item, request=MockStarletteRequest)
+
+    orm_page = postgres_core.item_collection(
+        coll["id"], limit=2, request=MockStarletteRequest
+    )
+    core_page = core.item_collection(coll["id"], limit=2, request=MockStarletteRequest)
+    assert core_page["features"] == orm_page["features"]
+
+    next_token = [
+        link["href"].split("token=")[1].split("&")[0]
+        for link in core_page["links"]
+        if link["rel"] == "next"
+    ][0]
+    core_page = core.item_collection(
+        coll["id"], limit=2, token=next_token, request=MockStarletteRequest
+    )
+    assert len(core_page["features"]) == 1
+
+    search_request = BaseSearchPostRequest(collections=[coll["id"]], limit=3)
+    orm_search = postgres_core.post_search(search_request, request=MockStarletteRequest)
+    core_search = core.post_search(search_request, request=MockStarletteRequest)
+    assert core_search["features"] == orm_search["features"]
+
+
+def test_context_count_budget(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+    monkeypatch,
+):
+    core = CoreCrudClient(session=db_session, extensions=[ContextExtension()])
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    item = load_test_data("test_item.json")
+    postgres_transactions.create_item(item, request=MockStarletteRequest)
+
+    fc = core.item_collection(coll["id"], request=MockStarletteRequest)
+    assert fc["context"] == {
+        "returned": 1,
+        "limit": 10,
+        "matched": 1,
+        "matched_mode": "exact",
+    }
+
+    slow = CoreCrudClient(
+        session=db_session, extensions=[ContextExtension()], context_count_timeout=0.1
+    )
+    count = slow._count
+    monkeypatch.setattr(slow, "_count", lambda *args: time.sleep(1) or count(*args))
+
+    search_request = BaseSearchPostRequest(collections=[coll["id"]], bbox=item["bbox"])
+    fc = slow.post_search(search_request, request=MockStarletteRequest)
+    assert len(fc["features"]) == 1
+    assert fc["context"] == {"returned": 1, "limit": 10, "matched_mode": "off"}
+
+
+@pytest.mark.parametrize(
+    "mode,threshold,expected",
+    [
+        ("off", 10000, "off"),
+        ("estimated", 10000, "estimated"),
+        ("exact-if-cheap", 10000, "exact"),
+        ("exact-if-cheap", 0, "estimated"),
+        ("exact", 0, "exact"),
+    ],
+)
+def test_context_modes(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    load_test_data: Callable,
+    mode,
+    threshold,
+    expected,
+):
+    core = CoreCrudClient(
+        session=db_session,
+        extensions=[ContextExtension(exact_threshold=threshold)],
+        post_request_model=create_post_request_model([ContextExtension()]),
+    )
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    item = load_test_data("test_item.json")
+    postgres_transactions.create_item(item, request=MockStarletteRequest)
+
+    search_request = core.post_request_model(
+        collections=[coll["id"]], bbox=item["bbox"], context=mode
+    )
+    context = core.post_search(search_request, request=MockStarletteRequest)["context"]
+    assert context["matched_mode"] == expected
+    if expected == "off":
+        assert "matched" not in context
+    elif expected == "exact":
+        assert context["matched"] == 1
+    else:
+        assert isinstance(context["matched"], int)
+
+    # Whole collections are counted exactly from the counters
+    core.extensions[0].mode = ContextMode(mode)
+    fc = core.item_collection(coll["id"], request=MockStarletteRequest)
+    assert fc["context"]["matched_mode"] == ("off" if mode == "off" else "exact")
+
+
+def test_collection_item_counts(
+    db_session,
+    postgres_transactions: TransactionsClient,
+    postgres_bulk_transactions: BulkTransactionsClient,
+    load_test_data: Callable,
+):
+    core = CoreCrudClient(session=db_session, extensions=[ContextExtension()])
+    coll = load_test_data("test_collection.json")
+    postgres_transactions.create_collection(coll, request=MockStarletteRequest)
+    item = load_test_data("test_item.json")
+    items = []
+    for idx in range(5):
+        _item = deepcopy(item)
+        _item["id"] = item["id"] + str(idx)
+        items.append(_item)
+    postgres_bulk_transactions.bulk_item_insert(items, chunk_size=2)
+
+    def matched() -> int:
+        fc = core.item_collection(coll["id"], limit=1, request=MockStarletteRequest)
+        return fc["context"]["matched"]
+
+    assert matched() == 5
+    postgres_transactions.delete_item(
+        items[0]["id"], coll["id"], request=MockStarletteRequest
+    )
+    assert matched() == 4
+    postgres_transactions.update_item(items[1], request=MockStarletteRequest)
+    assert matched() == 4
+
+    search_request = BaseSearchPostRequest(collections=[coll["id"], "unknown"])
+    context = core.post_search(search_request, request=MockStarletteRequest)["context"]
+    assert context["matched"] == 4
+    assert context["matched_mode"] == "exact"
+
+
+def test_item_links_templates():
+    base_url = "http://test-server/api/"
+    links = ItemLinks(
+        collection_id="test-collection", item_id="test-item", base_url=base_url
+    ).create_links()
+    assert {link["rel"]: link["href"] for link in links} == {
+        "self": f"{base_url}collections/test-collection/items/test-item",
+        "parent": f"{base_url}collections/test-collection",
+        "collection": f"{base_url}collections/test-collection",
+        "root": base_url,
+    }
+
+
 def test_landing_page_no_collection_title(
     postgres_core: CoreCrudClient,
     postgres_transactions: TransactionsClient,
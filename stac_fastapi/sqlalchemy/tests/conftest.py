@@ -15,6 +15,7 @@ from stac_fastapi.extensions.core import (
     TokenPaginationExtension,
     TransactionExtension,
 )
+from stac_fastapi.extensions.third_party import BulkTransactionExtension
 from stac_fastapi.sqlalchemy.config import SqlalchemySettings
 from stac_fastapi.sqlalchemy.core import CoreCrudClient
 from stac_fastapi.sqlalchemy.extensions import QueryExtension
@@ -118,6 +119,7 @@ def _api_client_provider(
         FieldsExtension(),
         QueryExtension(),
         TokenPaginationExtension(),
+        BulkTransactionExtension(client=BulkTransactionsClient(session=db_session)),
     ]
 
     get_request_model = create_request_model(
@@ -1,3 +1,4 @@
+import gzip
 import json
 import os
 import time
@@ -860,6 +861,50 @@ def test_field_extension_exclude_and_include(app_client, load_test_data):
     assert "eo:cloud_cover" not in resp_json["features"][0]["properties"]
 
 
+def test_field_extension_post_projection(app_client, load_test_data):
+    """Test POST search with fields projected in the database (fields extension)"""
+    test_item = load_test_data("test_item.json")
+    resp = app_client.post(
+        f"/collections/{test_item['collection']}/items", json=test_item
+    )
+    assert resp.status_code == 200
+
+    body = {
+        "fields": {
+            "exclude": ["assets", "links"],
+            "include": ["properties.gsd", "properties.does-not-exist"],
+        }
+    }
+
+    resp = app_client.post("/search", json=body)
+    feature = resp.json()["features"][0]
+    assert "assets" not in feature
+    assert "links" not in feature
+    assert feature["geometry"] == test_item["geometry"]
+    assert feature["properties"] == {
+        "datetime": test_item["properties"]["datetime"],
+        "gsd": test_item["properties"]["gsd"],
+    }
+
+
+def test_field_extension_nested_fields(app_client, load_test_data):
+    """Test POST search excluding a nested field (fields extension)"""
+    test_item = load_test_data("test_item.json")
+    resp = app_client.post(
+        f"/collections/{test_item['collection']}/items", json=test_item
+    )
+    assert resp.status_code == 200
+
+    body = {"fields": {"exclude": ["assets.ANG.description"]}}
+
+    resp = app_client.post("/search", json=body)
+    assets = resp.json()["features"][0]["assets"]
+    expected = dict(test_item["assets"]["ANG"])
+    del expected["description"]
+    assert assets["ANG"] == expected
+    assert assets["SR_B1"] == test_item["assets"]["SR_B1"]
+
+
 def test_field_extension_exclude_default_includes(app_client, load_test_data):
     """Test POST search excluding a forbidden field (fields extension)"""
     test_item = load_test_data("test_item.json")
@@ -986,3 +1031,74 @@ def test_get_item_duplicate_forwarded_headers(app_client, load_test_data):
     )
     for link in get_item.json()["links"]:
         assert link["href"].startswith("https://testserver:1234/")
+
+
+def test_search_streaming_ndjson(app_client, load_test_data):
+    test_item = load_test_data("test_item.json")
+    ids = []
+    for _ in range(3):
+        test_item["id"] = str(uuid.uuid4())
+        resp = app_client.post(
+            f"/collections/{test_item['collection']}/items", json=test_item
+        )
+        assert resp.status_code == 200
+        ids.append(test_item["id"])
+
+    resp = app_client.post(
+        "/search",
+        json={"ids": ids, "limit": 2},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = resp.text.splitlines()
+    assert len(lines) == 2
+    assert {json.loads(line)["id"] for line in lines} < set(ids)
+
+
+def test_item_collection_streaming_geojson_seq(app_client, load_test_data):
+    test_item = load_test_data("test_item.json")
+    ids = []
+    for _ in range(3):
+        test_item["id"] = str(uuid.uuid4())
+        app_client.post(f"/collections/{test_item['collection']}/items", json=test_item)
+        ids.append(test_item["id"])
+
+    resp = app_client.get(
+        f"/collections/{test_item['collection']}/items",
+        headers={"Accept": "application/geo+json-seq"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/geo+json-seq")
+    records = [r for r in resp.content.split(b"\x1e") if r]
+    assert sorted(json.loads(r)["id"] for r in records) == sorted(ids)
+
+
+def test_bulk_items_ndjson(app_client, load_test_data):
+    test_item = load_test_data("test_item.json")
+    items = []
+    for idx in range(5):
+        item = deepcopy(test_item)
+        item["id"] = f"{test_item['id']}-{idx}"
+        items.append(item)
+    body = b"".join(json.dumps(item).encode() + b"\n" for item in items)
+
+    resp = app_client.post(
+        f"/collections/{test_item['collection']}/bulk_items",
+        data=gzip.compress(body),
+        headers={"content-type": "application/x-ndjson", "content-encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == "Successfully added 5 items."
+
+    resp = app_client.get(f"/collections/{test_item['collection']}/items")
+    assert {feature["id"] for feature in resp.json()["features"]} == {
+        item["id"] for item in items
+    }
+
+    resp = app_client.post(
+        f"/collections/{test_item['collection']}/bulk_items",
+        data=b"{not json}\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 400
@@ -10,7 +10,7 @@ install_requires = [
     # See https://github.com/stac-utils/stac-fastapi/issues/242
     "fastapi==0.67.*",
     "attrs",
-    "pydantic[dotenv]",
+    "pydantic[dotenv]>=1.9,<2",
     "stac_pydantic==2.0.*",
 ]
 
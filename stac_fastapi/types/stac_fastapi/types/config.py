@@ -16,6 +16,18 @@ class ApiSettings(BaseSettings):
         indexed_fields:
             set of fields which are usually in `item.properties` but are indexed as distinct columns in
             the database.
+        context_mode:
+            default context extension mode (`off`, `estimated`, `exact-if-cheap` or
+            `exact`), unset to leave it to the backend.
+        context_exact_threshold:
+            largest estimated `matched` which is counted exactly in `exact-if-cheap`
+            mode.
+        validate_search_geometries:
+            validate the coordinates of search `intersects` geometries, otherwise only
+            their type is checked (see `stac_fastapi.api.routes.ORJSONRoute`).
+        coalesce_searches:
+            share one client call between concurrent identical search requests (see
+            `stac_fastapi.api.coalesce.RequestCoalescer`).  Off by default.
     """
 
     # TODO: Remove `default_includes` attribute so we can use `pydantic.BaseSettings` instead
@@ -29,6 +41,12 @@ class ApiSettings(BaseSettings):
     openapi_url: str = "/api"
     docs_url: str = "/api.html"
 
+    context_mode: Optional[str] = None
+    context_exact_threshold: int = 10000
+
+    validate_search_geometries: bool = True
+    coalesce_searches: bool = False
+
     class Config:
         """model config (https://pydantic-docs.helpmanual.io/usage/model_config/)."""
 
@@ -1,7 +1,7 @@
 """Base clients."""
 import abc
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import attr
@@ -20,6 +20,9 @@ from stac_fastapi.types.stac import Conformance
 NumType = Union[float, int]
 StacType = Dict[str, Any]
 
+# Most base urls whose landing page is kept by `LandingPageMixin`
+LANDING_PAGE_CACHE_SIZE = 64
+
 
 @attr.s  # type:ignore
 class BaseTransactionsClient(abc.ABC):
@@ -56,6 +59,26 @@ class BaseTransactionsClient(abc.ABC):
         """
         ...
 
+    def patch_item(
+        self, item_id: str, collection_id: str, patch: Dict[str, Any], **kwargs
+    ) -> stac_types.Item:
+        """Apply a JSON merge patch (RFC 7396) to an existing item.
+
+        Called with `PATCH /collections/{collection_id}/items/{item_id}`.  Keys of the
+        patch replace those of the item, nested objects are merged and keys set to
+        `null` are removed.  Backends which don't support partial updates leave this
+        unimplemented, and the endpoint is then not registered.
+
+        Args:
+            item_id: id of the item.
+            collection_id: id of the collection.
+            patch: the merge patch.
+
+        Returns:
+            The patched item.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def delete_item(
         self, item_id: str, collection_id: str, **kwargs
@@ -157,6 +180,26 @@ class AsyncBaseTransactionsClient(abc.ABC):
         """
         ...
 
+    async def patch_item(
+        self, item_id: str, collection_id: str, patch: Dict[str, Any], **kwargs
+    ) -> stac_types.Item:
+        """Apply a JSON merge patch (RFC 7396) to an existing item.
+
+        Called with `PATCH /collections/{collection_id}/items/{item_id}`.  Keys of the
+        patch replace those of the item, nested objects are merged and keys set to
+        `null` are removed.  Backends which don't support partial updates leave this
+        unimplemented, and the endpoint is then not registered.
+
+        Args:
+            item_id: id of the item.
+            collection_id: id of the collection.
+            patch: the merge patch.
+
+        Returns:
+            The patched item.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def delete_item(
         self, item_id: str, collection_id: str, **kwargs
@@ -233,6 +276,62 @@ class LandingPageMixin(abc.ABC):
     landing_page_id: str = attr.ib(default="stac-fastapi")
     title: str = attr.ib(default="stac-fastapi")
     description: str = attr.ib(default="stac-fastapi")
+    _landing_pages: Dict[
+        Tuple[str, str, str], Tuple[stac_types.LandingPage, List[Dict[str, Any]]]
+    ] = attr.ib(init=False, factory=dict, eq=False, repr=False)
+
+    def _base_landing_page(
+        self, request: Request
+    ) -> Tuple[stac_types.LandingPage, List[Dict[str, Any]]]:
+        """Landing page without links to collections, and its service links.
+
+        Both are built once per base url and copied, so the collections' links can be
+        appended to the landing page's before the service links.
+        """
+        base_url = str(request.base_url)
+        key = (base_url, request.app.openapi_url, request.app.docs_url)
+        cached = self._landing_pages.get(key)
+        if cached is None:
+            extension_schemas = [
+                schema.schema_href
+                for schema in getattr(self, "extensions", [])
+                if schema.schema_href
+            ]
+            landing_page = self._landing_page(
+                base_url=base_url,
+                conformance_classes=self.conformance_classes(),
+                extension_schemas=extension_schemas,
+            )
+            service_links = [
+                # OpenAPI URL
+                {
+                    "rel": "service-desc",
+                    "type": "application/vnd.oai.openapi+json;version=3.0",
+                    "title": "OpenAPI service description",
+                    "href": urljoin(base_url, request.app.openapi_url.lstrip("/")),
+                },
+                # Human readable service-doc
+                {
+                    "rel": "service-doc",
+                    "type": "text/html",
+                    "title": "OpenAPI service documentation",
+                    "href": urljoin(base_url, request.app.docs_url.lstrip("/")),
+                },
+            ]
+            if len(self._landing_pages) >= LANDING_PAGE_CACHE_SIZE:
+                self._landing_pages.clear()
+            cached = self._landing_pages[key] = (landing_page, service_links)
+
+        landing_page, service_links = cached
+        return (
+            stac_types.LandingPage(
+                landing_page,
+                conformsTo=list(landing_page["conformsTo"]),
+                stac_extensions=list(landing_page["stac_extensions"]),
+                links=[dict(link) for link in landing_page["links"]],
+            ),
+            [dict(link) for link in service_links],
+        )
 
     def _landing_page(
         self,
@@ -317,6 +416,13 @@ class BaseCoreClient(LandingPageMixin, abc.ABC):
         """Check if an api extension is enabled."""
         return any([type(ext).__name__ == extension for ext in self.extensions])
 
+    def get_extension(self, extension: str) -> Optional[ApiExtension]:
+        """Get an enabled api extension by name."""
+        for ext in self.extensions:
+            if type(ext).__name__ == extension:
+                return ext
+        return None
+
     def list_conformance_classes(self):
         """Return a list of conformance classes, including implemented extensions."""
         base_conformance = BASE_CONFORMANCE_CLASSES
@@ -337,16 +443,7 @@ class BaseCoreClient(LandingPageMixin, abc.ABC):
         """
         request: Request = kwargs["request"]
         base_url = str(request.base_url)
-        extension_schemas = [
-            schema.schema_href for schema in self.extensions if schema.schema_href
-        ]
-        request: Request = kwargs["request"]
-        base_url = str(request.base_url)
-        landing_page = self._landing_page(
-            base_url=base_url,
-            conformance_classes=self.conformance_classes(),
-            extension_schemas=extension_schemas,
-        )
+        landing_page, service_links = self._base_landing_page(request)
 
         # Add Collections links
         collections = self.all_collections(request=kwargs["request"])
@@ -360,25 +457,7 @@ class BaseCoreClient(LandingPageMixin, abc.ABC):
                 }
             )
 
-        # Add OpenAPI URL
-        landing_page["links"].append(
-            {
-                "rel": "service-desc",
-                "type": "application/vnd.oai.openapi+json;version=3.0",
-                "title": "OpenAPI service description",
-                "href": urljoin(base_url, request.app.openapi_url.lstrip("/")),
-            }
-        )
-
-        # Add human readable service-doc
-        landing_page["links"].append(
-            {
-                "rel": "service-doc",
-                "type": "text/html",
-                "title": "OpenAPI service documentation",
-                "href": urljoin(base_url, request.app.docs_url.lstrip("/")),
-            }
-        )
+        landing_page["links"].extend(service_links)
 
         return landing_page
 
@@ -518,6 +597,13 @@ class AsyncBaseCoreClient(LandingPageMixin, abc.ABC):
         """Check if an api extension is enabled."""
         return any([type(ext).__name__ == extension for ext in self.extensions])
 
+    def get_extension(self, extension: str) -> Optional[ApiExtension]:
+        """Get an enabled api extension by name."""
+        for ext in self.extensions:
+            if type(ext).__name__ == extension:
+                return ext
+        return None
+
     async def landing_page(self, **kwargs) -> stac_types.LandingPage:
         """Landing page.
 
@@ -528,14 +614,7 @@ class AsyncBaseCoreClient(LandingPageMixin, abc.ABC):
         """
         request: Request = kwargs["request"]
         base_url = str(request.base_url)
-        extension_schemas = [
-            schema.schema_href for schema in self.extensions if schema.schema_href
-        ]
-        landing_page = self._landing_page(
-            base_url=base_url,
-            conformance_classes=self.conformance_classes(),
-            extension_schemas=extension_schemas,
-        )
+        landing_page, service_links = self._base_landing_page(request)
         collections = await self.all_collections(request=kwargs["request"])
         for collection in collections["collections"]:
             landing_page["links"].append(
@@ -547,25 +626,7 @@ class AsyncBaseCoreClient(LandingPageMixin, abc.ABC):
                 }
             )
 
-        # Add OpenAPI URL
-        landing_page["links"].append(
-            {
-                "rel": "service-desc",
-                "type": "application/vnd.oai.openapi+json;version=3.0",
-                "title": "OpenAPI service description",
-                "href": urljoin(base_url, request.app.openapi_url.lstrip("/")),
-            }
-        )
-
-        # Add human readable service-doc
-        landing_page["links"].append(
-            {
-                "rel": "service-doc",
-                "type": "text/html",
-                "title": "OpenAPI service documentation",
-                "href": urljoin(base_url, request.app.docs_url.lstrip("/")),
-            }
-        )
+        landing_page["links"].extend(service_links)
 
         return landing_page
 
@@ -31,6 +31,12 @@ class DatabaseError(StacApiError):
     pass
 
 
+class InvalidPatchError(StacApiError):
+    """Merge patch which cannot be applied to an item."""
+
+    pass
+
+
 class InvalidQueryParameter(StacApiError):
     """Error for unknown or invalid query parameters.
 
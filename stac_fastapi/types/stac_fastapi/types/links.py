@@ -1,5 +1,6 @@
 """link helpers."""
 
+from functools import lru_cache
 from typing import Any, Dict, List
 from urllib.parse import urljoin
 
@@ -11,6 +12,9 @@ from stac_pydantic.shared import MimeTypes
 # Instead they are dynamically generated when querying the database using the classes defined below
 INFERRED_LINK_RELS = ["self", "item", "parent", "collection", "root"]
 
+# Number of base urls to keep pre-rendered link templates for
+LINK_TEMPLATES_CACHE_SIZE = 64
+
 
 def filter_links(links: List[Dict]) -> List[Dict]:
     """Remove inferred links."""
@@ -25,6 +29,83 @@ def resolve_links(links: list, base_url: str) -> List[Dict]:
     return filtered_links
 
 
+@attr.s(frozen=True)
+class LinkTemplates:
+    """Inferred links pre-rendered for a base url.
+
+    Templates are built once per base url with `link_templates`, creating the links of
+    an item or collection is then plain string formatting instead of a `urljoin` and
+    a method call per link.
+
+    Attributes:
+        base_url: base url of the API.
+        collections_href: href of the collections endpoint, resolved against `base_url`.
+    """
+
+    base_url: str = attr.ib()
+    collections_href: str = attr.ib()
+
+    def root(self) -> Dict[str, Any]:
+        """Create the `root` link."""
+        return {
+            "rel": Relations.root.value,
+            "type": MimeTypes.json.value,
+            "href": self.base_url,
+        }
+
+    def collection_links(self, collection_id: str) -> List[Dict[str, Any]]:
+        """Create the inferred links of a collection."""
+        collection_href = f"{self.collections_href}{collection_id}"
+        return [
+            {
+                "rel": Relations.self.value,
+                "type": MimeTypes.json.value,
+                "href": collection_href,
+            },
+            {
+                "rel": Relations.parent.value,
+                "type": MimeTypes.json.value,
+                "href": self.base_url,
+            },
+            {
+                "rel": "items",
+                "type": MimeTypes.geojson.value,
+                "href": f"{collection_href}/items",
+            },
+            self.root(),
+        ]
+
+    def item_links(self, collection_id: str, item_id: str) -> List[Dict[str, Any]]:
+        """Create the inferred links of an item."""
+        collection_href = f"{self.collections_href}{collection_id}"
+        return [
+            {
+                "rel": Relations.self.value,
+                "type": MimeTypes.geojson.value,
+                "href": f"{collection_href}/items/{item_id}",
+            },
+            {
+                "rel": Relations.parent.value,
+                "type": MimeTypes.json.value,
+                "href": collection_href,
+            },
+            {
+                "rel": Relations.collection.value,
+                "type": MimeTypes.json.value,
+                "href": collection_href,
+            },
+            self.root(),
+        ]
+
+
+@lru_cache(maxsize=LINK_TEMPLATES_CACHE_SIZE)
+def link_templates(base_url: str) -> LinkTemplates:
+    """Get the link templates of a base url."""
+    return LinkTemplates(
+        base_url=base_url, collections_href=urljoin(base_url, "collections/")
+    )
+
+
 @attr.s
 class BaseLinks:
     """Create inferred links common to collections and items."""
@@ -32,38 +113,14 @@ class BaseLinks:
     collection_id: str = attr.ib()
     base_url: str = attr.ib()
 
-    def root(self) -> Dict[str, Any]:
-        """Return the catalog root."""
-        return dict(rel=Relations.root, type=MimeTypes.json, href=self.base_url)
-
 
 @attr.s
 class CollectionLinks(BaseLinks):
     """Create inferred links specific to collections."""
 
-    def self(self) -> Dict[str, Any]:
-        """Create the `self` link."""
-        return dict(
-            rel=Relations.self,
-            type=MimeTypes.json,
-            href=urljoin(self.base_url, f"collections/{self.collection_id}"),
-        )
-
-    def parent(self) -> Dict[str, Any]:
-        """Create the `parent` link."""
-        return dict(rel=Relations.parent, type=MimeTypes.json, href=self.base_url)
-
-    def items(self) -> Dict[str, Any]:
-        """Create the `items` link."""
-        return dict(
-            rel="items",
-            type=MimeTypes.geojson,
-            href=urljoin(self.base_url, f"collections/{self.collection_id}/items"),
-        )
-
     def create_links(self) -> List[Dict[str, Any]]:
         """Return all inferred links."""
-        return [self.self(), self.parent(), self.items(), self.root()]
+        return link_templates(str(self.base_url)).collection_links(self.collection_id)
 
 
 @attr.s
@@ -72,39 +129,8 @@ class ItemLinks(BaseLinks):
 
     item_id: str = attr.ib()
 
-    def self(self) -> Dict[str, Any]:
-        """Create the `self` link."""
-        return dict(
-            rel=Relations.self,
-            type=MimeTypes.geojson,
-            href=urljoin(
-                self.base_url,
-                f"collections/{self.collection_id}/items/{self.item_id}",
-            ),
-        )
-
-    def parent(self) -> Dict[str, Any]:
-        """Create the `parent` link."""
-        return dict(
-            rel=Relations.parent,
-            type=MimeTypes.json,
-            href=urljoin(self.base_url, f"collections/{self.collection_id}"),
-        )
-
-    def collection(self) -> Dict[str, Any]:
-        """Create the `collection` link."""
-        return dict(
-            rel=Relations.collection,
-            type=MimeTypes.json,
-            href=urljoin(self.base_url, f"collections/{self.collection_id}"),
-        )
-
     def create_links(self) -> List[Dict[str, Any]]:
         """Return all inferred links."""
-        links = [
-            self.self(),
-            self.parent(),
-            self.collection(),
-            self.root(),
-        ]
-        return links
+        return link_templates(str(self.base_url)).item_links(
+            self.collection_id, self.item_id
+        )
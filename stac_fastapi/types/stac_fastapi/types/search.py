@@ -97,6 +97,12 @@ class BaseSearchPostRequest(BaseModel):
     datetime: Optional[str]
     limit: Optional[conint(gt=0, le=10000)] = 10
 
+    class Config:
+        """model config (https://pydantic-docs.helpmanual.io/usage/model_config/)."""
+
+        # Geometries already built as one of the `intersects` models are kept as is
+        smart_union = True
+
     @property
     def start_date(self) -> Optional[datetime]:
         """Extract the start date from the datetime string."""
@@ -67,7 +67,7 @@ class ItemCollection(TypedDict, total=False):
     type: str
     features: List[Item]
     links: List[Dict[str, Any]]
-    context: Optional[Dict[str, int]]
+    context: Optional[Dict[str, Union[int, str]]]
 
 
 class Collections(TypedDict, total=False):